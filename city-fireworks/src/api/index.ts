@@ -1,6 +1,8 @@
 import ApiService from '../services/ApiService'
+import TileService, { type LngLatBounds } from '../services/TileService'
 
 const apiService = ApiService.getInstance()
+const tileService = TileService.getInstance()
 
 /**
  * 统一的 API 接口
@@ -10,7 +12,22 @@ export const api = {
   map: {
     getDistrictBoundaries: () => apiService.getDistricts(),
     getHotpotPoints: () => apiService.getHotpotPoints(),
-    getTeahousePoints: () => apiService.getTeahousePoints()
+    getTeahousePoints: () => apiService.getTeahousePoints(),
+    // 只加载视野内的点位（服务端按索引过滤并限制数量）
+    getHotpotPointsInView: (bounds: LngLatBounds, zoom?: number, limit?: number) =>
+      apiService.getHotpotPointsInView(bounds, zoom, limit),
+    getTeahousePointsInView: (bounds: LngLatBounds, zoom?: number, limit?: number) =>
+      apiService.getTeahousePointsInView(bounds, zoom, limit),
+    // 低缩放级别使用服务端聚合结果
+    getClusters: (zoom: number, bounds?: LngLatBounds, layers?: Array<'hotpot' | 'teahouse'>) =>
+      apiService.getClusters(zoom, bounds, layers)
+  },
+
+  // 静态瓦片点位（按视野加载，需先运行 convert_csv_to_json.py --tile-zoom）
+  tiles: {
+    getManifest: (table: string) => tileService.getManifest(table),
+    getHotpotPoints: (bounds?: LngLatBounds) => tileService.getHotpotPoints(bounds),
+    getTeahousePoints: (bounds?: LngLatBounds) => tileService.getTeahousePoints(bounds)
   },
 
   // 火锅江湖（左屏）API
@@ -48,6 +65,17 @@ export const api = {
     getRankingDetail: () => apiService.getRankingDetail()
   },
 
+  // 数据变更推送（SSE）
+  events: {
+    subscribe: (
+      onChange: (panels: string[], version: string, namespaces: string[]) => void,
+      onConnectionChange?: (connected: boolean) => void
+    ) => apiService.subscribeDataChanges(onChange, onConnectionChange),
+    // 轮询时跳过本地缓存
+    clearCache: (namespaces: string[]) =>
+      namespaces.forEach((namespace) => apiService.clearCacheByPrefix(`/${namespace}/`))
+  },
+
   // 弹窗详情API
   detail: {
     getRadarDimensionDetail: (dimension: string) => {
@@ -0,0 +1,73 @@
+/**
+ * 数据刷新 Composable
+ * 订阅后端数据变更推送，相关数据变化时重新加载；推送连接不可用时退回定时轮询
+ */
+import { onUnmounted } from 'vue'
+import api from '../api'
+
+/**
+ * @param {Function} loadData 重新加载数据的函数
+ * @param {string[]} namespaces 组件依赖的接口命名空间，如 ['hotpot']、['night']
+ * @param {number} interval 轮询间隔（毫秒），仅在推送不可用时使用
+ */
+export function useDataRefresh(loadData, namespaces, interval = 30000) {
+  let unsubscribe = null
+  let pollId = null
+
+  const startPolling = () => {
+    if (pollId) return
+    pollId = setInterval(() => {
+      api.events.clearCache(namespaces)
+      loadData()
+    }, interval)
+  }
+
+  const stopPolling = () => {
+    if (pollId) {
+      clearInterval(pollId)
+      pollId = null
+    }
+  }
+
+  const onChange = (panels, version, changed) => {
+    // 命名空间为空表示全部数据可能变化
+    if (!changed.length || changed.some((namespace) => namespaces.includes(namespace))) {
+      loadData()
+    }
+  }
+
+  const onConnectionChange = (connected) => {
+    if (connected) {
+      stopPolling()
+    } else {
+      startPolling()
+    }
+  }
+
+  /**
+   * 开始监听数据变更（首次加载完成后调用）
+   */
+  const start = () => {
+    if (!unsubscribe) {
+      unsubscribe = api.events.subscribe(onChange, onConnectionChange)
+    }
+  }
+
+  /**
+   * 停止监听
+   */
+  const stop = () => {
+    if (unsubscribe) {
+      unsubscribe()
+      unsubscribe = null
+    }
+    stopPolling()
+  }
+
+  onUnmounted(stop)
+
+  return {
+    start,
+    stop
+  }
+}
@@ -10,14 +10,32 @@ import type {
   Teahouse,
   NightEconomy,
   Alert,
-  CityTemperatureIndex
+  CityTemperatureIndex,
+  ViewportPoints,
+  MapClusters
 } from '../types/index.js'
 
+function viewportQuery(bounds: [number, number, number, number], zoom?: number, limit?: number): string {
+  const params = new URLSearchParams({ bbox: bounds.map((value) => value.toFixed(6)).join(',') })
+  if (zoom !== undefined) params.set('zoom', String(Math.round(zoom)))
+  if (limit !== undefined) params.set('limit', String(limit))
+  return params.toString()
+}
+
+interface DataChangeListener {
+  onChange: (panels: string[], version: string, namespaces: string[]) => void
+  onConnectionChange?: (connected: boolean) => void
+}
+
 class ApiService {
   private static instance: ApiService
   private baseURL: string
   private cache: Map<string, { data: any; timestamp: number }> = new Map()
   private readonly CACHE_TTL = 5 * 60 * 1000 // 5分钟缓存
+  private eventSource: EventSource | null = null
+  private dataChangeListeners: Set<DataChangeListener> = new Set()
+  private dataVersion: string | null = null
+  private streamConnected: boolean | null = null
 
   constructor() {
     // 根据环境变量设置 API 基础 URL
@@ -83,6 +101,39 @@ class ApiService {
     return this.get<Teahouse[]>('/map/teahouse-points')
   }
 
+  /**
+   * 视野内的点位，bounds 为 [minLng, minLat, maxLng, maxLat]
+   */
+  async getHotpotPointsInView(
+    bounds: [number, number, number, number],
+    zoom?: number,
+    limit?: number
+  ): Promise<ViewportPoints<HotpotRestaurant>> {
+    return this.get(`/map/hotpot-points?${viewportQuery(bounds, zoom, limit)}`)
+  }
+
+  async getTeahousePointsInView(
+    bounds: [number, number, number, number],
+    zoom?: number,
+    limit?: number
+  ): Promise<ViewportPoints<Teahouse>> {
+    return this.get(`/map/teahouse-points?${viewportQuery(bounds, zoom, limit)}`)
+  }
+
+  /**
+   * 服务端点位聚合，layers 默认为火锅店与茶馆
+   */
+  async getClusters(
+    zoom: number,
+    bounds?: [number, number, number, number],
+    layers?: Array<'hotpot' | 'teahouse'>
+  ): Promise<MapClusters> {
+    const params = new URLSearchParams({ zoom: String(Math.round(zoom)) })
+    if (bounds) params.set('bbox', bounds.map((value) => value.toFixed(6)).join(','))
+    if (layers) params.set('layers', layers.join(','))
+    return this.get(`/map/clusters?${params.toString()}`)
+  }
+
   // ==================== 火锅江湖 API ====================
 
   async getDensityMatrix(): Promise<Array<{ district: string; density: number; count: number }>> {
@@ -167,6 +218,85 @@ class ApiService {
     return this.get<District[]>('/insight/ranking-detail')
   }
 
+  // ==================== 批量 API ====================
+
+  /**
+   * 一次请求获取多个面板数据
+   * @param panels 面板名称，即 /api 之后的接口路径，如 'hotpot/ranking'
+   */
+  async getDashboardPanels(
+    panels: string[]
+  ): Promise<{ version: string; panels: Record<string, any>; errors: Record<string, string> }> {
+    return this.get(`/dashboard/batch?panels=${encodeURIComponent(panels.join(','))}`, false)
+  }
+
+  // ==================== 数据变更推送 ====================
+
+  /**
+   * 订阅数据变更事件，代替定时轮询
+   * 所有订阅者共用一个 EventSource；收到事件时先清除受影响命名空间的本地缓存，
+   * 再回调受影响的面板与命名空间（均为空表示全部数据可能变化），返回取消订阅函数
+   * @param onConnectionChange 连接建立/断开时回调，断开期间调用方可退回轮询
+   */
+  subscribeDataChanges(
+    onChange: (panels: string[], version: string, namespaces: string[]) => void,
+    onConnectionChange?: (connected: boolean) => void
+  ): () => void {
+    if (typeof EventSource === 'undefined') {
+      onConnectionChange?.(false)
+      return () => {}
+    }
+
+    const listener: DataChangeListener = { onChange, onConnectionChange }
+    this.dataChangeListeners.add(listener)
+    if (!this.eventSource) {
+      this.openEventSource()
+    } else if (this.streamConnected !== null) {
+      onConnectionChange?.(this.streamConnected)
+    }
+
+    return () => {
+      this.dataChangeListeners.delete(listener)
+      if (!this.dataChangeListeners.size && this.eventSource) {
+        this.eventSource.close()
+        this.eventSource = null
+        this.streamConnected = null
+        this.dataVersion = null
+      }
+    }
+  }
+
+  private openEventSource(): void {
+    const source = new EventSource(`${this.baseURL}/stream/events`)
+    this.eventSource = source
+
+    source.addEventListener('open', () => this.setStreamConnected(true))
+    // 断开后浏览器会自动重连，重连成功时再次触发 open
+    source.addEventListener('error', () => this.setStreamConnected(false))
+
+    source.addEventListener('version', (event) => {
+      const data = JSON.parse((event as MessageEvent).data)
+      // 首条事件为连接时的当前版本；断线重连后版本不同则视为全部数据可能变化
+      if (this.dataVersion !== null && data.version !== this.dataVersion) {
+        const panels: string[] = data.panels || []
+        const namespaces: string[] = data.namespaces || []
+        if (namespaces.length) {
+          namespaces.forEach((namespace) => this.clearCacheByPrefix(`/${namespace}/`))
+        } else {
+          this.clearCache()
+        }
+        this.dataChangeListeners.forEach((item) => item.onChange(panels, data.version, namespaces))
+      }
+      this.dataVersion = data.version
+    })
+  }
+
+  private setStreamConnected(connected: boolean): void {
+    if (this.streamConnected === connected) return
+    this.streamConnected = connected
+    this.dataChangeListeners.forEach((item) => item.onConnectionChange?.(connected))
+  }
+
   // ==================== 工具方法 ====================
 
   /**
@@ -183,6 +313,15 @@ class ApiService {
     this.cache.delete(endpoint)
   }
 
+  /**
+   * 清除指定前缀的所有缓存（如 '/night/' 包含带参数的接口）
+   */
+  clearCacheByPrefix(prefix: string): void {
+    for (const key of Array.from(this.cache.keys())) {
+      if (key.startsWith(prefix)) this.cache.delete(key)
+    }
+  }
+
   /**
    * 设置 API 基础 URL
    */
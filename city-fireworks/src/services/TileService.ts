@@ -0,0 +1,120 @@
+/**
+ * 静态瓦片数据服务
+ * 读取 convert_csv_to_json.py --tile-zoom 生成的 z/x/y 分片，只加载视野内的点位
+ */
+
+export interface TileManifest {
+  zoom: number
+  count: number
+  bounds: [number, number, number, number] | null // [minLng, minLat, maxLng, maxLat]
+  encodings: string[]
+  tiles: Record<string, number> // 'z/x/y' -> 点位数
+}
+
+/** 视野范围：[minLng, minLat, maxLng, maxLat] */
+export type LngLatBounds = [number, number, number, number]
+
+class TileService {
+  private static instance: TileService
+  private baseURL: string
+  private manifests: Map<string, Promise<TileManifest>> = new Map()
+  private tiles: Map<string, Promise<any[]>> = new Map()
+
+  constructor() {
+    const env = import.meta.env as any
+    this.baseURL = env.VITE_TILE_BASE_URL || '/data/tiles'
+  }
+
+  static getInstance(): TileService {
+    if (!TileService.instance) {
+      TileService.instance = new TileService()
+    }
+    return TileService.instance
+  }
+
+  /**
+   * 获取表的瓦片清单（每个表只请求一次）
+   */
+  getManifest(table: string): Promise<TileManifest> {
+    if (!this.manifests.has(table)) {
+      const request = this.fetchJson<TileManifest>(`${this.baseURL}/${table}/manifest.json`)
+      request.catch(() => this.manifests.delete(table))
+      this.manifests.set(table, request)
+    }
+    return this.manifests.get(table)!
+  }
+
+  /**
+   * 视野内有数据的瓦片编号（'z/x/y'）
+   */
+  visibleTiles(manifest: TileManifest, bounds: LngLatBounds): string[] {
+    const [minX, maxY] = lngLatToTile(bounds[0], bounds[1], manifest.zoom)
+    const [maxX, minY] = lngLatToTile(bounds[2], bounds[3], manifest.zoom)
+    const keys: string[] = []
+    for (let x = minX; x <= maxX; x++) {
+      for (let y = minY; y <= maxY; y++) {
+        const key = `${manifest.zoom}/${x}/${y}`
+        if (manifest.tiles[key]) keys.push(key)
+      }
+    }
+    return keys
+  }
+
+  /**
+   * 加载视野内的点位（已加载的瓦片直接复用），不传范围时加载全部瓦片
+   */
+  async getPoints<T = any>(table: string, bounds?: LngLatBounds): Promise<T[]> {
+    const manifest = await this.getManifest(table)
+    const keys = bounds ? this.visibleTiles(manifest, bounds) : Object.keys(manifest.tiles)
+    const tiles = await Promise.all(keys.map((key) => this.getTile(table, key)))
+    return tiles.flat() as T[]
+  }
+
+  async getHotpotPoints(bounds?: LngLatBounds) {
+    return this.getPoints('hotpot_restaurants', bounds)
+  }
+
+  async getTeahousePoints(bounds?: LngLatBounds) {
+    return this.getPoints('teahouses', bounds)
+  }
+
+  /**
+   * 清除已加载的清单与瓦片（数据更新后调用）
+   */
+  clearCache(): void {
+    this.manifests.clear()
+    this.tiles.clear()
+  }
+
+  private getTile(table: string, key: string): Promise<any[]> {
+    const cacheKey = `${table}/${key}`
+    if (!this.tiles.has(cacheKey)) {
+      const request = this.fetchJson<any[]>(`${this.baseURL}/${table}/${key}.json`)
+      request.catch(() => this.tiles.delete(cacheKey))
+      this.tiles.set(cacheKey, request)
+    }
+    return this.tiles.get(cacheKey)!
+  }
+
+  private async fetchJson<T>(url: string): Promise<T> {
+    const response = await fetch(url)
+    if (!response.ok) {
+      throw new Error(`Tile request failed: ${response.status} ${url}`)
+    }
+    return response.json()
+  }
+}
+
+/**
+ * 经纬度所在的 Web 墨卡托瓦片编号，与 convert_csv_to_json.lnglat_to_tile 一致
+ */
+export function lngLatToTile(lng: number, lat: number, zoom: number): [number, number] {
+  const n = 2 ** zoom
+  const clampedLat = Math.max(Math.min(lat, 85.05112878), -85.05112878)
+  const rad = (clampedLat * Math.PI) / 180
+  const x = Math.floor(((lng + 180) / 360) * n)
+  const y = Math.floor(((1 - Math.asinh(Math.tan(rad)) / Math.PI) / 2) * n)
+  return [Math.min(Math.max(x, 0), n - 1), Math.min(Math.max(y, 0), n - 1)]
+}
+
+export default TileService
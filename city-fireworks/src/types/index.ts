@@ -10,7 +10,16 @@ export interface District {
     lng: number
     lat: number
   }
-  boundary_coords?: number[][]
+  // 由 convert_csv_to_json.py --geometry 决定：
+  // nested=多边形列表 [多边形][环][点][经度, 纬度]，flat=扁平坐标 + 偏移，polyline=编码折线 [多边形][环]
+  boundary_coords?: number[][][][] | FlatGeometry | string[][]
+}
+
+// 扁平几何：coordinates 为 [经度, 纬度, 经度, 纬度, ...]，可直接转为 Float64Array
+export interface FlatGeometry {
+  coordinates: number[]
+  ring_starts: number[]
+  polygon_starts: number[]
 }
 
 // 火锅品牌类型
@@ -67,6 +76,36 @@ export interface Teahouse {
   }
 }
 
+// 视野内点位（/map/*-points?bbox=&zoom=&limit=）
+export interface ViewportPoints<T> {
+  bbox: [number, number, number, number] | null // [minLng, minLat, maxLng, maxLat]
+  zoom: number | null
+  limit: number
+  count: number
+  truncated: boolean // 视野内还有更多点位未返回
+  points: T[]
+}
+
+// 点位聚合（/map/clusters）：单点聚合带 id 与 layer，多点聚合带各图层数量
+export interface MapCluster {
+  lng: number
+  lat: number
+  count: number
+  id?: number
+  layer?: 'hotpot' | 'teahouse'
+  hotpot?: number
+  teahouse?: number
+}
+
+export interface MapClusters {
+  zoom: number
+  bbox: [number, number, number, number] | null
+  layers: string[]
+  total: number
+  count: number
+  clusters: MapCluster[]
+}
+
 // 夜间经济类型
 export interface NightEconomy {
   id: number
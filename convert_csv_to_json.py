@@ -5,97 +5,466 @@ CSV转JSON工具
 将output文件夹中的CSV文件转换为JSON格式，供前端使用
 """
 
+import argparse
 import csv
+import gzip
 import json
+import math
 import os
-from typing import List, Dict, Any
+import re
+import struct
+import time
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import List, Dict, Any, Optional
+
+try:
+    import brotli
+except ImportError:  # 仅 --compress br 需要
+    brotli = None
+
+# ==================== 几何解析 ====================
+# 生成器按 MySQL SRID 4326 的轴顺序写 WKT/WKB：POINT(纬度 经度)，解析时默认交换为 [经度, 纬度]
+_WKT_TOKEN = re.compile(r'\(|\)|[^()]+')
+
+# 各几何类型的嵌套层数：0=点，1=点列表，2=环列表，3=多边形列表
+_GEOMETRY_DEPTH = {
+    'Point': 0, 'LineString': 1, 'MultiPoint': 1, 'Polygon': 2, 'MultiLineString': 2, 'MultiPolygon': 3,
+}
+_WKT_TYPES = {name.upper(): name for name in _GEOMETRY_DEPTH}
+_WKB_TYPES = {1: 'Point', 2: 'LineString', 3: 'Polygon', 4: 'MultiPoint', 5: 'MultiLineString', 6: 'MultiPolygon'}
+
+# 几何输出格式：nested=GeoJSON 嵌套坐标，flat=扁平坐标数组 + 偏移，polyline=编码折线
+GEOMETRY_ENCODINGS = ('nested', 'flat', 'polyline')
+
+
+def parse_wkt(wkt: str, swap: bool = True) -> Optional[Dict[str, Any]]:
+    """
+    单次扫描解析 WKT（POINT / LINESTRING / POLYGON / MULTI*）为 GeoJSON 风格的几何，无法解析时返回 None
+
+    例：MULTIPOLYGON(((29.4 106.4, 29.7 106.4, ...))) ->
+        {'type': 'MultiPolygon', 'coordinates': [[[[106.4, 29.4], [106.4, 29.7], ...]]]}
+
+    Args:
+        swap: 坐标为 (纬度 经度) 顺序时交换为 [经度, 纬度]
+    """
+    if not wkt:
+        return None
+    kind, _, body = wkt.partition('(')
+    geometry_type = _WKT_TYPES.get(kind.strip().upper())
+    if geometry_type is None or not body:
+        return None
+
+    # 每个 '(' 开启一层列表，括号内的数字按两两一组成坐标
+    stack = [[]]
+    for token in _WKT_TOKEN.findall('(' + body):
+        if token == '(':
+            stack.append([])
+        elif token == ')':
+            if len(stack) < 2:
+                return None
+            done = stack.pop()
+            stack[-1].append(done)
+        else:
+            values = token.replace(',', ' ').split()
+            if values:
+                try:
+                    numbers = list(map(float, values))
+                except ValueError:
+                    return None
+                first, second = (numbers[1::2], numbers[0::2]) if swap else (numbers[0::2], numbers[1::2])
+                stack[-1].extend([x, y] for x, y in zip(first, second))
+    if len(stack) != 1 or not stack[0]:
+        return None
+
+    coordinates = stack[0][0]
+    if geometry_type == 'Point':
+        if not coordinates:
+            return None
+        coordinates = coordinates[0]
+    return {'type': geometry_type, 'coordinates': coordinates}
+
+
+def parse_wkb(data, swap: bool = True) -> Optional[Dict[str, Any]]:
+    """解析 WKB（bytes 或十六进制字符串）为 GeoJSON 风格的几何，坐标顺序同 parse_wkt；数据无效时返回 None"""
+    if not data:
+        return None
+    try:
+        if isinstance(data, str):
+            data = bytes.fromhex(data)
+        geometry, _ = _read_wkb(memoryview(data), 0, swap)
+    except (ValueError, IndexError, struct.error):
+        return None
+    return geometry
+
+
+def _read_wkb(data, offset: int, swap: bool):
+    order = '<' if data[offset] == 1 else '>'
+    (code,) = struct.unpack_from(order + 'I', data, offset + 1)
+    geometry_type = _WKB_TYPES.get(code % 1000)
+    if geometry_type is None:
+        raise ValueError(f"不支持的 WKB 类型: {code}")
+    offset += 5
+
+    def points(offset):
+        (count,) = struct.unpack_from(order + 'I', data, offset)
+        numbers = struct.unpack_from(f'{order}{count * 2}d', data, offset + 4)
+        first, second = (numbers[1::2], numbers[0::2]) if swap else (numbers[0::2], numbers[1::2])
+        return [[x, y] for x, y in zip(first, second)], offset + 4 + count * 16
+
+    if geometry_type == 'Point':
+        y, x = struct.unpack_from(order + 'dd', data, offset)
+        return {'type': 'Point', 'coordinates': [x, y] if swap else [y, x]}, offset + 16
+    if geometry_type == 'LineString':
+        coordinates, offset = points(offset)
+    elif geometry_type == 'Polygon':
+        (count,) = struct.unpack_from(order + 'I', data, offset)
+        offset += 4
+        coordinates = []
+        for _ in range(count):
+            ring, offset = points(offset)
+            coordinates.append(ring)
+    else:
+        # MULTI*：每个成员是一个完整的 WKB 几何
+        (count,) = struct.unpack_from(order + 'I', data, offset)
+        offset += 4
+        coordinates = []
+        for _ in range(count):
+            member, offset = _read_wkb(data, offset, swap)
+            coordinates.append(member['coordinates'])
+    return {'type': geometry_type, 'coordinates': coordinates}, offset
+
+
+def parse_geometry(value: str) -> Optional[Dict[str, Any]]:
+    """解析 WKT 或十六进制 WKB 字符串"""
+    if not value:
+        return None
+    if value[0] in '0123456789abcdefABCDEF':
+        return parse_wkb(value)
+    return parse_wkt(value)
+
 
 def parse_wkt_point(wkt: str) -> Dict[str, float]:
     """
     解析POINT WKT格式为坐标对象
-    例：POINT(106.551 29.563) -> {lng: 106.551, lat: 29.563}
+    例：POINT(29.563 106.551) -> {lng: 106.551, lat: 29.563}
     """
-    if not wkt or not wkt.startswith('POINT'):
+    geometry = parse_geometry(wkt)
+    if not geometry or geometry['type'] != 'Point':
         return {}
-    # 提取括号内的坐标
-    coords = wkt.replace('POINT(', '').replace(')', '').strip()
-    parts = coords.split()
-    if len(parts) >= 2:
-        return {
-            'lng': float(parts[0]),
-            'lat': float(parts[1])
-        }
-    return {}
+    lng, lat = geometry['coordinates']
+    return {'lng': lng, 'lat': lat}
+
+
+def _polygons(geometry: Dict[str, Any]) -> List:
+    """多边形 / 多多边形统一为多边形列表"""
+    depth = _GEOMETRY_DEPTH[geometry['type']]
+    coordinates = geometry['coordinates']
+    if depth == 3:
+        return coordinates
+    if depth == 2:
+        return [coordinates]
+    return [[coordinates]] if depth == 1 else [[[coordinates]]]
+
+
+def flatten_geometry(geometry: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    扁平坐标（可直接作为 Float64Array 交给 deck.gl 的二进制属性）
+
+    Returns:
+        {'coordinates': [lng, lat, lng, lat, ...],
+         'ring_starts': 每个环的起始顶点下标, 'polygon_starts': 每个多边形的起始环下标}
+    """
+    coordinates, ring_starts, polygon_starts = [], [], []
+    vertex = 0
+    for polygon in _polygons(geometry):
+        polygon_starts.append(len(ring_starts))
+        for ring in polygon:
+            ring_starts.append(vertex)
+            for x, y in ring:
+                coordinates.append(x)
+                coordinates.append(y)
+            vertex += len(ring)
+    return {'coordinates': coordinates, 'ring_starts': ring_starts, 'polygon_starts': polygon_starts}
+
+
+def encode_polyline(points, precision: int = 5) -> str:
+    """Google 编码折线（坐标按 纬度,经度 编码，precision=5 约 1 米精度）"""
+    factor = 10 ** precision
+    output = []
+    last_lat = last_lng = 0
+    for lng, lat in points:
+        lat_value, lng_value = round(lat * factor), round(lng * factor)
+        for delta in (lat_value - last_lat, lng_value - last_lng):
+            value = ~(delta << 1) if delta < 0 else delta << 1
+            while value >= 0x20:
+                output.append(chr((0x20 | (value & 0x1f)) + 63))
+                value >>= 5
+            output.append(chr(value + 63))
+        last_lat, last_lng = lat_value, lng_value
+    return ''.join(output)
+
+
+def encode_geometry(geometry: Optional[Dict[str, Any]], encoding: str = 'nested'):
+    """按输出格式编码面状几何：nested 为多边形列表的嵌套坐标，flat / polyline 见对应函数"""
+    if not geometry:
+        return None
+    if encoding == 'flat':
+        return flatten_geometry(geometry)
+    if encoding == 'polyline':
+        return [[encode_polyline(ring) for ring in polygon] for polygon in _polygons(geometry)]
+    return _polygons(geometry)
+
+
+def benchmark_wkt(csv_file: str, column: str = 'boundary', repeat: int = 20):
+    """在区县边界上对比 parse_wkt 与 shapely 的解析耗时"""
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        values = [row[column] for row in csv.DictReader(f) if row.get(column)]
+    if not values:
+        print(f"WARNING: No {column} values in {csv_file}")
+        return
+
+    def timed(func) -> float:
+        start = time.perf_counter()
+        for _ in range(repeat):
+            for value in values:
+                func(value)
+        return (time.perf_counter() - start) / (repeat * len(values)) * 1e6
+
+    print(f"{len(values)} geometries x {repeat} rounds ({csv_file}:{column})")
+    print(f"   parse_wkt:           {timed(parse_wkt):8.2f} us/geometry")
+    try:
+        import shapely.wkt
+        from shapely.geometry import mapping
+    except ImportError:
+        print("   shapely not installed, comparison skipped")
+        return
+
+    wkb = {value: shapely.wkt.loads(value).wkb for value in values}
+    print(f"   parse_wkb:           {timed(lambda value: parse_wkb(wkb[value])):8.2f} us/geometry")
+    print(f"   shapely.wkt.loads:   {timed(shapely.wkt.loads):8.2f} us/geometry")
+    print(f"   + mapping (GeoJSON): {timed(lambda value: mapping(shapely.wkt.loads(value))):8.2f} us/geometry")
+
+    # 结果一致性：shapely 按原始轴顺序解析，比较时不交换
+    for value in values:
+        expected = json.loads(json.dumps(mapping(shapely.wkt.loads(value))))
+        if _polygons(parse_wkt(value, swap=False)) != _polygons(expected) \
+                or _polygons(parse_wkb(wkb[value], swap=False)) != _polygons(expected):
+            print(f"   MISMATCH: {value[:60]}...")
+            return
+    print("   results match shapely")
+
+def parse_bool(value: str) -> bool:
+    return value in ('True', 'true', '1')
+
+# 表 -> {列名: 类型}，未列出的列保留为字符串，空字符串统一为 null
+TABLE_SCHEMAS = {
+    'districts': {
+        'id': int, 'area_km2': float, 'hotpot_density': float, 'population': int,
+        'vitality_score': float, 'center_lng': float, 'center_lat': float,
+    },
+    'brands': {
+        'id': int, 'market_share': float, 'avg_wait_time': int, 'store_count': int,
+    },
+    'hotpot_restaurants': {
+        'id': int, 'brand_id': int, 'district_id': int, 'price_min': int, 'price_max': int,
+        'price_avg': int, 'rating': float, 'review_count': int, 'is_24h': parse_bool, 'status': int,
+        'coordinates_lng': float, 'coordinates_lat': float,
+    },
+    'teahouses': {
+        'id': int, 'district_id': int, 'founding_year': int, 'avg_price': float, 'popularity': int,
+        'is_historic': parse_bool, 'coordinates_lng': float, 'coordinates_lat': float,
+    },
+    'night_economy_realtime': {
+        'id': int, 'hour': int, 'district_id': int, 'population_index': int,
+        'consumption_heat': float, 'metro_passengers': int, 'active_businesses': int,
+    },
+    'alerts': {
+        'id': int, 'status': int,
+    },
+}
+
+# 预压缩格式 -> 扩展名（供 nginx gzip_static / brotli_static 直接返回）
+COMPRESSIONS = {'gzip': '.gz', 'br': '.br'}
+
 
-def parse_wkt_polygon(wkt: str) -> List[List[float]]:
+class JsonArrayWriter:
+    """逐条写入紧凑 JSON 数组，可同时写出 .gz / .br 预压缩文件"""
+
+    def __init__(self, json_file: str, compress=()):
+        self._files = [open(json_file, 'wb')]
+        self._gzip = None
+        self._brotli = None
+        if 'gzip' in compress:
+            # mtime=0：相同内容生成相同的压缩文件
+            self._gzip = gzip.GzipFile(json_file + COMPRESSIONS['gzip'], 'wb', compresslevel=9, mtime=0)
+        if 'br' in compress:
+            if brotli is None:
+                raise RuntimeError("brotli 预压缩需要安装 Brotli：pip install Brotli")
+            self._brotli = brotli.Compressor(quality=11)
+            self._files.append(open(json_file + COMPRESSIONS['br'], 'wb'))
+        self.count = 0
+        self._write(b'[')
+
+    def _write(self, data: bytes):
+        self._files[0].write(data)
+        if self._gzip is not None:
+            self._gzip.write(data)
+        if self._brotli is not None:
+            self._files[1].write(self._brotli.process(data))
+
+    def write(self, row: Dict[str, Any]):
+        if self.count:
+            self._write(b',')
+        self._write(json.dumps(row, ensure_ascii=False, separators=(',', ':')).encode('utf-8'))
+        self.count += 1
+
+    def close(self):
+        self._write(b']')
+        if self._gzip is not None:
+            self._gzip.close()
+        if self._brotli is not None:
+            self._files[1].write(self._brotli.finish())
+        for f in self._files:
+            f.close()
+
+
+def lnglat_to_tile(lng: float, lat: float, zoom: int) -> tuple:
+    """经纬度所在的 Web 墨卡托瓦片编号 (x, y)，与前端地图的 z/x/y 瓦片一致"""
+    n = 1 << zoom
+    lat = max(min(lat, 85.05112878), -85.05112878)
+    x = math.floor((lng + 180.0) / 360.0 * n)
+    y = math.floor((1.0 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+
+class TileWriter:
+    """按 z/x/y 瓦片分片写出点数据，并生成索引清单 manifest.json
+
+    前端先加载清单（几 KB），再只请求视野内有数据的瓦片：
+        {tile_dir}/manifest.json
+        {tile_dir}/{z}/{x}/{y}.json
+
+    行按瓦片缓存在内存中（只有点位数据），close() 时逐个瓦片一次写完，
+    同时打开的文件数与瓦片数无关。
     """
-    解析POLYGON WKT格式为坐标数组
-    例：POLYGON((106.4 29.4 106.7 29.4 ...)) -> [[lng, lat], [lng, lat], ...]
+
+    def __init__(self, tile_dir: str, zoom: int, compress=()):
+        self.tile_dir = tile_dir
+        self.zoom = zoom
+        self.compress = compress
+        self.skipped = 0
+        self._tiles: Dict[tuple, List[Dict[str, Any]]] = {}
+        self._bounds = [math.inf, math.inf, -math.inf, -math.inf]
+
+    def write(self, row: Dict[str, Any]):
+        lng, lat = row.get('coordinates_lng'), row.get('coordinates_lat')
+        if lng is None or lat is None:
+            self.skipped += 1
+            return
+
+        self._tiles.setdefault(lnglat_to_tile(lng, lat, self.zoom), []).append(row)
+
+        bounds = self._bounds
+        bounds[0], bounds[1] = min(bounds[0], lng), min(bounds[1], lat)
+        bounds[2], bounds[3] = max(bounds[2], lng), max(bounds[3], lat)
+
+    @property
+    def tile_count(self) -> int:
+        return len(self._tiles)
+
+    def close(self) -> str:
+        """写出所有瓦片文件和清单，返回清单路径"""
+        tiles = {}
+        for (x, y), rows in sorted(self._tiles.items()):
+            tile_path = os.path.join(self.tile_dir, str(self.zoom), str(x))
+            os.makedirs(tile_path, exist_ok=True)
+            writer = JsonArrayWriter(os.path.join(tile_path, f'{y}.json'), self.compress)
+            for row in rows:
+                writer.write(row)
+            writer.close()
+            tiles[f'{self.zoom}/{x}/{y}'] = writer.count
+
+        manifest = {
+            'zoom': self.zoom,
+            'count': sum(tiles.values()),
+            'bounds': self._bounds if tiles else None,
+            'encodings': list(self.compress),
+            'tiles': tiles,
+        }
+        os.makedirs(self.tile_dir, exist_ok=True)
+        path = os.path.join(self.tile_dir, 'manifest.json')
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(manifest, f, ensure_ascii=False, separators=(',', ':'))
+        return path
+
+
+def csv_to_json(csv_file: str, json_file: str, transform_func=None, table: str = None,
+                compress=(), tile_zoom: int = None) -> int:
     """
-    if not wkt or not wkt.startswith('POLYGON'):
-        return []
-    # 提取括号内的坐标
-    coords_str = wkt.replace('POLYGON((', '').replace('))', '').strip()
-    coords = []
-    for pair in coords_str.split():
-        if ' ' in pair:
-            parts = pair.split(' ')
-            if len(parts) >= 2:
-                coords.append([float(parts[0]), float(parts[1])])
-    return coords
-
-def csv_to_json(csv_file: str, json_file: str, transform_func=None) -> List[Dict[str, Any]]:
+    将CSV文件流式转换为JSON文件（逐行读取、逐行写出，不在内存中保留整表）
+
+    Args:
+        table: 表名，决定列类型（默认取CSV文件名）
+        compress: 额外生成的预压缩文件，可选 'gzip' / 'br'
+        tile_zoom: 指定时按该级别的瓦片另外分片写出到 JSON 目录下的 tiles/{表名}/
+
+    Returns:
+        记录数
     """
-    将CSV文件转换为JSON文件
+    table = table or os.path.splitext(os.path.basename(csv_file))[0]
+    schema = TABLE_SCHEMAS.get(table, {})
+    tiles = None
+    if tile_zoom is not None:
+        tiles = TileWriter(os.path.join(os.path.dirname(json_file), 'tiles', table), tile_zoom, compress)
+
+    with open(csv_file, 'r', encoding='utf-8', newline='') as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        converters = [schema.get(column) for column in header]
+
+        writer = JsonArrayWriter(json_file, compress)
+        try:
+            for values in reader:
+                row = {}
+                for column, convert, value in zip(header, converters, values):
+                    if value == '':
+                        row[column] = None
+                    elif convert is not None:
+                        row[column] = convert(value)
+                    else:
+                        row[column] = value
+
+                # 如果有转换函数，应用转换
+                if transform_func:
+                    row = transform_func(row)
+
+                writer.write(row)
+                if tiles is not None:
+                    tiles.write(row)
+        finally:
+            writer.close()
+
+    print(f"OK {csv_file} -> {json_file} ({writer.count} records)")
+    if tiles is not None:
+        manifest = tiles.close()
+        print(f"OK {table} -> {tiles.tile_count} tiles at zoom {tile_zoom}, manifest {manifest}"
+              + (f" ({tiles.skipped} records without coordinates)" if tiles.skipped else ""))
+    return writer.count
+
+def transform_district(row: Dict[str, Any], geometry: str = 'nested') -> Dict[str, Any]:
+    """转换区县数据
+
+    Args:
+        geometry: 边界的输出格式，见 GEOMETRY_ENCODINGS
     """
-    data = []
-
-    with open(csv_file, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            # 转换数据类型
-            for key, value in row.items():
-                # 处理空字符串
-                if value == '':
-                    row[key] = None
-                # 尝试转换为数字（排除日期格式）
-                elif isinstance(value, str):
-                    # 日期格式检查
-                    if '-' in value and len(value) > 4:
-                        # 可能是日期，保留字符串
-                        pass
-                    # 纯数字检查
-                    elif value.replace('.', '').replace('-', '').isdigit():
-                        if '.' in value:
-                            row[key] = float(value)
-                        else:
-                            row[key] = int(value)
-                    # 尝试转换为布尔值
-                    elif value in ['True', 'False']:
-                        row[key] = value == 'True'
-
-            # 如果有转换函数，应用转换
-            if transform_func:
-                row = transform_func(row)
-
-            data.append(row)
-
-    # 写入JSON文件
-    with open(json_file, 'w', encoding='utf-8') as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
-
-    print(f"OK {csv_file} -> {json_file} ({len(data)} records)")
-    return data
-
-def transform_district(row: Dict[str, Any]) -> Dict[str, Any]:
-    """转换区县数据"""
     # 解析中心点坐标
     if row.get('center'):
         row['center_coords'] = parse_wkt_point(row['center'])
         del row['center']
     # 解析边界多边形
     if row.get('boundary'):
-        row['boundary_coords'] = parse_wkt_polygon(row['boundary'])
+        row['boundary_coords'] = encode_geometry(parse_geometry(row['boundary']), geometry)
         del row['boundary']
     return row
 
@@ -130,16 +499,51 @@ def transform_night_economy(row: Dict[str, Any]) -> Dict[str, Any]:
         row['time'] = dt.split(' ')[1]
     return row
 
+def convert(config: Dict[str, Any], csv_dir: str, json_dir: str, compress=(), tile_zoom: int = None,
+            geometry: str = 'nested') -> int:
+    """转换一个文件，返回记录数（文件不存在时返回 0）"""
+    csv_file = os.path.join(csv_dir, config['csv'])
+    json_file = os.path.join(json_dir, config['json'])
+
+    if not os.path.exists(csv_file):
+        print(f"WARNING: File not found: {csv_file}")
+        return 0
+
+    print(f"Converting {config['csv']}...")
+    transform = config['transform']
+    if config.get('geometry'):
+        transform = partial(transform, geometry=geometry)
+    return csv_to_json(
+        csv_file, json_file, transform, compress=compress,
+        tile_zoom=tile_zoom if config.get('tiles') else None
+    )
+
 def main():
     """主函数"""
+    parser = argparse.ArgumentParser(description='将生成的CSV转换为前端使用的JSON')
+    parser.add_argument('--csv-dir', default='./output', help='CSV目录（默认./output）')
+    parser.add_argument('--json-dir', default='./city-fireworks/public/data', help='JSON输出目录')
+    parser.add_argument('--compress', nargs='*', choices=list(COMPRESSIONS), default=[],
+                        help='同时生成预压缩文件，如 --compress gzip br')
+    parser.add_argument('--workers', type=int, default=1, help='并行转换的进程数（默认1，最多每个文件一个进程）')
+    parser.add_argument('--tile-zoom', type=int, help='另外按该级别的 z/x/y 瓦片分片写出门店/茶馆点位（建议 10~12）')
+    parser.add_argument('--geometry', choices=GEOMETRY_ENCODINGS, default='nested',
+                        help='区县边界格式：nested=嵌套坐标，flat=扁平坐标数组，polyline=编码折线（默认nested）')
+    parser.add_argument('--benchmark-wkt', action='store_true', help='在区县边界上对比 WKT 解析与 shapely 的耗时后退出')
+    args = parser.parse_args()
+
+    if args.benchmark_wkt:
+        benchmark_wkt(os.path.join(args.csv_dir, 'districts.csv'))
+        return
+
     print("=" * 60)
     print("CSV转JSON数据处理工具")
     print("=" * 60)
     print()
 
     # 输入输出目录
-    csv_dir = './output'
-    json_dir = './city-fireworks/public/data'
+    csv_dir = args.csv_dir
+    json_dir = args.json_dir
 
     # 确保输出目录存在
     os.makedirs(json_dir, exist_ok=True)
@@ -149,7 +553,8 @@ def main():
         {
             'csv': 'districts.csv',
             'json': 'districts.json',
-            'transform': transform_district
+            'transform': transform_district,
+            'geometry': True
         },
         {
             'csv': 'brands.csv',
@@ -159,12 +564,14 @@ def main():
         {
             'csv': 'hotpot_restaurants.csv',
             'json': 'hotpot_restaurants.json',
-            'transform': transform_hotpot
+            'transform': transform_hotpot,
+            'tiles': True
         },
         {
             'csv': 'teahouses.csv',
             'json': 'teahouses.json',
-            'transform': transform_teahouse
+            'transform': transform_teahouse,
+            'tiles': True
         },
         {
             'csv': 'night_economy_realtime.csv',
@@ -178,25 +585,20 @@ def main():
         }
     ]
 
-    total_records = 0
-
-    for config in conversions:
-        csv_file = os.path.join(csv_dir, config['csv'])
-        json_file = os.path.join(json_dir, config['json'])
-
-        if not os.path.exists(csv_file):
-            print(f"WARNING: File not found: {csv_file}")
-            continue
-
-        print(f"Converting {config['csv']}...")
-
-        if config['transform']:
-            data = csv_to_json(csv_file, json_file, config['transform'])
-        else:
-            data = csv_to_json(csv_file, json_file)
-
-        total_records += len(data)
-        print()
+    if args.workers > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(conversions))) as pool:
+            counts = list(pool.map(
+                convert, conversions, [csv_dir] * len(conversions), [json_dir] * len(conversions),
+                [tuple(args.compress)] * len(conversions), [args.tile_zoom] * len(conversions),
+                [args.geometry] * len(conversions)
+            ))
+    else:
+        counts = [
+            convert(config, csv_dir, json_dir, args.compress, args.tile_zoom, args.geometry)
+            for config in conversions
+        ]
+    total_records = sum(counts)
+    print()
 
     print("=" * 60)
     print(f"Conversion complete! Processed {len(conversions)} files, {total_records} records")
@@ -208,9 +610,10 @@ def main():
     print("File list:")
     for config in conversions:
         json_file = os.path.join(json_dir, config['json'])
-        if os.path.exists(json_file):
-            size = os.path.getsize(json_file) / 1024  # KB
-            print(f"   - {config['json']} ({size:.1f} KB)")
+        for path in [json_file] + [json_file + COMPRESSIONS[name] for name in args.compress]:
+            if os.path.exists(path):
+                size = os.path.getsize(path) / 1024  # KB
+                print(f"   - {os.path.basename(path)} ({size:.1f} KB)")
     print()
     print("Data is ready for frontend use!")
 
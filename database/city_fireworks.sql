@@ -195,6 +195,7 @@ CREATE TABLE `hotpot_restaurants`  (
   INDEX `idx_brand`(`brand_id` ASC) USING BTREE,
   INDEX `idx_rating`(`rating` ASC) USING BTREE,
   INDEX `idx_coordinates`(`coordinates_lng` ASC, `coordinates_lat` ASC) USING BTREE,
+  INDEX `idx_updated_at`(`updated_at` ASC) USING BTREE,
   SPATIAL INDEX `location`(`location`),
   CONSTRAINT `hotpot_restaurants_ibfk_1` FOREIGN KEY (`brand_id`) REFERENCES `brands` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT,
   CONSTRAINT `hotpot_restaurants_ibfk_2` FOREIGN KEY (`district_id`) REFERENCES `districts` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
@@ -6770,6 +6771,8 @@ CREATE TABLE `teahouses`  (
   INDEX `idx_district`(`district_id` ASC) USING BTREE,
   INDEX `idx_popularity`(`popularity` ASC) USING BTREE,
   INDEX `idx_founding_year`(`founding_year` ASC) USING BTREE,
+  INDEX `idx_update_time`(`update_time` ASC) USING BTREE,
+  INDEX `idx_coordinates`(`coordinates_lng` ASC, `coordinates_lat` ASC) USING BTREE,
   SPATIAL INDEX `location`(`location`),
   CONSTRAINT `teahouses_ibfk_1` FOREIGN KEY (`district_id`) REFERENCES `districts` (`id`) ON DELETE RESTRICT ON UPDATE RESTRICT
 ) ENGINE = InnoDB AUTO_INCREMENT = 301 CHARACTER SET = utf8mb4 COLLATE = utf8mb4_0900_ai_ci ROW_FORMAT = Dynamic;
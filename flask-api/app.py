@@ -9,8 +9,14 @@ from flask_migrate import Migrate
 from config import config
 from models import db
 from routes import register_routes
-from utils.database import init_db
+from services.change_watcher import change_watcher
+from services.snapshot_service import load_fingerprint, snapshot_store
+from utils.cache import init_cache
+from utils.data_version import data_version
+from utils.database import init_db, on_data_changed, on_external_change
 from utils.error_handler import register_error_handlers
+from utils.event_stream import init_event_stream
+from utils.http_cache import register_http_cache
 import logging
 
 def create_app(config_name=None):
@@ -25,6 +31,8 @@ def create_app(config_name=None):
     CORS(app)
     db.init_app(app)
     migrate = Migrate(app, db)
+    init_cache(app)
+    init_event_stream(app)
 
     # 注册路由
     register_routes(app)
@@ -32,9 +40,19 @@ def create_app(config_name=None):
     # 注册错误处理器
     register_error_handlers(app)
 
+    # ETag / Last-Modified 条件请求
+    register_http_cache(app)
+
+    # 快照重新加载或定期指纹检查时发现外部导入（如 get_data_to_mysql.py）的变更
+    snapshot_store.add_listener(on_data_changed)
+    change_watcher.configure(app.config.get('DATA_CHECK_INTERVAL', 30))
+    change_watcher.add_listener(on_external_change)
+
     # 初始化数据库
     with app.app_context():
         init_db()
+        # 初始版本由表指纹决定，所有 worker 一致，重启后数据未变化时客户端缓存仍然有效
+        data_version.seed(load_fingerprint())
 
     # 配置日志
     log_level = getattr(logging, app.config.get('LOG_LEVEL', 'INFO'))
@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+区县聚合性能基准
+对比「加载全部 ORM 对象后在 Python 中计数」与「数据库 GROUP BY」两种实现的
+耗时与 Python 侧内存峰值。
+
+先用数据生成脚本准备不同规模的数据，再分别运行本脚本：
+    python get_data_to_mysql.py --format db --clear --hotpot 1000000
+    cd flask-api && python bench_district_counts.py
+"""
+
+import argparse
+import time
+import tracemalloc
+
+from app import create_app
+from models import HotpotRestaurant
+from services.data_service import DataService
+
+
+def legacy_density_matrix(service: DataService):
+    """旧实现：加载全部门店后逐区县扫描"""
+    districts = service.get_districts()
+    restaurants = HotpotRestaurant.query.all()
+    return [
+        {
+            'district': d['name'],
+            'density': d['hotpot_density'],
+            'count': len([r for r in restaurants if r.district_id == d['id']])
+        }
+        for d in districts
+    ]
+
+
+def measure(func, repeat: int):
+    """返回 (平均耗时毫秒, 内存峰值KB)"""
+    tracemalloc.start()
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func()
+    elapsed = (time.perf_counter() - start) / repeat * 1000
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def main():
+    parser = argparse.ArgumentParser(description='区县聚合性能基准')
+    parser.add_argument('--repeat', type=int, default=5, help='重复次数（默认5）')
+    parser.add_argument('--skip-legacy', action='store_true', help='跳过旧实现（百万级数据时很慢）')
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        service = DataService()
+        total = HotpotRestaurant.query.count()
+        print(f"火锅门店数量: {total}")
+
+        cases = [
+            ('get_density_matrix (GROUP BY)', service.get_density_matrix),
+            ('get_hotpot_ranking (GROUP BY)', service.get_hotpot_ranking),
+        ]
+        if not args.skip_legacy:
+            cases.append(('density_matrix (旧实现)', lambda: legacy_density_matrix(service)))
+
+        for name, func in cases:
+            elapsed, peak = measure(func, args.repeat)
+            print(f"{name:35} {elapsed:>10.2f} ms  峰值内存 {peak:>10.1f} KB")
+
+
+if __name__ == '__main__':
+    main()
@@ -45,7 +45,51 @@ class Config:
     CACHE_REDIS_PORT = int(os.environ.get('REDIS_PORT', 6379))
     CACHE_REDIS_DB = int(os.environ.get('REDIS_DB', 0))
     CACHE_REDIS_PASSWORD = os.environ.get('REDIS_PASSWORD', '')
+    CACHE_KEY_PREFIX = os.environ.get('CACHE_KEY_PREFIX', 'cf:')
+    CACHE_L1_TIMEOUT = int(os.environ.get('CACHE_L1_TIMEOUT', 5))  # Redis 模式下进程内一级缓存时间（秒）
     CACHE_DEFAULT_TIMEOUT = 300
+    CACHE_MAX_ENTRIES = int(os.environ.get('CACHE_MAX_ENTRIES', 1024))          # 最大条目数
+    CACHE_MAX_BYTES = int(os.environ.get('CACHE_MAX_BYTES', 64 * 1024 * 1024))  # 最大估算字节数
+    CACHE_CLEANUP_INTERVAL = int(os.environ.get('CACHE_CLEANUP_INTERVAL', 60))  # 过期清理间隔（秒）
+    # 各接口命名空间的缓存时间（秒），数据导入时按表自动失效
+    CACHE_TIMEOUTS = {
+        'map': 600,
+        'hotpot': 300,
+        'night': 60,
+        'teahouse': 600,
+        'insight': 120,
+    }
+
+    # 地图点位视野查询：每次请求默认 / 最多返回的点位数
+    MAP_POINT_LIMIT = int(os.environ.get('MAP_POINT_LIMIT', 2000))
+    MAP_POINT_MAX_LIMIT = int(os.environ.get('MAP_POINT_MAX_LIMIT', 10000))
+
+    # 批量接口并发解析面板的线程数
+    BATCH_MAX_WORKERS = int(os.environ.get('BATCH_MAX_WORKERS', 4))
+
+    # 数据变更推送（SSE）配置
+    SSE_HEARTBEAT = int(os.environ.get('SSE_HEARTBEAT', 15))          # 心跳间隔（秒）
+    SSE_POLL_INTERVAL = int(os.environ.get('SSE_POLL_INTERVAL', 5))   # 检查外部导入与版本变化的间隔（秒）
+    SSE_QUEUE_SIZE = 16                                               # 每个连接最多积压的事件数
+
+    # 内存快照配置：聚合接口从内存列式快照计算
+    SNAPSHOT_ENABLED = os.environ.get('SNAPSHOT_ENABLED', 'true').lower() == 'true'
+    # 快照最长有效期（秒），用于感知 get_data_to_mysql.py 等外部导入
+    SNAPSHOT_MAX_AGE = int(os.environ.get('SNAPSHOT_MAX_AGE', 300))
+
+    # 表指纹（行数、最后更新时间）检查间隔（秒），发现绕过 API 的写入后失效缓存并递增数据版本；0 表示关闭
+    DATA_CHECK_INTERVAL = int(os.environ.get('DATA_CHECK_INTERVAL', 30))
+
+    # 数据导入配置（utils/database.py）
+    IMPORT_DATA_DIR = os.environ.get('IMPORT_DATA_DIR', os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), '..', 'city-fireworks', 'public', 'data'
+    ))
+    IMPORT_BATCH_SIZE = int(os.environ.get('IMPORT_BATCH_SIZE', 5000))  # 每批写入暂存表的行数
+    IMPORT_UPLOAD_DIR = os.environ.get('IMPORT_UPLOAD_DIR')                 # 上传文件暂存目录，默认系统临时目录
+    IMPORT_MAX_WORKERS = int(os.environ.get('IMPORT_MAX_WORKERS', 1))  # 后台导入线程数
+    IMPORT_MAX_UPLOAD_MB = int(os.environ.get('IMPORT_MAX_UPLOAD_MB', 200))  # 上传文件大小上限（MB）
+    # 请求体大小上限，超过时返回 413（上传文件是最大的请求体）
+    MAX_CONTENT_LENGTH = IMPORT_MAX_UPLOAD_MB * 1024 * 1024
 
     # 日志级别
     LOG_LEVEL = os.environ.get('LOG_LEVEL', 'INFO')
@@ -59,6 +59,8 @@ CREATE TABLE hotpot_restaurants (
     is_24h BOOLEAN DEFAULT FALSE COMMENT '是否24小时营业',
     open_date DATE COMMENT '开业日期',
     status TINYINT DEFAULT 1 COMMENT '营业状态：1-营业，0-停业',
+    coordinates_lng DECIMAL(10,7) COMMENT '经度',
+    coordinates_lat DECIMAL(10,7) COMMENT '纬度',
     location POINT COMMENT '坐标',
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP COMMENT '创建时间',
     updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP COMMENT '更新时间',
@@ -67,7 +69,9 @@ CREATE TABLE hotpot_restaurants (
     SPATIAL INDEX idx_location (location),
     INDEX idx_district (district_id),
     INDEX idx_brand (brand_id),
-    INDEX idx_rating (rating)
+    INDEX idx_rating (rating),
+    INDEX idx_coordinates (coordinates_lng, coordinates_lat),
+    INDEX idx_updated_at (updated_at)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='火锅店表';
 
 -- 4️⃣ 茶馆表
@@ -93,7 +97,9 @@ CREATE TABLE teahouses (
     SPATIAL INDEX idx_location (location),
     INDEX idx_district (district_id),
     INDEX idx_founding_year (founding_year),
-    INDEX idx_popularity (popularity)
+    INDEX idx_popularity (popularity),
+    INDEX idx_update_time (update_time),
+    INDEX idx_coordinates (coordinates_lng, coordinates_lat)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4 COLLATE=utf8mb4_unicode_ci COMMENT='茶馆表';
 
 -- 5️⃣ 夜间经济数据表
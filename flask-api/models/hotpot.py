@@ -63,10 +63,15 @@ class HotpotRestaurant(db.Model):
         db.Index('idx_brand', 'brand_id'),
         db.Index('idx_rating', 'rating'),
         db.Index('idx_coordinates', 'coordinates_lng', 'coordinates_lat'),
+        db.Index('idx_updated_at', 'updated_at'),
     )
 
-    def to_dict(self):
-        """转换为字典格式"""
+    def to_dict(self, include_location=True):
+        """转换为字典格式
+
+        Args:
+            include_location: 为 False 时不读取 location 几何列，坐标只取经纬度列
+        """
         data = {
             'id': self.id,
             'name': self.name,
@@ -86,7 +91,7 @@ class HotpotRestaurant(db.Model):
         }
 
         # 处理空间坐标（优先使用 location）
-        if self.location:
+        if include_location and self.location:
             location_shape = to_shape(self.location)
             coords = mapping(location_shape)['coordinates']
             # MySQL SRID 4326 存储格式是 POINT(lat lng)，所以 coords[0] 是纬度，coords[1] 是经度
@@ -55,10 +55,16 @@ class Teahouse(db.Model):
         db.Index('idx_district', 'district_id'),
         db.Index('idx_founding_year', 'founding_year'),
         db.Index('idx_popularity', 'popularity'),
+        db.Index('idx_update_time', 'update_time'),
+        db.Index('idx_coordinates', 'coordinates_lng', 'coordinates_lat'),
     )
 
-    def to_dict(self):
-        """转换为字典格式"""
+    def to_dict(self, include_location=True):
+        """转换为字典格式
+
+        Args:
+            include_location: 为 False 时不读取 location 几何列，坐标只取经纬度列
+        """
         data = {
             'id': self.id,
             'name': self.name,
@@ -83,7 +89,7 @@ class Teahouse(db.Model):
                 data['cultural_tags'] = []
 
         # 处理空间坐标（优先使用location）
-        if self.location:
+        if include_location and self.location:
             location_shape = to_shape(self.location)
             coords = mapping(location_shape)['coordinates']
             # MySQL SRID 4326 存储格式是 POINT(lat lng)，所以 coords[0] 是纬度，coords[1] 是经度
@@ -10,6 +10,9 @@ from .night_routes import register_night_routes
 from .teahouse_routes import register_teahouse_routes
 from .insight_routes import register_insight_routes
 from .export_routes import register_export_routes
+from .dashboard_routes import register_dashboard_routes
+from .stream_routes import register_stream_routes
+from .import_routes import register_import_routes
 
 
 def register_routes(app: Flask):
@@ -30,3 +33,6 @@ def register_routes(app: Flask):
     register_teahouse_routes(api)
     register_insight_routes(api)
     register_export_routes(api)
+    register_dashboard_routes(api)
+    register_stream_routes(api)
+    register_import_routes(api)
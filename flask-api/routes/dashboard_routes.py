@@ -0,0 +1,51 @@
+"""
+大屏批量数据API路由
+"""
+
+from flask import request
+from flask_restx import Resource, Namespace
+from services.dashboard_service import DashboardService, DEFAULT_PANELS
+from utils.error_handler import APIError
+from utils.response import payload_response
+
+api = Namespace('dashboard', description='大屏批量数据API')
+
+dashboard_service = DashboardService()
+
+
+def _parse_panels(value):
+    """解析面板列表，支持逗号分隔字符串或数组"""
+    if value is None:
+        return list(DEFAULT_PANELS)
+    if isinstance(value, str):
+        value = value.split(',')
+    if not isinstance(value, list):
+        raise APIError("panels 必须是面板名称数组", status_code=400)
+    panels = [str(name).strip().strip('/') for name in value if str(name).strip()]
+    if not panels:
+        raise APIError("panels 不能为空", status_code=400)
+    return panels
+
+
+@api.route('/batch')
+class DashboardBatch(Resource):
+    @api.doc('get_dashboard_batch', params={'panels': '面板名称，逗号分隔，如 hotpot/ranking,insight/alerts'})
+    def get(self):
+        """批量获取大屏面板数据"""
+        panels = _parse_panels(request.args.get('panels'))
+        return payload_response(dashboard_service.build_payload(panels))
+
+    @api.doc('post_dashboard_batch')
+    def post(self):
+        """批量获取大屏面板数据（请求体 {"panels": [...]}）"""
+        # 空请求体使用默认面板；无法解析或不是对象时返回 400
+        body = request.get_json(silent=True) if request.get_data() else {}
+        if not isinstance(body, dict):
+            raise APIError('请求体必须是 JSON 对象，如 {"panels": [...]}', status_code=400)
+        panels = _parse_panels(body.get('panels'))
+        return payload_response(dashboard_service.build_payload(panels))
+
+
+def register_dashboard_routes(main_api):
+    """注册大屏批量数据路由"""
+    main_api.add_namespace(api, path='/dashboard')
@@ -2,103 +2,147 @@
 数据导出API路由
 """
 
-from flask import request, send_file, jsonify
+from flask import request, Response, stream_with_context
 from flask_restx import Resource, Namespace
-from services.data_service import DataService
-from services.export_service import ExportService
-import os
-import tempfile
+from services.export_service import ExportService, EXPORT_FORMATS, COLUMNAR_FORMATS
+from utils.error_handler import APIError
 from datetime import datetime
 
 api = Namespace('export', description='数据导出API')
 
-data_service = DataService()
 export_service = ExportService()
 
+# 下载类型 -> (MIME 类型, 扩展名)
+DOWNLOAD_TYPES = {**EXPORT_FORMATS, 'zip': ('application/zip', '.zip')}
+
+EXPORT_PARAMS = {'gzip': '是否 gzip 压缩（true 时下载 .csv.gz）'}
+
+
+def _wants_gzip() -> bool:
+    return request.args.get('gzip', 'false').lower() in ('1', 'true', 'yes')
+
+
+def _delta_window(table_name: str):
+    """解析 since / cursor / limit 参数，均未指定时返回 None（全表导出）"""
+    since, cursor, limit = (request.args.get(name) for name in ('since', 'cursor', 'limit'))
+    if not (since or cursor or limit):
+        return None
+    try:
+        since = datetime.fromisoformat(since) if since else None
+        limit = int(limit) if limit else None
+    except ValueError:
+        raise APIError("since 须为 ISO 时间，limit 须为整数", status_code=400)
+    if limit is not None and limit <= 0:
+        raise APIError("limit 必须大于 0", status_code=400)
+    return export_service.delta_window(table_name, since=since, cursor=cursor, limit=limit)
+
+
+def _download(name: str, chunks, compress: bool, fmt: str = 'csv') -> Response:
+    """以附件形式流式返回导出文件，文件名带时间戳"""
+    mimetype, extension = DOWNLOAD_TYPES[fmt]
+    filename = f'{name}_{datetime.now().strftime("%Y%m%d_%H%M%S")}{extension}'
+    if compress:
+        filename += '.gz'
+        mimetype = 'application/gzip'
+    response = Response(stream_with_context(chunks), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename={filename}'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 
 @api.route('/all')
 class ExportAll(Resource):
     @api.doc('export_all_data')
     def get(self):
-        """导出所有数据为CSV"""
-        try:
-            file_path = export_service.export_all_data()
-            return send_file(
-                file_path,
-                as_attachment=True,
-                download_name=f'city_fireworks_all_{datetime.now().strftime("%Y%m%d")}.csv',
-                mimetype='text/csv'
-            )
-        except Exception as e:
-            return {'error': str(e)}, 500
+        """导出所有数据为 ZIP（每个表一个 CSV 文件）"""
+        return _download('city_fireworks_all', export_service.export_all_data(), False, 'zip')
 
 
 @api.route('/table/<table_name>')
 class ExportByTable(Resource):
-    @api.doc('export_by_table')
+    @api.doc('export_by_table', params={
+        **EXPORT_PARAMS,
+        'format': '导出格式：csv（默认）/ ndjson / parquet / arrow',
+        'since': '增量导出：只导出该时间（ISO 格式，含）之后更新的行',
+        'cursor': '续传游标（上一页响应头 X-Next-Cursor）',
+        'limit': '本页最多导出的行数'
+    })
     def get(self, table_name):
-        """按表导出数据"""
-        try:
-            file_path = export_service.export_by_table(table_name)
-            if not file_path:
-                return {'error': 'Invalid table name'}, 400
-
-            return send_file(
-                file_path,
-                as_attachment=True,
-                download_name=f'{table_name}_{datetime.now().strftime("%Y%m%d")}.csv',
-                mimetype='text/csv'
-            )
-        except Exception as e:
-            return {'error': str(e)}, 500
+        """按表导出数据
+
+        增量导出时响应头 X-Export-Watermark 为本次导出的上界（下次同步的 since），
+        还有剩余数据时 X-Next-Cursor 为下一页的续传游标。
+        """
+        fmt = request.args.get('format', 'csv').lower()
+        compress = _wants_gzip() and fmt not in COLUMNAR_FORMATS
+        if export_service.resolve_table(table_name) is None:
+            return {'error': 'Invalid table name'}, 400
+
+        window = _delta_window(table_name)
+        response = _download(
+            table_name, export_service.export_by_table(table_name, compress, fmt, window), compress, fmt
+        )
+        if window is not None:
+            if window.watermark:
+                response.headers['X-Export-Watermark'] = window.watermark
+            if window.next_cursor:
+                response.headers['X-Next-Cursor'] = window.next_cursor
+            response.headers['Access-Control-Expose-Headers'] = 'X-Export-Watermark, X-Next-Cursor'
+        return response
 
 
 @api.route('/districts')
 class ExportDistricts(Resource):
-    @api.doc('export_districts')
+    @api.doc('export_districts', params=EXPORT_PARAMS)
     def get(self):
         """导出区县数据"""
-        return export_service.export_districts()
+        compress = _wants_gzip()
+        return _download('districts', export_service.export_districts(compress), compress)
 
 
 @api.route('/hotpots')
 class ExportHotpots(Resource):
-    @api.doc('export_hotpots')
+    @api.doc('export_hotpots', params=EXPORT_PARAMS)
     def get(self):
         """导出火锅店数据"""
-        return export_service.export_hotpots()
+        compress = _wants_gzip()
+        return _download('hotpots', export_service.export_hotpots(compress), compress)
 
 
 @api.route('/teahouses')
 class ExportTeahouses(Resource):
-    @api.doc('export_teahouses')
+    @api.doc('export_teahouses', params=EXPORT_PARAMS)
     def get(self):
         """导出茶馆数据"""
-        return export_service.export_teahouses()
+        compress = _wants_gzip()
+        return _download('teahouses', export_service.export_teahouses(compress), compress)
 
 
 @api.route('/brands')
 class ExportBrands(Resource):
-    @api.doc('export_brands')
+    @api.doc('export_brands', params=EXPORT_PARAMS)
     def get(self):
         """导出品牌数据"""
-        return export_service.export_brands()
+        compress = _wants_gzip()
+        return _download('brands', export_service.export_brands(compress), compress)
 
 
 @api.route('/night-economy')
 class ExportNightEconomy(Resource):
-    @api.doc('export_night_economy')
+    @api.doc('export_night_economy', params=EXPORT_PARAMS)
     def get(self):
         """导出夜间经济数据"""
-        return export_service.export_night_economy()
+        compress = _wants_gzip()
+        return _download('night_economy', export_service.export_night_economy(compress), compress)
 
 
 @api.route('/alerts')
 class ExportAlerts(Resource):
-    @api.doc('export_alerts')
+    @api.doc('export_alerts', params=EXPORT_PARAMS)
     def get(self):
         """导出预警数据"""
-        return export_service.export_alerts()
+        compress = _wants_gzip()
+        return _download('alerts', export_service.export_alerts(compress), compress)
 
 
 def register_export_routes(main_api):
@@ -4,6 +4,7 @@
 
 from flask_restx import Resource, Namespace
 from services.data_service import DataService
+from utils.cache import cached_route
 
 api = Namespace('hotpot', description='火锅江湖API')
 
@@ -13,6 +14,7 @@ data_service = DataService()
 @api.route('/density-matrix')
 class DensityMatrix(Resource):
     @api.doc('get_density_matrix')
+    @cached_route('hotpot')
     def get(self):
         """获取火锅店密度矩阵"""
         return data_service.get_density_matrix()
@@ -21,6 +23,7 @@ class DensityMatrix(Resource):
 @api.route('/brand-distribution')
 class BrandDistribution(Resource):
     @api.doc('get_brand_distribution')
+    @cached_route('hotpot')
     def get(self):
         """获取品牌分布数据"""
         return data_service.get_brand_distribution()
@@ -29,6 +32,7 @@ class BrandDistribution(Resource):
 @api.route('/price-distribution')
 class PriceDistribution(Resource):
     @api.doc('get_price_distribution')
+    @cached_route('hotpot')
     def get(self):
         """获取价格分布数据"""
         return data_service.get_price_distribution()
@@ -37,6 +41,7 @@ class PriceDistribution(Resource):
 @api.route('/shop-type')
 class ShopType(Resource):
     @api.doc('get_shop_type_distribution')
+    @cached_route('hotpot')
     def get(self):
         """获取店铺类型分布"""
         return data_service.get_shop_type_distribution()
@@ -45,6 +50,7 @@ class ShopType(Resource):
 @api.route('/ranking')
 class HotpotRanking(Resource):
     @api.doc('get_hotpot_ranking')
+    @cached_route('hotpot')
     def get(self):
         """获取火锅店排名"""
         return data_service.get_hotpot_ranking()
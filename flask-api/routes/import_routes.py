@@ -0,0 +1,57 @@
+"""
+数据导入API路由
+"""
+
+from flask import current_app, request, url_for
+from flask_restx import Resource, Namespace
+from werkzeug.exceptions import RequestEntityTooLarge
+from services.import_service import ImportService
+from utils.error_handler import APIError
+
+api = Namespace('import', description='数据导入API')
+
+import_service = ImportService()
+
+
+@api.route('/data')
+class ImportData(Resource):
+    @api.doc('import_data', params={
+        'file': '上传的 CSV / JSON 文件（multipart 字段 file）',
+        'table': '导入的表名，默认由文件名推断'
+    })
+    def post(self):
+        """上传数据文件并提交后台导入任务，立即返回任务ID"""
+        try:
+            upload = request.files.get('file')
+        except RequestEntityTooLarge:
+            limit = current_app.config.get('IMPORT_MAX_UPLOAD_MB')
+            raise APIError(f"上传文件超过 {limit} MB 限制", status_code=413)
+        if upload is None or not upload.filename:
+            raise APIError("缺少上传文件（字段 file）", status_code=400)
+        job = import_service.submit(upload, request.form.get('table') or request.args.get('table'))
+        body = {'status': 'success', 'message': '导入任务已提交', 'data': job.to_dict()}
+        return body, 202, {'Location': url_for('import_job_status', job_id=job.id)}
+
+
+@api.route('/jobs')
+class ImportJobList(Resource):
+    @api.doc('list_import_jobs')
+    def get(self):
+        """最近的导入任务"""
+        return {'status': 'success', 'data': [job.to_dict() for job in import_service.list_jobs()]}
+
+
+@api.route('/jobs/<job_id>', endpoint='import_job_status')
+class ImportJobStatus(Resource):
+    @api.doc('get_import_job')
+    def get(self, job_id):
+        """导入任务的状态、进度与吞吐量（行/秒）"""
+        job = import_service.get(job_id)
+        if job is None:
+            raise APIError("导入任务不存在", status_code=404)
+        return {'status': 'success', 'data': job.to_dict()}
+
+
+def register_import_routes(main_api):
+    """注册数据导入路由"""
+    main_api.add_namespace(api, path='/import')
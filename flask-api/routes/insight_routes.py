@@ -4,6 +4,7 @@
 
 from flask_restx import Resource, Namespace
 from services.data_service import DataService
+from utils.cache import cached_route
 
 api = Namespace('insight', description='数据洞察API')
 
@@ -13,6 +14,7 @@ data_service = DataService()
 @api.route('/city-temperature')
 class CityTemperature(Resource):
     @api.doc('get_city_temperature_index')
+    @cached_route('insight')
     def get(self):
         """获取城市温度指数"""
         return data_service.get_city_temperature_index()
@@ -21,6 +23,7 @@ class CityTemperature(Resource):
 @api.route('/district-vitality')
 class DistrictVitality(Resource):
     @api.doc('get_district_vitality_ranking')
+    @cached_route('insight')
     def get(self):
         """获取区县活力排名"""
         return data_service.get_district_vitality_ranking()
@@ -29,6 +32,7 @@ class DistrictVitality(Resource):
 @api.route('/alerts')
 class Alerts(Resource):
     @api.doc('get_active_alerts')
+    @cached_route('insight')
     def get(self):
         """获取活跃预警信息"""
         return data_service.get_active_alerts()
@@ -37,6 +41,7 @@ class Alerts(Resource):
 @api.route('/temperature-detail')
 class TemperatureDetail(Resource):
     @api.doc('get_temperature_detail')
+    @cached_route('insight')
     def get(self):
         """获取温度指数详情"""
         return data_service.get_temperature_detail()
@@ -45,6 +50,7 @@ class TemperatureDetail(Resource):
 @api.route('/ranking-detail')
 class RankingDetail(Resource):
     @api.doc('get_ranking_detail')
+    @cached_route('insight')
     def get(self):
         """获取排名详情"""
         return data_service.get_ranking_detail()
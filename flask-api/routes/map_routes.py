@@ -2,18 +2,48 @@
 地图相关API路由
 """
 
+from flask import current_app, request
 from flask_restx import Resource, Namespace
 from models import District, HotpotRestaurant, Teahouse
 from services.data_service import DataService
+from utils.cache import cached_route
+from utils.error_handler import APIError
+from services.cluster_service import CLUSTER_LAYERS
+from utils.geo import MAX_ZOOM, parse_bbox
 
 api = Namespace('map', description='地图相关API')
 
 data_service = DataService()
 
+VIEWPORT_PARAMS = {
+    'bbox': '视野范围 minLng,minLat,maxLng,maxLat（指定后返回 {points, truncated, ...}）',
+    'zoom': f'地图缩放级别（0-{MAX_ZOOM}），视野按该级别的瓦片边界对齐',
+    'limit': '最多返回的点位数'
+}
+
+
+def _viewport_args():
+    """解析 bbox / zoom / limit 参数"""
+    bbox, zoom, limit = (request.args.get(name) for name in ('bbox', 'zoom', 'limit'))
+    try:
+        bbox = parse_bbox(bbox)
+        zoom = int(zoom) if zoom else None
+        limit = int(limit) if limit else None
+    except ValueError:
+        raise APIError("bbox 须为 minLng,minLat,maxLng,maxLat，zoom 与 limit 须为整数", status_code=400)
+    if zoom is not None and not 0 <= zoom <= MAX_ZOOM:
+        raise APIError(f"zoom 须在 0-{MAX_ZOOM} 之间", status_code=400)
+    if limit is not None and limit <= 0:
+        raise APIError("limit 必须大于 0", status_code=400)
+    if limit is not None:
+        limit = min(limit, current_app.config.get('MAP_POINT_MAX_LIMIT', 10000))
+    return bbox, zoom, limit
+
 
 @api.route('/districts')
 class Districts(Resource):
     @api.doc('get_districts')
+    @cached_route('map')
     def get(self):
         """获取所有区县数据"""
         return data_service.get_districts()
@@ -21,23 +51,46 @@ class Districts(Resource):
 
 @api.route('/hotpot-points')
 class HotpotPoints(Resource):
-    @api.doc('get_hotpot_points')
+    @api.doc('get_hotpot_points', params=VIEWPORT_PARAMS)
+    @cached_route('map')
     def get(self):
         """获取火锅店点位数据"""
-        return data_service.get_hotpot_points()
+        return data_service.get_hotpot_points(*_viewport_args())
 
 
 @api.route('/teahouse-points')
 class TeahousePoints(Resource):
-    @api.doc('get_teahouse_points')
+    @api.doc('get_teahouse_points', params=VIEWPORT_PARAMS)
+    @cached_route('map')
     def get(self):
         """获取茶馆点位数据"""
-        return data_service.get_teahouse_points()
+        return data_service.get_teahouse_points(*_viewport_args())
+
+
+@api.route('/clusters')
+class Clusters(Resource):
+    @api.doc('get_clusters', params={
+        'zoom': f'地图缩放级别（0-{MAX_ZOOM}），必填',
+        'bbox': '视野范围 minLng,minLat,maxLng,maxLat，默认全部',
+        'layers': '图层，逗号分隔：hotpot / teahouse，默认全部'
+    })
+    @cached_route('map')
+    def get(self):
+        """获取点位聚合数据（单点聚合带 id 与 layer，多点聚合带各图层数量）"""
+        bbox, zoom, _ = _viewport_args()
+        if zoom is None:
+            raise APIError("缺少 zoom 参数", status_code=400)
+        layers = request.args.get('layers')
+        layers = tuple(name for name in CLUSTER_LAYERS if not layers or name in layers.split(','))
+        if not layers:
+            raise APIError(f"layers 须为 {' / '.join(CLUSTER_LAYERS)}", status_code=400)
+        return data_service.get_clusters(zoom, bbox, layers)
 
 
 @api.route('/district/<int:district_id>')
 class DistrictDetail(Resource):
     @api.doc('get_district_detail')
+    @cached_route('map')
     def get(self, district_id):
         """获取指定区县详细信息"""
         return data_service.get_district_detail(district_id)
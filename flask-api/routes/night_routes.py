@@ -4,6 +4,7 @@
 
 from flask_restx import Resource, Namespace
 from services.data_service import DataService
+from utils.cache import cached_route
 
 api = Namespace('night', description='夜间经济API')
 
@@ -13,6 +14,7 @@ data_service = DataService()
 @api.route('/24hour-trend')
 class Hour24Trend(Resource):
     @api.doc('get_24hour_trend')
+    @cached_route('night')
     def get(self):
         """获取24小时趋势数据"""
         return data_service.get_24hour_trend()
@@ -21,6 +23,7 @@ class Hour24Trend(Resource):
 @api.route('/district-comparison')
 class DistrictComparison(Resource):
     @api.doc('get_district_comparison')
+    @cached_route('night')
     def get(self):
         """获取区县对比数据"""
         return data_service.get_district_comparison()
@@ -29,6 +32,7 @@ class DistrictComparison(Resource):
 @api.route('/metro-passengers/<int:hour>')
 class MetroPassengers(Resource):
     @api.doc('get_metro_passengers')
+    @cached_route('night')
     def get(self, hour):
         """获取指定小时的地铁客流数据"""
         return data_service.get_metro_passengers(hour)
@@ -37,6 +41,7 @@ class MetroPassengers(Resource):
 @api.route('/city-operation')
 class CityOperation(Resource):
     @api.doc('get_city_operation')
+    @cached_route('night')
     def get(self):
         """获取城市运行数据"""
         return data_service.get_city_operation()
@@ -0,0 +1,34 @@
+"""
+数据变更推送API路由
+"""
+
+from flask import Response
+from flask_restx import Resource, Namespace
+from utils.event_stream import event_broadcaster
+
+api = Namespace('stream', description='数据变更推送API')
+
+
+@api.route('/events')
+class Events(Resource):
+    @api.doc('get_events')
+    def get(self):
+        """订阅数据变更事件（text/event-stream）
+
+        事件 version 的 data 为 {"version", "tables", "namespaces", "panels"}，
+        前端收到后只需通过 /api/dashboard/batch 重新获取 panels 中的面板。
+        """
+        return Response(
+            event_broadcaster.stream(),
+            mimetype='text/event-stream',
+            headers={
+                'Cache-Control': 'no-cache',
+                # 关闭 Nginx 的响应缓冲，事件立即送达
+                'X-Accel-Buffering': 'no'
+            }
+        )
+
+
+def register_stream_routes(main_api):
+    """注册数据变更推送路由"""
+    main_api.add_namespace(api, path='/stream')
@@ -4,6 +4,7 @@
 
 from flask_restx import Resource, Namespace
 from services.data_service import DataService
+from utils.cache import cached_route
 
 api = Namespace('teahouse', description='茶馆岁月API')
 
@@ -13,6 +14,7 @@ data_service = DataService()
 @api.route('/time-series')
 class TimeSeries(Resource):
     @api.doc('get_time_series_data')
+    @cached_route('teahouse')
     def get(self):
         """获取茶馆时间序列数据"""
         return data_service.get_teahouse_time_series()
@@ -21,6 +23,7 @@ class TimeSeries(Resource):
 @api.route('/district-distribution')
 class DistrictDistribution(Resource):
     @api.doc('get_district_distribution')
+    @cached_route('teahouse')
     def get(self):
         """获取茶馆区域分布"""
         return data_service.get_teahouse_district_distribution()
@@ -29,6 +32,7 @@ class DistrictDistribution(Resource):
 @api.route('/cultural-tags')
 class CulturalTags(Resource):
     @api.doc('get_cultural_tags')
+    @cached_route('teahouse')
     def get(self):
         """获取文化标签"""
         return data_service.get_teahouse_cultural_tags()
@@ -37,6 +41,7 @@ class CulturalTags(Resource):
 @api.route('/timeline')
 class TeahouseTimeline(Resource):
     @api.doc('get_timeline')
+    @cached_route('teahouse')
     def get(self):
         """获取茶馆时间线数据"""
         return data_service.get_teahouse_timeline()
@@ -45,6 +50,7 @@ class TeahouseTimeline(Resource):
 @api.route('/wordcloud')
 class TeahouseWordCloud(Resource):
     @api.doc('get_wordcloud')
+    @cached_route('teahouse')
     def get(self):
         """获取茶馆词云数据"""
         return data_service.get_teahouse_wordcloud()
@@ -0,0 +1,90 @@
+"""
+数据变更检测
+定期比较各表指纹（行数、最后更新时间），发现绕过 API 的写入（如 get_data_to_mysql.py 直接导入），
+与内存快照是否启用无关
+"""
+
+from services.snapshot_service import load_fingerprint
+from typing import Callable, Dict, List, Optional
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class ChangeWatcher:
+    """表指纹检查器
+
+    - check 到期时由一个调用方查询指纹，其余调用方直接返回，不阻塞请求
+    - 首次检查只记录基准，之后指纹有变化时以变化的表名列表调用监听者
+    - 本进程导入后调用 sync 更新基准，避免同一次变更被重复通知
+    """
+
+    def __init__(self, interval: int = 30, load: Callable[[], Dict[str, tuple]] = load_fingerprint):
+        self.interval = interval
+        self._load = load
+        self._fingerprint: Optional[Dict[str, tuple]] = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def configure(self, interval: int):
+        """设置检查间隔（秒），0 表示关闭"""
+        self.interval = interval
+
+    def add_listener(self, callback):
+        """注册数据变化回调，以发生变化的表名列表调用"""
+        self._listeners.append(callback)
+
+    def check(self, force: bool = False) -> List[str]:
+        """到达检查间隔时比较一次指纹（需在应用上下文中调用）
+
+        Returns:
+            发生变化的表名列表
+        """
+        if not self.interval and not force:
+            return []
+        if not force and self._checked_at is not None and time.monotonic() - self._checked_at < self.interval:
+            return []
+        if not self._lock.acquire(blocking=False):
+            return []
+        try:
+            if not force and self._checked_at is not None and time.monotonic() - self._checked_at < self.interval:
+                return []
+            self._checked_at = time.monotonic()
+            try:
+                fingerprint = self._load()
+            except Exception as e:
+                logger.warning(f"检查数据表指纹失败: {e}")
+                return []
+            previous, self._fingerprint = self._fingerprint, fingerprint
+        finally:
+            self._lock.release()
+
+        if previous is None:
+            return []
+        changed = [table for table, value in fingerprint.items() if previous.get(table) != value]
+        if changed:
+            logger.info(f"检测到数据表变化: {', '.join(changed)}")
+            for callback in self._listeners:
+                callback(changed)
+        return changed
+
+    def sync(self, fingerprint: Dict[str, tuple] = None):
+        """以当前数据库状态（或调用方已读取的指纹）作为新的基准（不通知监听者）"""
+        if not self.interval:
+            return
+        if fingerprint is None:
+            try:
+                fingerprint = self._load()
+            except Exception as e:
+                logger.warning(f"读取数据表指纹失败: {e}")
+                return
+        with self._lock:
+            self._fingerprint = fingerprint
+            self._checked_at = time.monotonic()
+
+
+# 全局变更检测器
+change_watcher = ChangeWatcher()
@@ -0,0 +1,197 @@
+"""
+地图点位聚合服务
+按 Web 墨卡托网格对火锅店、茶馆坐标逐级聚合，索引每个数据版本只构建一次，
+任意缩放级别的查询只需在对应层级上按视野过滤
+"""
+
+from models import db, HotpotRestaurant, Teahouse
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from utils.geo import BBox, MAX_LATITUDE
+import threading
+import numpy as np
+
+# 聚合的最大缩放级别，更大的级别使用该级别的结果（此时网格约 150 米，基本都是单点）
+CLUSTER_MAX_ZOOM = 16
+
+# 网格单元边长为 256 / 2^CELL_SHIFT 像素（64 像素）；上下两级的单元按 2x2 嵌套
+CELL_SHIFT = 2
+
+# 可聚合的图层
+CLUSTER_LAYERS = ('hotpot', 'teahouse')
+
+
+class ClusterLevel:
+    """某一缩放级别的聚合结果（列式，按单元编号排序）"""
+
+    def __init__(self, cell_x, cell_y, count, sum_x, sum_y, layer_counts, point):
+        self.cell_x = cell_x
+        self.cell_y = cell_y
+        self.count = count
+        self.sum_x = sum_x
+        self.sum_y = sum_y
+        self.layer_counts = layer_counts  # (单元数, 图层数)
+        self.point = point                # 只含一个点的单元对应的点位下标，其余为 -1
+
+        self.lng, self.lat = _world_to_lnglat(sum_x / count, sum_y / count)
+
+    def parent(self) -> 'ClusterLevel':
+        """合并为上一级（单元边长加倍）"""
+        return _aggregate(
+            self.cell_x >> 1, self.cell_y >> 1, self.count, self.sum_x, self.sum_y,
+            self.layer_counts, self.point
+        )
+
+
+def _world_to_lnglat(x: np.ndarray, y: np.ndarray):
+    """utils.geo.world_to_lnglat 的向量化版本"""
+    lng = x * 360 - 180
+    lat = np.degrees(np.arctan(np.sinh(np.pi * (1 - 2 * y))))
+    return lng, lat
+
+
+def _aggregate(cell_x, cell_y, count, sum_x, sum_y, layer_counts, point) -> ClusterLevel:
+    """按单元编号合并（count 为各输入项的点数）"""
+    keys = (cell_x.astype(np.int64) << 32) | cell_y.astype(np.int64)
+    unique, first, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    size = len(unique)
+    merged_count = np.bincount(inverse, weights=count, minlength=size).astype(np.int64)
+    merged_layers = np.stack([
+        np.bincount(inverse, weights=layer_counts[:, i], minlength=size)
+        for i in range(layer_counts.shape[1])
+    ], axis=1).astype(np.int64)
+    merged_point = np.where(merged_count == 1, point[first], -1)
+    return ClusterLevel(
+        cell_x[first], cell_y[first], merged_count,
+        np.bincount(inverse, weights=sum_x, minlength=size),
+        np.bincount(inverse, weights=sum_y, minlength=size),
+        merged_layers, merged_point
+    )
+
+
+class ClusterIndex:
+    """网格聚合索引
+
+    最大级别直接由点位坐标分组，之后每一级把下一级的 2x2 单元合并，
+    构建成本约为一次排序加 CLUSTER_MAX_ZOOM 次 bincount。
+    """
+
+    def __init__(self, lng: np.ndarray, lat: np.ndarray, ids: np.ndarray, layers: np.ndarray,
+                 layer_names: Sequence[str] = CLUSTER_LAYERS, max_zoom: int = CLUSTER_MAX_ZOOM):
+        """
+        Args:
+            lng, lat: 点位经纬度（不含空值）
+            ids: 点位在原表中的 ID
+            layers: 点位所属图层在 layer_names 中的下标
+        """
+        self.ids = ids
+        self.layers = layers
+        self.layer_names = list(layer_names)
+        self.max_zoom = max_zoom
+        self.size = len(ids)
+
+        lat = np.clip(lat, -MAX_LATITUDE, MAX_LATITUDE)
+        x = (lng + 180) / 360
+        y = (1 - np.arcsinh(np.tan(np.radians(lat))) / np.pi) / 2
+        cells = 2 ** (max_zoom + CELL_SHIFT)
+        cell_x = np.clip((x * cells).astype(np.int64), 0, cells - 1)
+        cell_y = np.clip((y * cells).astype(np.int64), 0, cells - 1)
+        layer_counts = np.zeros((self.size, len(self.layer_names)), dtype=np.int64)
+        layer_counts[np.arange(self.size), layers] = 1
+
+        level = _aggregate(
+            cell_x, cell_y, np.ones(self.size, dtype=np.int64), x, y, layer_counts,
+            np.arange(self.size, dtype=np.int64)
+        )
+        self.levels: List[ClusterLevel] = [level]
+        for _ in range(max_zoom):
+            level = level.parent()
+            self.levels.append(level)
+        self.levels.reverse()  # levels[zoom]
+
+    def query(self, zoom: int, bbox: Optional[BBox] = None) -> List[Dict[str, Any]]:
+        """某缩放级别下视野内的聚合点
+
+        单点的聚合返回其 ID 与图层，多点的聚合返回各图层数量。
+        """
+        level = self.levels[min(max(zoom, 0), self.max_zoom)]
+        if bbox is None:
+            selected = np.arange(len(level.count))
+        else:
+            mask = (level.lng >= bbox[0]) & (level.lng <= bbox[2]) & \
+                   (level.lat >= bbox[1]) & (level.lat <= bbox[3])
+            selected = np.flatnonzero(mask)
+
+        lng = np.round(level.lng[selected], 7).tolist()
+        lat = np.round(level.lat[selected], 7).tolist()
+        counts = level.count[selected].tolist()
+        layer_counts = level.layer_counts[selected].tolist()
+        points = level.point[selected].tolist()
+
+        clusters = []
+        for i in range(len(counts)):
+            cluster = {'lng': lng[i], 'lat': lat[i], 'count': counts[i]}
+            if points[i] >= 0:
+                cluster['id'] = int(self.ids[points[i]])
+                cluster['layer'] = self.layer_names[self.layers[points[i]]]
+            else:
+                cluster.update(zip(self.layer_names, layer_counts[i]))
+            clusters.append(cluster)
+        return clusters
+
+    @classmethod
+    def from_layers(cls, layers: Dict[str, tuple], max_zoom: int = CLUSTER_MAX_ZOOM) -> 'ClusterIndex':
+        """由各图层的 (ID, 经度, 纬度) 列构建索引，经纬度为 NaN 的点位跳过"""
+        names = list(layers)
+        ids, lngs, lats, codes = [], [], [], []
+        for code, name in enumerate(names):
+            layer_ids, lng, lat = (np.asarray(column) for column in layers[name])
+            valid = ~(np.isnan(lng) | np.isnan(lat))
+            ids.append(layer_ids[valid].astype(np.int64))
+            lngs.append(lng[valid].astype(np.float64))
+            lats.append(lat[valid].astype(np.float64))
+            codes.append(np.full(int(valid.sum()), code, dtype=np.int64))
+
+        def concat(parts, dtype):
+            return np.concatenate(parts) if parts else np.zeros(0, dtype=dtype)
+
+        return cls(
+            concat(lngs, np.float64), concat(lats, np.float64), concat(ids, np.int64),
+            concat(codes, np.int64), names, max_zoom
+        )
+
+
+def load_layer_columns(layer: str) -> tuple:
+    """从数据库读取图层的 (ID, 经度, 纬度) 列（火锅店只取营业中的门店）"""
+    if layer == 'hotpot':
+        query = db.session.query(
+            HotpotRestaurant.id, HotpotRestaurant.coordinates_lng, HotpotRestaurant.coordinates_lat
+        ).filter(HotpotRestaurant.status == 1)
+    else:
+        query = db.session.query(Teahouse.id, Teahouse.coordinates_lng, Teahouse.coordinates_lat)
+    rows = query.all()
+    ids = np.fromiter((row[0] for row in rows), dtype=np.int64, count=len(rows))
+    lng = np.array([np.nan if row[1] is None else float(row[1]) for row in rows], dtype=np.float64)
+    lat = np.array([np.nan if row[2] is None else float(row[2]) for row in rows], dtype=np.float64)
+    return ids, lng, lat
+
+
+class ClusterIndexCache:
+    """按数据版本缓存聚合索引（未启用内存快照时使用）"""
+
+    def __init__(self):
+        self._version = None
+        self._indexes = {}
+        self._lock = threading.Lock()
+
+    def get(self, version: str, layers: tuple, build: Callable[[], ClusterIndex]) -> ClusterIndex:
+        with self._lock:
+            if version != self._version:
+                self._version, self._indexes = version, {}
+            index = self._indexes.get(layers)
+            if index is None:
+                index = self._indexes[layers] = build()
+            return index
+
+
+# 全局聚合索引缓存
+cluster_cache = ClusterIndexCache()
@@ -0,0 +1,136 @@
+"""
+大屏批量数据服务
+一次请求返回多个面板的数据，面板之间并发解析并复用接口缓存
+"""
+
+from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
+from services.data_service import DataService
+from utils.cache import cache, route_cache_key, namespace_timeout
+from utils.data_version import data_version
+from utils.error_handler import APIError
+from utils.response import encode_payload, compress_payload
+from typing import List, Dict
+import json
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+# 面板名称（即 /api 之后的接口路径） -> (缓存命名空间, DataService 方法名)
+# 返回相同数据的接口指向同一个方法，批量请求中只计算一次
+PANELS = {
+    'map/districts': ('map', 'get_districts'),
+    'map/hotpot-points': ('map', 'get_hotpot_points'),
+    'map/teahouse-points': ('map', 'get_teahouse_points'),
+    'hotpot/density-matrix': ('hotpot', 'get_density_matrix'),
+    'hotpot/brand-distribution': ('hotpot', 'get_brand_distribution'),
+    'hotpot/price-distribution': ('hotpot', 'get_price_distribution'),
+    'hotpot/shop-type': ('hotpot', 'get_shop_type_distribution'),
+    'hotpot/ranking': ('hotpot', 'get_hotpot_ranking'),
+    'night/24hour-trend': ('night', 'get_24hour_trend'),
+    'night/district-comparison': ('night', 'get_districts'),
+    'night/city-operation': ('night', 'get_city_operation'),
+    'teahouse/time-series': ('teahouse', 'get_teahouse_time_series'),
+    'teahouse/district-distribution': ('teahouse', 'get_teahouse_district_distribution'),
+    'teahouse/cultural-tags': ('teahouse', 'get_teahouse_cultural_tags'),
+    'teahouse/timeline': ('teahouse', 'get_teahouse_timeline'),
+    'teahouse/wordcloud': ('teahouse', 'get_teahouse_cultural_tags'),
+    'insight/city-temperature': ('insight', 'get_city_temperature_index'),
+    'insight/district-vitality': ('insight', 'get_district_vitality_ranking'),
+    'insight/alerts': ('insight', 'get_active_alerts'),
+    'insight/temperature-detail': ('insight', 'get_city_temperature_index'),
+    'insight/ranking-detail': ('insight', 'get_district_vitality_ranking'),
+}
+
+# 默认返回的面板（不含体积较大的点位数据）
+DEFAULT_PANELS = [name for name in PANELS if not name.endswith('-points')]
+
+
+class DashboardService:
+    """大屏批量数据服务类"""
+
+    def __init__(self):
+        self.data_service = DataService()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+
+    def build_payload(self, panels: List[str]) -> dict:
+        """解析多个面板并拼接为一个预编码的响应
+
+        各面板的 JSON 字节直接取自接口缓存并原样拼接，不重复序列化。
+
+        Returns:
+            encode_payload 格式的字典，内容为
+            {"version": ..., "panels": {面板: 数据}, "errors": {面板: 错误信息}}
+        """
+        version, _ = data_version.get()
+        bodies, errors = self.resolve(panels)
+
+        # 重复的面板只输出一次，避免生成重复的 JSON 键
+        parts = [
+            json.dumps(name, ensure_ascii=False).encode('utf-8') + b':' + bodies[name]
+            for name in dict.fromkeys(panels) if name in bodies
+        ]
+        body = b''.join([
+            b'{"version":', json.dumps(version).encode('utf-8'),
+            b',"panels":{', b','.join(parts), b'}',
+            b',"errors":', json.dumps(errors, ensure_ascii=False).encode('utf-8'),
+            b'}'
+        ])
+        return compress_payload(body)
+
+    def resolve(self, panels: List[str]):
+        """并发解析面板
+
+        Returns:
+            ({面板: JSON 字节}, {面板: 错误信息})
+        """
+        unknown = [name for name in panels if name not in PANELS]
+        if unknown:
+            raise APIError(f"未知的面板: {', '.join(unknown)}", status_code=400)
+
+        # 同一服务方法只计算一次
+        groups: Dict[str, List[str]] = {}
+        for name in dict.fromkeys(panels):
+            groups.setdefault(PANELS[name][1], []).append(name)
+
+        app = current_app._get_current_object()
+        executor = self._get_executor(app.config.get('BATCH_MAX_WORKERS', 4))
+        futures = {
+            method: executor.submit(self._load_panel, app, names[0])
+            for method, names in groups.items()
+        }
+
+        bodies, errors = {}, {}
+        for method, future in futures.items():
+            try:
+                payload = future.result()
+            except Exception as e:
+                logger.exception(f"面板数据加载失败: {method}")
+                for name in groups[method]:
+                    errors[name] = str(e)
+                continue
+            for name in groups[method]:
+                bodies[name] = payload['body']
+        return bodies, errors
+
+    def _load_panel(self, app, panel: str) -> dict:
+        """在独立的应用上下文中加载面板（与单独请求该接口共用缓存）"""
+        namespace, method = PANELS[panel]
+        with app.app_context():
+            return cache.get_or_set(
+                route_cache_key(namespace, f'/api/{panel}', {}),
+                lambda: encode_payload(getattr(self.data_service, method)()),
+                timeout=namespace_timeout(namespace)
+            )
+
+    def _get_executor(self, max_workers: int) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=max_workers, thread_name_prefix='dashboard'
+                    )
+        return self._executor
@@ -2,9 +2,15 @@
 数据服务层
 """
 
+from flask import current_app
 from models import db, District, HotpotRestaurant, Brand, Teahouse, NightEconomy, Alert
-from typing import List, Dict, Any
+from services.cluster_service import ClusterIndex, cluster_cache, load_layer_columns, CLUSTER_LAYERS
+from services.snapshot_service import snapshot_store, DataSnapshot
+from typing import List, Dict, Any, Optional
 from sqlalchemy import func, desc
+from sqlalchemy.orm import defer
+from utils.data_version import data_version
+from utils.geo import BBox, snap_bbox
 import json
 
 
@@ -14,10 +20,50 @@ class DataService:
     def __init__(self):
         pass
 
+    # ==================== 公共聚合 ====================
+
+    def _snapshot(self) -> Optional[DataSnapshot]:
+        """获取内存快照；未启用快照时返回 None，走数据库查询"""
+        if not current_app.config.get('SNAPSHOT_ENABLED', False):
+            return None
+        return snapshot_store.get(max_age=current_app.config.get('SNAPSHOT_MAX_AGE'))
+
+    def count_by_district(self, model, *criteria) -> Dict[int, int]:
+        """按区县统计记录数（在数据库中 GROUP BY district_id）
+
+        Args:
+            model: 含 district_id 字段的模型，如 HotpotRestaurant、Teahouse
+            *criteria: 额外的过滤条件
+
+        Returns:
+            {district_id: count}
+        """
+        rows = db.session.query(model.district_id, func.count(model.id))\
+            .filter(*criteria)\
+            .group_by(model.district_id)\
+            .all()
+        return {district_id: count for district_id, count in rows}
+
+    def _district_summaries(self) -> List[Dict[str, Any]]:
+        """获取区县基础字段（不加载空间数据）"""
+        rows = db.session.query(District.id, District.name, District.hotpot_density).all()
+        return [
+            {
+                'id': row.id,
+                'name': row.name,
+                'hotpot_density': float(row.hotpot_density) if row.hotpot_density else None
+            }
+            for row in rows
+        ]
+
     # ==================== 地图相关服务 ====================
 
     def get_districts(self) -> List[Dict[str, Any]]:
         """获取所有区县数据"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.districts
+
         districts = District.query.all()
         return [d.to_dict() for d in districts]
 
@@ -33,8 +79,17 @@ class DataService:
         data['teahouse_count'] = Teahouse.query.filter_by(district_id=district_id).count()
         return data
 
-    def get_hotpot_points(self) -> List[Dict[str, Any]]:
-        """获取火锅店点位数据"""
+    def get_hotpot_points(self, bbox: Optional[BBox] = None, zoom: Optional[int] = None,
+                          limit: Optional[int] = None):
+        """获取火锅店点位数据
+
+        指定 bbox / zoom / limit 任一参数时只返回视野内评分最高的 limit 个营业门店，
+        否则返回全部营业门店的列表。
+        """
+        if bbox is not None or zoom is not None or limit is not None:
+            query = HotpotRestaurant.query.filter_by(status=1)
+            return self._viewport_points(HotpotRestaurant, query, HotpotRestaurant.rating, bbox, zoom, limit)
+
         # 使用 joinedload 预加载关联数据，避免 N+1 查询
         from sqlalchemy.orm import joinedload
         restaurants = HotpotRestaurant.query\
@@ -44,8 +99,16 @@ class DataService:
             .all()
         return [r.to_dict() for r in restaurants]
 
-    def get_teahouse_points(self) -> List[Dict[str, Any]]:
-        """获取茶馆点位数据"""
+    def get_teahouse_points(self, bbox: Optional[BBox] = None, zoom: Optional[int] = None,
+                            limit: Optional[int] = None):
+        """获取茶馆点位数据
+
+        指定 bbox / zoom / limit 任一参数时只返回视野内人气最高的 limit 个茶馆，
+        否则返回全部茶馆的列表。
+        """
+        if bbox is not None or zoom is not None or limit is not None:
+            return self._viewport_points(Teahouse, Teahouse.query, Teahouse.popularity, bbox, zoom, limit)
+
         # 使用 joinedload 预加载关联数据
         from sqlalchemy.orm import joinedload
         teahouses = Teahouse.query\
@@ -53,31 +116,95 @@ class DataService:
             .all()
         return [t.to_dict() for t in teahouses]
 
+    def _viewport_points(self, model, query, rank, bbox: Optional[BBox], zoom: Optional[int],
+                         limit: Optional[int]) -> Dict[str, Any]:
+        """视野内的点位
+
+        经纬度范围条件走 (coordinates_lng, coordinates_lat) 组合索引；指定 zoom 时视野
+        先扩展到该级别的瓦片边界。不加载 location 几何列，坐标直接取经纬度列。
+        多取一行用于判断是否还有被截断的点位。
+        """
+        limit = limit or current_app.config.get('MAP_POINT_LIMIT', 2000)
+        if bbox is not None:
+            if zoom is not None:
+                bbox = snap_bbox(bbox, zoom)
+            query = query.filter(
+                model.coordinates_lng.between(bbox[0], bbox[2]),
+                model.coordinates_lat.between(bbox[1], bbox[3])
+            )
+
+        rows = query.options(defer(model.location))\
+            .order_by(desc(rank), model.id)\
+            .limit(limit + 1)\
+            .all()
+        return {
+            'bbox': [round(value, 7) for value in bbox] if bbox is not None else None,
+            'zoom': zoom,
+            'limit': limit,
+            'count': min(len(rows), limit),
+            'truncated': len(rows) > limit,
+            'points': [row.to_dict(include_location=False) for row in rows[:limit]]
+        }
+
+    def get_clusters(self, zoom: int, bbox: Optional[BBox] = None,
+                     layers: tuple = CLUSTER_LAYERS) -> Dict[str, Any]:
+        """获取点位聚合数据
+
+        聚合索引随内存快照构建（未启用快照时按数据版本缓存），查询只在对应缩放级别上按视野过滤。
+        """
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            index = snapshot.cluster_index(layers)
+        else:
+            index = cluster_cache.get(
+                data_version.get()[0], layers,
+                lambda: ClusterIndex.from_layers({layer: load_layer_columns(layer) for layer in layers})
+            )
+        clusters = index.query(zoom, bbox)
+        return {
+            'zoom': zoom,
+            'bbox': list(bbox) if bbox is not None else None,
+            'layers': list(layers),
+            'total': index.size,
+            'count': len(clusters),
+            'clusters': clusters
+        }
+
     # ==================== 火锅江湖服务 ====================
 
     def get_density_matrix(self) -> List[Dict[str, Any]]:
         """获取火锅店密度矩阵"""
-        districts = self.get_districts()
-        restaurants = HotpotRestaurant.query.all()
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.density_matrix()
+
+        counts = self.count_by_district(HotpotRestaurant)
 
         result = []
-        for district in districts:
-            count = len([r for r in restaurants if r.district_id == district['id']])
+        for district in self._district_summaries():
             result.append({
                 'district': district['name'],
                 'density': district['hotpot_density'],
-                'count': count
+                'count': counts.get(district['id'], 0)
             })
 
         return result
 
     def get_brand_distribution(self) -> List[Dict[str, Any]]:
         """获取品牌分布数据"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.brands
+
         brands = Brand.query.all()
         return [b.to_dict() for b in brands]
 
     def get_price_distribution(self) -> List[Dict[str, Any]]:
         """获取价格分布数据"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.price_distribution()
+
         restaurants = HotpotRestaurant.query.filter(
             HotpotRestaurant.price_avg.isnot(None)
         ).all()
@@ -102,6 +229,10 @@ class DataService:
 
     def get_shop_type_distribution(self) -> List[Dict[str, Any]]:
         """获取店铺类型分布"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.shop_type_distribution()
+
         restaurants = HotpotRestaurant.query.filter(
             HotpotRestaurant.shop_type.isnot(None)
         ).all()
@@ -115,23 +246,19 @@ class DataService:
 
     def get_hotpot_ranking(self) -> List[Dict[str, Any]]:
         """获取火锅店排名"""
-        districts = self.get_districts()
-        restaurants = HotpotRestaurant.query.all()
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.hotpot_ranking()
 
-        # 按区县统计火锅店数量
-        district_stats = {}
-        for district in districts:
-            district_stats[district['id']] = {
-                'name': district['name'],
-                'count': 0
-            }
+        counts = self.count_by_district(HotpotRestaurant)
 
-        for r in restaurants:
-            if r.district_id in district_stats:
-                district_stats[r.district_id]['count'] += 1
+        # 按区县统计火锅店数量
+        result = [
+            {'name': district['name'], 'count': counts.get(district['id'], 0)}
+            for district in self._district_summaries()
+        ]
 
         # 排序并返回
-        result = list(district_stats.values())
         result.sort(key=lambda x: x['count'], reverse=True)
 
         # 添加排名
@@ -144,6 +271,10 @@ class DataService:
 
     def get_24hour_trend(self) -> List[Dict[str, Any]]:
         """获取24小时趋势数据"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.hourly_trend()
+
         # 按小时聚合数据
         hourly_data = db.session.query(
             NightEconomy.hour,
@@ -173,6 +304,10 @@ class DataService:
 
     def get_city_operation(self) -> Dict[str, Any]:
         """获取城市运行数据"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.city_operation()
+
         return {
             'total_districts': District.query.count(),
             'total_hotpots': HotpotRestaurant.query.filter_by(status=1).count(),
@@ -184,6 +319,10 @@ class DataService:
 
     def get_teahouse_time_series(self) -> List[Dict[str, Any]]:
         """获取茶馆时间序列数据"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.teahouse_time_series()
+
         teahouses = Teahouse.query.filter(
             Teahouse.founding_year.isnot(None)
         ).all()
@@ -199,6 +338,10 @@ class DataService:
 
     def get_teahouse_district_distribution(self) -> List[Dict[str, Any]]:
         """获取茶馆区域分布"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.teahouse_district_distribution()
+
         teahouses = Teahouse.query.all()
         districts = {d.id: d.name for d in District.query.all()}
 
@@ -211,6 +354,10 @@ class DataService:
 
     def get_teahouse_cultural_tags(self) -> List[Dict[str, Any]]:
         """获取文化标签"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.cultural_tags
+
         teahouses = Teahouse.query.all()
         tag_count = {}
 
@@ -241,6 +388,10 @@ class DataService:
 
     def get_city_temperature_index(self) -> Dict[str, Any]:
         """计算城市温度指数"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.temperature_index()
+
         districts = District.query.all()
         restaurants = HotpotRestaurant.query.filter_by(status=1).all()
         teahouses = Teahouse.query.all()
@@ -248,8 +399,9 @@ class DataService:
 
         # 计算各维度得分
         if districts:
-            hotpot_score = sum(d.hotpot_density or 0 for d in districts) / len(districts)
-            vitality_score = sum(d.vitality_score or 0 for d in districts) / len(districts)
+            # Numeric 列为 Decimal，转为 float 后才能与浮点权重相乘
+            hotpot_score = sum(float(d.hotpot_density or 0) for d in districts) / len(districts)
+            vitality_score = sum(float(d.vitality_score or 0) for d in districts) / len(districts)
         else:
             hotpot_score = 0
             vitality_score = 0
@@ -284,11 +436,19 @@ class DataService:
 
     def get_district_vitality_ranking(self) -> List[Dict[str, Any]]:
         """获取区县活力排名"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.districts_by_vitality
+
         districts = District.query.order_by(desc(District.vitality_score)).all()
         return [d.to_dict() for d in districts]
 
     def get_active_alerts(self) -> List[Dict[str, Any]]:
         """获取活跃预警"""
+        snapshot = self._snapshot()
+        if snapshot is not None:
+            return snapshot.active_alerts
+
         alerts = Alert.query.filter_by(status=1).order_by(desc(Alert.alert_time)).all()
         return [a.to_dict() for a in alerts]
 
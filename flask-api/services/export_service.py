@@ -1,161 +1,503 @@
 """
 数据导出服务
+按批从服务端游标读取数据并逐块生成 CSV / NDJSON / Parquet / Arrow，内存占用与表大小无关
 """
 
-from models import District, HotpotRestaurant, Brand, Teahouse, NightEconomy, Alert
+from flask import current_app
+from models import db, District, HotpotRestaurant, Brand, Teahouse, NightEconomy, Alert
+from geoalchemy2 import Geometry
+from itsdangerous import URLSafeSerializer, BadSignature
+from sqlalchemy import select, types, func, and_, or_, false
+from datetime import date, datetime, time
+from decimal import Decimal
+from typing import Iterator, Optional
+from utils.error_handler import APIError
+from utils.response import json_default
+from concurrent.futures import ThreadPoolExecutor
+from utils.zip_stream import ZipStreamWriter
 import csv
-import os
-import tempfile
-from datetime import datetime
-from typing import List, Dict, Any, Optional
+import io
+import json
+import queue
+import threading
+import zlib
 
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - 未安装 pyarrow 时只支持文本格式
+    pa = pq = None
 
-class ExportService:
-    """数据导出服务类"""
+# 每批从数据库读取的行数
+EXPORT_BATCH_SIZE = 1000
+
+# Parquet / Arrow 每个行组（记录批次）的行数
+ROW_GROUP_SIZE = 65536
+
+# 全量归档时每个表最多积压的压缩数据块数
+ARCHIVE_QUEUE_SIZE = 64
+
+# 导出格式 -> (MIME 类型, 扩展名)
+EXPORT_FORMATS = {
+    'csv': ('text/csv', '.csv'),
+    'ndjson': ('application/x-ndjson', '.ndjson'),
+    'parquet': ('application/vnd.apache.parquet', '.parquet'),
+    'arrow': ('application/vnd.apache.arrow.stream', '.arrows'),
+}
+
+# 列式格式自带压缩，不再整体 gzip
+COLUMNAR_FORMATS = ('parquet', 'arrow')
+
+# gzip 压缩级别
+GZIP_LEVEL = 6
+
+# 导出表名 -> (模型, 导出列)
+EXPORT_TABLES = {
+    'districts': (District, [
+        'id', 'name', 'area_km2', 'hotpot_density', 'population', 'vitality_score'
+    ]),
+    'hotpots': (HotpotRestaurant, [
+        'id', 'name', 'brand_id', 'address', 'district_id',
+        'price_min', 'price_max', 'price_avg', 'rating', 'review_count',
+        'shop_type', 'business_hours', 'is_24h', 'open_date', 'status',
+        'coordinates_lng', 'coordinates_lat'
+    ]),
+    'teahouses': (Teahouse, [
+        'id', 'name', 'address', 'district_id', 'founding_year',
+        'tea_type', 'avg_price', 'popularity', 'is_historic',
+        'community_type', 'cultural_tags', 'update_time',
+        'coordinates_lng', 'coordinates_lat'
+    ]),
+    'brands': (Brand, [
+        'id', 'name', 'market_share', 'avg_wait_time',
+        'store_count', 'price_position', 'update_date'
+    ]),
+    'night_economy': (NightEconomy, [
+        'id', 'timestamp', 'hour', 'district_id', 'population_index',
+        'consumption_heat', 'metro_passengers', 'active_businesses',
+        'weather', 'special_event', 'date', 'time'
+    ]),
+    'alerts': (Alert, [
+        'id', 'alert_time', 'alert_type', 'content', 'impact_value', 'status'
+    ]),
+}
+
+# 增量导出使用的水位列（表名 -> 更新时间列）
+WATERMARK_COLUMNS = {
+    'hotpots': 'updated_at',
+    'teahouses': 'update_time',
+    'night_economy': 'timestamp',
+}
+
+# URL 中使用的表名别名
+TABLE_ALIASES = {
+    'night-economy': 'night_economy',
+}
+
+
+def _arrow_type(column_type):
+    """SQLAlchemy 列类型 -> Arrow 类型"""
+    if isinstance(column_type, Geometry):
+        return pa.binary()  # WKB
+    if isinstance(column_type, types.Boolean):
+        return pa.bool_()
+    if isinstance(column_type, types.SmallInteger):
+        return pa.int16()
+    if isinstance(column_type, types.BigInteger):
+        return pa.int64()
+    if isinstance(column_type, types.Integer):
+        return pa.int32()
+    if isinstance(column_type, types.Float):
+        return pa.float64()
+    if isinstance(column_type, types.Numeric):
+        return pa.decimal128(column_type.precision or 38, column_type.scale or 0)
+    if isinstance(column_type, types.DateTime):
+        return pa.timestamp('us')
+    if isinstance(column_type, types.Date):
+        return pa.date32()
+    if isinstance(column_type, types.Time):
+        return pa.time64('us')
+    return pa.string()
+
+
+def _wkb(value):
+    """几何列转为 WKB 字节"""
+    if value is None:
+        return None
+    data = getattr(value, 'data', value)
+    return bytes.fromhex(data) if isinstance(data, str) else bytes(data)
+
+
+class _ChunkSink(io.RawIOBase):
+    """可随时取走已写入字节的输出对象，供 Parquet / Arrow 写入器逐块输出"""
 
     def __init__(self):
-        self.temp_dir = tempfile.gettempdir()
+        super().__init__()
+        self._chunks = []
+        self._position = 0
 
-    def export_districts(self) -> str:
-        """导出区县数据为CSV"""
-        filename = os.path.join(self.temp_dir, f'districts_{datetime.now().strftime("%Y%m%d")}.csv')
-        districts = District.query.all()
+    def writable(self):
+        return True
+
+    def write(self, data):
+        data = bytes(data)
+        self._chunks.append(data)
+        self._position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b''.join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def _format_value(value):
+    """与 to_dict 保持一致的单元格格式"""
+    if value is None:
+        return ''
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, time):
+        return str(value)
+    return value
+
+
+class DeltaWindow:
+    """增量导出窗口
 
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=['id', 'name', 'area_km2', 'hotpot_density', 'population', 'vitality_score'])
-            writer.writeheader()
-            for d in districts:
-                writer.writerow(d.to_dict())
+    按 (水位列, id) 排序，导出 since 之后、watermark 之前（含）的行；
+    指定 limit 时预先算出本页最后一行，生成下一页的续传游标。
+    """
 
-        return filename
+    def __init__(self, criteria, order_by, watermark=None, next_cursor=None):
+        self.criteria = criteria
+        self.order_by = order_by
+        self.watermark = watermark        # 本次导出的上界，下次同步作为 since
+        self.next_cursor = next_cursor    # 还有剩余数据时的续传游标
+
+
+class ExportService:
+    """数据导出服务类
+
+    export_* 方法返回 CSV 字节块的生成器，由路由直接写入响应；
+    生成器需在应用上下文中迭代（路由使用 stream_with_context）。
+    """
+
+    def __init__(self, batch_size: int = EXPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+
+    def resolve_table(self, table_name: str) -> Optional[str]:
+        """规范化表名，未知表返回 None"""
+        table_name = TABLE_ALIASES.get(table_name, table_name)
+        return table_name if table_name in EXPORT_TABLES else None
+
+    def export_districts(self, compress: bool = False) -> Iterator[bytes]:
+        """导出区县数据为CSV"""
+        return self.export_table('districts', compress)
 
-    def export_hotpots(self) -> str:
+    def export_hotpots(self, compress: bool = False) -> Iterator[bytes]:
         """导出火锅店数据为CSV"""
-        filename = os.path.join(self.temp_dir, f'hotpots_{datetime.now().strftime("%Y%m%d")}.csv')
-        restaurants = HotpotRestaurant.query.all()
-
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'id', 'name', 'brand_id', 'address', 'district_id',
-                'price_min', 'price_max', 'price_avg', 'rating', 'review_count',
-                'shop_type', 'business_hours', 'is_24h', 'open_date', 'status'
-            ])
-            writer.writeheader()
-            for r in restaurants:
-                writer.writerow(r.to_dict())
-
-        return filename
-
-    def export_teahouses(self) -> str:
-        """导出茶馆数据为CSV"""
-        filename = os.path.join(self.temp_dir, f'teahouses_{datetime.now().strftime("%Y%m%d")}.csv')
-        teahouses = Teahouse.query.all()
-
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'id', 'name', 'address', 'district_id', 'founding_year',
-                'tea_type', 'avg_price', 'popularity', 'is_historic',
-                'community_type', 'cultural_tags', 'update_time'
-            ])
-            writer.writeheader()
-            for t in teahouses:
-                writer.writerow(t.to_dict())
-
-        return filename
-
-    def export_brands(self) -> str:
-        """导出品牌数据为CSV"""
-        filename = os.path.join(self.temp_dir, f'brands_{datetime.now().strftime("%Y%m%d")}.csv')
-        brands = Brand.query.all()
+        return self.export_table('hotpots', compress)
 
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'id', 'name', 'market_share', 'avg_wait_time',
-                'store_count', 'price_position', 'update_date'
-            ])
-            writer.writeheader()
-            for b in brands:
-                writer.writerow(b.to_dict())
+    def export_teahouses(self, compress: bool = False) -> Iterator[bytes]:
+        """导出茶馆数据为CSV"""
+        return self.export_table('teahouses', compress)
 
-        return filename
+    def export_brands(self, compress: bool = False) -> Iterator[bytes]:
+        """导出品牌数据为CSV"""
+        return self.export_table('brands', compress)
 
-    def export_night_economy(self) -> str:
+    def export_night_economy(self, compress: bool = False) -> Iterator[bytes]:
         """导出夜间经济数据为CSV"""
-        filename = os.path.join(self.temp_dir, f'night_economy_{datetime.now().strftime("%Y%m%d")}.csv')
-        data = NightEconomy.query.all()
-
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'id', 'timestamp', 'hour', 'district_id', 'population_index',
-                'consumption_heat', 'metro_passengers', 'active_businesses',
-                'weather', 'special_event', 'date', 'time'
-            ])
-            writer.writeheader()
-            for item in data:
-                writer.writerow(item.to_dict())
-
-        return filename
-
-    def export_alerts(self) -> str:
+        return self.export_table('night_economy', compress)
+
+    def export_alerts(self, compress: bool = False) -> Iterator[bytes]:
         """导出预警数据为CSV"""
-        filename = os.path.join(self.temp_dir, f'alerts_{datetime.now().strftime("%Y%m%d")}.csv')
-        alerts = Alert.query.all()
-
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            writer = csv.DictWriter(f, fieldnames=[
-                'id', 'alert_time', 'alert_type', 'content', 'impact_value', 'status'
-            ])
-            writer.writeheader()
-            for a in alerts:
-                writer.writerow(a.to_dict())
-
-        return filename
-
-    def export_by_table(self, table_name: str) -> Optional[str]:
-        """按表名导出数据"""
-        export_map = {
-            'districts': self.export_districts,
-            'hotpots': self.export_hotpots,
-            'teahouses': self.export_teahouses,
-            'brands': self.export_brands,
-            'night-economy': self.export_night_economy,
-            'night_economy': self.export_night_economy,
-            'alerts': self.export_alerts
+        return self.export_table('alerts', compress)
+
+    def export_by_table(self, table_name: str, compress: bool = False, fmt: str = 'csv',
+                        window: Optional[DeltaWindow] = None) -> Optional[Iterator[bytes]]:
+        """按表名导出数据，未知表返回 None
+
+        Args:
+            fmt: csv / ndjson / parquet / arrow
+            window: 增量导出窗口（见 delta_window），为空时导出全表
+        """
+        table_name = self.resolve_table(table_name)
+        if table_name is None:
+            return None
+        return self.export_table(table_name, compress, fmt, window)
+
+    def export_table(self, table_name: str, compress: bool = False, fmt: str = 'csv',
+                     window: Optional[DeltaWindow] = None) -> Iterator[bytes]:
+        """导出单个表"""
+        if fmt not in EXPORT_FORMATS:
+            raise APIError(f"不支持的导出格式: {fmt}", status_code=400)
+        if fmt == 'ndjson':
+            return self._encode(self._ndjson_chunks(table_name, window), compress)
+        if fmt in COLUMNAR_FORMATS:
+            if pa is None:
+                raise APIError(f"导出 {fmt} 需要安装 pyarrow", status_code=501)
+            schema = self.arrow_schema(table_name)
+            if fmt == 'parquet':
+                return self._parquet_chunks(table_name, schema, window)
+            return self._arrow_chunks(table_name, schema, window)
+        return self._encode(self._table_chunks(table_name, with_bom=True, window=window), compress)
+
+    def delta_window(self, table_name: str, since: Optional[datetime] = None,
+                     cursor: Optional[str] = None, limit: Optional[int] = None) -> DeltaWindow:
+        """构造增量导出窗口
+
+        Args:
+            since: 只导出水位列 >= since 的行（含边界，重复行由下游按 id 去重）
+            cursor: 上一页返回的续传游标，优先于 since
+            limit: 本页最多导出的行数
+        """
+        table_name = self.resolve_table(table_name)
+        column_name = WATERMARK_COLUMNS.get(table_name)
+        if column_name is None:
+            raise APIError(f"表 {table_name} 不支持增量导出", status_code=400)
+
+        model, _ = EXPORT_TABLES[table_name]
+        watermark, pk = getattr(model, column_name), model.id
+        serializer = URLSafeSerializer(current_app.config['SECRET_KEY'], salt='export-cursor')
+
+        if cursor:
+            try:
+                state = serializer.loads(cursor)
+            except BadSignature:
+                raise APIError("无效的续传游标", status_code=400)
+            if state.get('table') != table_name:
+                raise APIError("续传游标与导出表不匹配", status_code=400)
+            after = datetime.fromisoformat(state['ts'])
+            upper = datetime.fromisoformat(state['until'])
+            criteria = [or_(watermark > after, and_(watermark == after, pk > state['id']))]
+        else:
+            # 固定本次导出的上界，导出过程中更新的行留给下一次同步
+            upper = db.session.execute(select(func.max(watermark))).scalar()
+            criteria = [watermark >= since] if since else []
+        criteria.append(watermark <= upper if upper is not None else false())
+
+        next_cursor = None
+        if limit and upper is not None:
+            boundary = db.session.execute(
+                select(watermark, pk).where(*criteria)
+                .order_by(watermark, pk).offset(limit - 1).limit(2)
+            ).all()
+            if len(boundary) == 2:
+                last_ts, last_id = boundary[0]
+                criteria.append(or_(watermark < last_ts, and_(watermark == last_ts, pk <= last_id)))
+                next_cursor = serializer.dumps({
+                    'table': table_name,
+                    'ts': last_ts.isoformat(),
+                    'id': last_id,
+                    'until': upper.isoformat()
+                })
+
+        return DeltaWindow(
+            criteria, [watermark, pk],
+            watermark=upper.isoformat() if upper is not None else None,
+            next_cursor=next_cursor
+        )
+
+    def arrow_schema(self, table_name: str):
+        """由模型列类型推导 Arrow schema（导出列 + 几何列，几何列为 WKB）"""
+        model, _ = EXPORT_TABLES[table_name]
+        fields = []
+        for name in self._typed_columns(table_name):
+            column = model.__table__.columns[name]
+            metadata = None
+            if isinstance(column.type, Geometry):
+                metadata = {'encoding': 'WKB', 'srid': str(column.type.srid)}
+            fields.append(pa.field(name, _arrow_type(column.type), nullable=column.nullable, metadata=metadata))
+        return pa.schema(fields)
+
+    def export_all_data(self) -> Iterator[bytes]:
+        """导出所有数据为 ZIP 归档（每个表一个 CSV 文件）
+
+        每个表由独立线程在自己的应用上下文（独立的连接）中读取并压缩，
+        压缩后的数据块经有界队列交给响应线程按条目顺序写出：
+        已读完的表优先写出，其余按积压最多的表依次写出，
+        总耗时接近最大的表，内存占用不超过各队列上限之和。
+        """
+        app = current_app._get_current_object()
+        stop = threading.Event()
+        queues = {name: queue.Queue(maxsize=ARCHIVE_QUEUE_SIZE) for name in EXPORT_TABLES}
+        executor = ThreadPoolExecutor(max_workers=len(queues), thread_name_prefix='export')
+        futures = {
+            name: executor.submit(self._compress_table, app, name, q, stop)
+            for name, q in queues.items()
         }
 
-        if table_name in export_map:
-            return export_map[table_name]()
+        writer = ZipStreamWriter()
+        modified = datetime.now()
+        try:
+            pending = list(queues)
+            while pending:
+                name = self._next_entry(pending, queues, futures)
+                pending.remove(name)
+                yield writer.begin_entry(f'{name}.csv', modified)
+                while True:
+                    item = queues[name].get()
+                    if isinstance(item, Exception):
+                        raise item
+                    if isinstance(item, tuple):
+                        yield writer.end_entry(*item)
+                        break
+                    yield writer.data(item)
+            yield writer.finish()
+        finally:
+            stop.set()
+            executor.shutdown(wait=False)
 
-        return None
+    # ==================== 内部方法 ====================
+
+    @staticmethod
+    def _next_entry(pending, queues, futures) -> str:
+        """下一个写入归档的表：已读完的优先，否则选积压最多的"""
+        finished = [name for name in pending if futures[name].done()]
+        if finished:
+            return finished[0]
+        return max(pending, key=lambda name: queues[name].qsize())
+
+    def _compress_table(self, app, table_name: str, q: queue.Queue, stop: threading.Event):
+        """工作线程：读取一个表并 raw deflate 压缩，结束时放入 (crc, 压缩大小, 原始大小)"""
+        def put(item) -> bool:
+            while not stop.is_set():
+                try:
+                    q.put(item, timeout=0.5)
+                    return True
+                except queue.Full:
+                    continue
+            return False
+
+        try:
+            with app.app_context():
+                compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, -15)
+                crc = size = compressed_size = 0
+                for chunk in self._table_chunks(table_name, with_bom=True):
+                    data = chunk.encode('utf-8')
+                    crc = zlib.crc32(data, crc)
+                    size += len(data)
+                    block = compressor.compress(data)
+                    if block:
+                        compressed_size += len(block)
+                        if not put(block):
+                            return
+                block = compressor.flush()
+                compressed_size += len(block)
+                if put(block):
+                    put((crc, compressed_size, size))
+        except Exception as e:
+            put(e)
+
+    def iter_rows(self, table_name: str, columns=None, batch_size: Optional[int] = None,
+                  window: Optional[DeltaWindow] = None) -> Iterator[list]:
+        """按批读取表数据（服务端游标），每次返回一批行"""
+        model, default_columns = EXPORT_TABLES[table_name]
+        stmt = select(*[getattr(model, name) for name in columns or default_columns])
+        if window is not None:
+            stmt = stmt.where(*window.criteria).order_by(*window.order_by)
+        else:
+            stmt = stmt.order_by(model.id)
+        stmt = stmt.execution_options(stream_results=True, yield_per=batch_size or self.batch_size)
+        result = db.session.execute(stmt)
+        try:
+            for partition in result.partitions():
+                yield partition
+        finally:
+            result.close()
+
+    def _table_chunks(self, table_name: str, with_bom: bool = False,
+                      window: Optional[DeltaWindow] = None) -> Iterator[str]:
+        """逐批生成 CSV 文本（含表头）"""
+        _, columns = EXPORT_TABLES[table_name]
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+
+        if with_bom:
+            buffer.write('\ufeff')
+        writer.writerow(columns)
+
+        for rows in self.iter_rows(table_name, window=window):
+            writer.writerows([_format_value(value) for value in row] for row in rows)
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+        if buffer.tell():
+            yield buffer.getvalue()
+
+    def _ndjson_chunks(self, table_name: str, window: Optional[DeltaWindow] = None) -> Iterator[str]:
+        """逐批生成 NDJSON 文本（每行一个 JSON 对象）"""
+        _, columns = EXPORT_TABLES[table_name]
+        for rows in self.iter_rows(table_name, window=window):
+            yield ''.join(
+                json.dumps(dict(zip(columns, row)), ensure_ascii=False, default=json_default) + '\n'
+                for row in rows
+            )
+
+    def _typed_columns(self, table_name: str) -> list:
+        model, columns = EXPORT_TABLES[table_name]
+        geometry = [
+            column.name for column in model.__table__.columns
+            if isinstance(column.type, Geometry)
+        ]
+        return columns + geometry
+
+    def _record_batches(self, table_name: str, schema, window: Optional[DeltaWindow] = None) -> Iterator:
+        """按行组读取并转换为 Arrow 记录批次"""
+        columns = self._typed_columns(table_name)
+        geometry = [pa.types.is_binary(field.type) for field in schema]
+        for rows in self.iter_rows(table_name, columns, ROW_GROUP_SIZE, window):
+            arrays = []
+            for i, values in enumerate(zip(*rows)):
+                if geometry[i]:
+                    values = [_wkb(value) for value in values]
+                arrays.append(pa.array(values, type=schema.field(i).type))
+            yield pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+    def _parquet_chunks(self, table_name: str, schema, window: Optional[DeltaWindow] = None) -> Iterator[bytes]:
+        """逐行组生成 Parquet 文件字节"""
+        sink = _ChunkSink()
+        writer = pq.ParquetWriter(sink, schema, compression='zstd')
+        try:
+            for batch in self._record_batches(table_name, schema, window):
+                writer.write_batch(batch, row_group_size=ROW_GROUP_SIZE)
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    def _arrow_chunks(self, table_name: str, schema, window: Optional[DeltaWindow] = None) -> Iterator[bytes]:
+        """逐批生成 Arrow IPC 流字节"""
+        sink = _ChunkSink()
+        options = pa.ipc.IpcWriteOptions(compression='zstd')
+        writer = pa.ipc.new_stream(sink, schema, options=options)
+        try:
+            for batch in self._record_batches(table_name, schema, window):
+                writer.write_batch(batch)
+                yield sink.drain()
+        finally:
+            writer.close()
+        yield sink.drain()
+
+    @staticmethod
+    def _encode(chunks: Iterator[str], compress: bool) -> Iterator[bytes]:
+        """编码为 UTF-8，可选边生成边 gzip 压缩"""
+        if not compress:
+            for chunk in chunks:
+                yield chunk.encode('utf-8')
+            return
 
-    def export_all_data(self) -> str:
-        """导出所有数据为CSV（合并所有表）"""
-        filename = os.path.join(self.temp_dir, f'city_fireworks_all_{datetime.now().strftime("%Y%m%d")}.csv')
-
-        with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
-            # 分别导出各个表到不同的临时文件
-            tables = {
-                'districts': District.query.all(),
-                'hotpots': HotpotRestaurant.query.all(),
-                'teahouses': Teahouse.query.all(),
-                'brands': Brand.query.all(),
-                'night_economy': NightEconomy.query.all(),
-                'alerts': Alert.query.all()
-            }
-
-            # 先写入表头信息
-            for table_name, data in tables.items():
-                f.write(f'# {table_name}\n')
-                if data:
-                    # 获取字段名
-                    fieldnames = list(data[0].to_dict().keys())
-                    writer = csv.DictWriter(f, fieldnames=fieldnames)
-                    writer.writeheader()
-
-                    # 写入数据
-                    for item in data:
-                        writer.writerow(item.to_dict())
-
-                f.write('\n\n')  # 表之间空行分隔
-
-        return filename
+        compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 31)  # wbits=31 输出 gzip 格式
+        for chunk in chunks:
+            data = compressor.compress(chunk.encode('utf-8'))
+            if data:
+                yield data
+        yield compressor.flush()
@@ -0,0 +1,186 @@
+"""
+数据导入服务
+上传的 CSV / JSON 文件先落盘，再由后台线程批量导入，请求立即返回任务ID
+"""
+
+from flask import current_app
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Optional
+from utils.database import IMPORT_SOURCES, import_file
+from utils.error_handler import APIError
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+# 支持上传的文件扩展名
+IMPORT_EXTENSIONS = ('.csv', '.json')
+
+# 最多保留的任务记录数（超出后删除最早结束的任务）
+MAX_JOBS = 100
+
+# 导出接口使用的表名 -> 导入表名
+TABLE_ALIASES = {
+    'hotpots': 'hotpot_restaurants',
+    'night-economy': 'night_economy',
+}
+
+
+def resolve_import_table(name: str) -> Optional[str]:
+    """由表名或文件名推断导入的表
+
+    支持表名、数据文件名（如 night_economy_realtime）以及导出文件名（如 hotpots_20250101_120000）。
+    """
+    name = os.path.splitext(os.path.basename(name or ''))[0].lower()
+    if not name:
+        return None
+    candidates = {table: table for table in IMPORT_SOURCES}
+    candidates.update({os.path.splitext(filename)[0]: table for table, (filename, _) in IMPORT_SOURCES.items()})
+    candidates.update(TABLE_ALIASES)
+    if name in candidates:
+        return candidates[name]
+    # 带时间戳等后缀的文件名取最长的前缀匹配
+    prefixes = [prefix for prefix in candidates if name.startswith(prefix + '_')]
+    return candidates[max(prefixes, key=len)] if prefixes else None
+
+
+class ImportJob:
+    """一次后台导入任务的状态"""
+
+    def __init__(self, table: str, filename: str, path: str, size: int):
+        self.id = uuid.uuid4().hex
+        self.table = table
+        self.filename = filename
+        self.path = path
+        self.size = size
+        self.status = 'queued'
+        self.rows = 0
+        self.progress = 0.0
+        self.error = None
+        self.created_at = datetime.now()
+        self.started_at = None
+        self.finished_at = None
+        self._started = None
+        self._elapsed = 0.0
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ('succeeded', 'failed')
+
+    def start(self):
+        self.status = 'running'
+        self.started_at = datetime.now()
+        self._started = time.perf_counter()
+
+    def update(self, rows: int, progress: float):
+        self.rows = rows
+        self.progress = progress
+        self._elapsed = time.perf_counter() - self._started
+
+    def finish(self, rows: int = None, error: str = None):
+        if rows is not None:
+            self.rows = rows
+            self.progress = 1.0
+        self.error = error
+        self.status = 'failed' if error else 'succeeded'
+        self.finished_at = datetime.now()
+        if self._started is not None:
+            self._elapsed = time.perf_counter() - self._started
+
+    def to_dict(self) -> dict:
+        return {
+            'job_id': self.id,
+            'table': self.table,
+            'filename': self.filename,
+            'size': self.size,
+            'status': self.status,
+            'rows': self.rows,
+            'progress': round(self.progress, 4),
+            'rows_per_second': round(self.rows / self._elapsed, 1) if self._elapsed > 0 else 0,
+            'elapsed': round(self._elapsed, 3),
+            'error': self.error,
+            'created_at': self.created_at.isoformat(timespec='seconds'),
+            'started_at': self.started_at.isoformat(timespec='seconds') if self.started_at else None,
+            'finished_at': self.finished_at.isoformat(timespec='seconds') if self.finished_at else None,
+        }
+
+
+class ImportService:
+    """后台导入任务
+
+    - 任务按提交顺序在线程池中执行，默认单线程，多个导入不会争用同一张暂存表
+    - 任务记录保存在本进程内，多进程部署时需把 /api/import 路由到同一个 worker
+    """
+
+    def __init__(self, max_workers: int = None):
+        self.max_workers = max_workers
+        self._jobs = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def submit(self, upload, table: str = None) -> ImportJob:
+        """保存上传文件并提交导入任务"""
+        filename = os.path.basename(upload.filename or '')
+        extension = os.path.splitext(filename)[1].lower()
+        if extension not in IMPORT_EXTENSIONS:
+            raise APIError("仅支持 CSV 或 JSON 文件", status_code=400)
+        resolved = resolve_import_table(table or filename)
+        if resolved is None:
+            raise APIError(
+                f"无法确定导入的表，请通过 table 参数指定：{', '.join(IMPORT_SOURCES)}", status_code=400
+            )
+
+        upload_dir = current_app.config.get('IMPORT_UPLOAD_DIR') or tempfile.gettempdir()
+        os.makedirs(upload_dir, exist_ok=True)
+        fd, path = tempfile.mkstemp(prefix='import_', suffix=extension, dir=upload_dir)
+        with os.fdopen(fd, 'wb') as f:
+            upload.save(f)
+
+        job = ImportJob(resolved, filename, path, os.path.getsize(path))
+        with self._lock:
+            self._jobs[job.id] = job
+            self._prune()
+        self._get_executor().submit(self._run, current_app._get_current_object(), job)
+        return job
+
+    def get(self, job_id: str) -> Optional[ImportJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list_jobs(self) -> list:
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.created_at, reverse=True)
+
+    def _run(self, app, job: ImportJob):
+        with app.app_context():
+            job.start()
+            try:
+                rows = import_file(job.table, job.path, on_progress=job.update)
+                job.finish(rows=rows)
+                logger.info(f"导入任务 {job.id} 完成: {job.table} {rows} 条")
+            except Exception as e:
+                logger.exception(f"导入任务 {job.id} 失败")
+                job.finish(error=f"缺少字段 {e}" if isinstance(e, KeyError) else str(e))
+            finally:
+                try:
+                    os.remove(job.path)
+                except OSError:
+                    pass
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            with self._lock:
+                if self._executor is None:
+                    workers = self.max_workers or current_app.config.get('IMPORT_MAX_WORKERS', 1)
+                    self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import')
+        return self._executor
+
+    def _prune(self):
+        finished = sorted((job for job in self._jobs.values() if job.finished), key=lambda job: job.finished_at)
+        for job in finished[:max(len(self._jobs) - MAX_JOBS, 0)]:
+            del self._jobs[job.id]
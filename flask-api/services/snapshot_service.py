@@ -0,0 +1,466 @@
+"""
+内存数据快照服务
+将各业务表一次性加载为 NumPy 列，聚合接口直接在内存中向量化计算，
+数据导入完成后整体替换快照。
+"""
+
+from models import db, District, HotpotRestaurant, Brand, Teahouse, NightEconomy, Alert
+from services.cluster_service import ClusterIndex, CLUSTER_LAYERS
+from typing import List, Dict, Any, Optional
+from datetime import date
+from sqlalchemy import desc, func
+import itertools
+import json
+import threading
+import time
+import numpy as np
+
+
+# 价格区间（左闭右开）
+PRICE_RANGES = [
+    ('50以下', 0, 50),
+    ('50-80', 50, 80),
+    ('80-100', 80, 100),
+    ('100-150', 100, 150),
+    ('150以上', 150, 9999),
+]
+
+LOAD_BATCH_SIZE = 10000
+
+# 用于判断各表是否发生变化的时间字段
+FINGERPRINT_COLUMNS = {
+    'districts': (District, District.updated_at),
+    'brands': (Brand, Brand.updated_at),
+    'hotpot_restaurants': (HotpotRestaurant, HotpotRestaurant.updated_at),
+    'teahouses': (Teahouse, Teahouse.update_time),
+    'night_economy': (NightEconomy, NightEconomy.created_at),
+    'alerts': (Alert, Alert.created_at),
+}
+
+_versions = itertools.count(1)
+
+
+def _float_column(values) -> np.ndarray:
+    """转换为 float64 列，None 记为 NaN"""
+    return np.array([np.nan if v is None else float(v) for v in values], dtype=np.float64)
+
+
+def _int_column(values, dtype=np.int32) -> np.ndarray:
+    """转换为整数列"""
+    return np.fromiter(values, dtype=dtype)
+
+
+class _CategoryEncoder:
+    """字符串列字典编码（跨批次共用类别表），None 编码为 -1"""
+
+    def __init__(self):
+        self.categories = {}
+
+    def __call__(self, values) -> np.ndarray:
+        categories = self.categories
+        return np.fromiter(
+            (-1 if v is None else categories.setdefault(v, len(categories)) for v in values),
+            dtype=np.int32
+        )
+
+
+def _load_columns(*specs) -> List[Optional[np.ndarray]]:
+    """分批流式读取指定列并逐批转换，不构造 ORM 对象，也不在内存中保留全部行
+
+    Args:
+        *specs: (列, 转换函数)；转换函数接收一批该列的值，返回数组，
+                或返回 None（仅在转换函数中累计统计，不生成列）
+
+    Returns:
+        各列拼接后的只读数组（转换函数返回 None 的列为 None）
+    """
+    columns = [column for column, _ in specs]
+    converters = [convert for _, convert in specs]
+    chunks = [[] for _ in specs]
+    rows = iter(db.session.query(*columns).yield_per(LOAD_BATCH_SIZE))
+    while True:
+        batch = list(itertools.islice(rows, LOAD_BATCH_SIZE))
+        if not batch:
+            break
+        for chunk, convert, values in zip(chunks, converters, zip(*batch)):
+            chunk.append(convert(values))
+
+    result = []
+    for chunk, convert in zip(chunks, converters):
+        if not chunk:
+            chunk = [convert(())]
+        if chunk[0] is None:
+            result.append(None)
+            continue
+        column = chunk[0] if len(chunk) == 1 else np.concatenate(chunk)
+        column.flags.writeable = False
+        result.append(column)
+    return result
+
+
+def _readonly(array: np.ndarray) -> np.ndarray:
+    array.flags.writeable = False
+    return array
+
+
+def _copy_records(records) -> List[Dict[str, Any]]:
+    """记录列表的副本（快照在多个请求间共享，调用方修改返回值不影响快照）"""
+    return [dict(record) for record in records]
+
+
+def load_fingerprint() -> Dict[str, tuple]:
+    """各表指纹：(行数, 最后更新时间)"""
+    return {
+        table: tuple(db.session.query(func.count(model.id), func.max(column)).one())
+        for table, (model, column) in FINGERPRINT_COLUMNS.items()
+    }
+
+
+def _nullable_mean(groups: np.ndarray, values: np.ndarray, minlength: int) -> np.ndarray:
+    """按组计算均值，忽略 NaN；无有效值的组结果为 NaN"""
+    valid = ~np.isnan(values)
+    sums = np.bincount(groups[valid], weights=values[valid], minlength=minlength)
+    counts = np.bincount(groups[valid], minlength=minlength)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+class DataSnapshot:
+    """某一时刻全部业务数据的只读列式快照"""
+
+    def __init__(self):
+        self.version = next(_versions)
+        self.loaded_at = time.time()
+        self._cluster_indexes = {}
+        self._cluster_lock = threading.Lock()
+
+    @classmethod
+    def load(cls) -> 'DataSnapshot':
+        """从数据库加载快照"""
+        snapshot = cls()
+        snapshot.fingerprint = load_fingerprint()
+        snapshot._load_districts()
+        snapshot._load_hotpots()
+        snapshot._load_teahouses()
+        snapshot._load_night_economy()
+
+        snapshot._brands = tuple(b.to_dict() for b in Brand.query.all())
+        snapshot._active_alerts = tuple(
+            a.to_dict() for a in Alert.query.filter_by(status=1).order_by(desc(Alert.alert_time)).all()
+        )
+        return snapshot
+
+    # ==================== 记录列表 ====================
+
+    @property
+    def districts(self) -> List[Dict[str, Any]]:
+        return _copy_records(self._districts)
+
+    @property
+    def districts_by_vitality(self) -> List[Dict[str, Any]]:
+        return _copy_records(self._districts_by_vitality)
+
+    @property
+    def brands(self) -> List[Dict[str, Any]]:
+        return _copy_records(self._brands)
+
+    @property
+    def active_alerts(self) -> List[Dict[str, Any]]:
+        return _copy_records(self._active_alerts)
+
+    @property
+    def cultural_tags(self) -> List[Dict[str, Any]]:
+        return _copy_records(self._cultural_tags)
+
+    # ==================== 加载 ====================
+
+    def _load_districts(self):
+        self._districts = tuple(d.to_dict() for d in District.query.all())
+        self.district_ids = _readonly(_int_column((d['id'] for d in self._districts), np.int64))
+        self.district_names = {d['id']: d['name'] for d in self._districts}
+        self.district_density = _readonly(_float_column(d['hotpot_density'] for d in self._districts))
+        self.district_vitality = _readonly(_float_column(d['vitality_score'] for d in self._districts))
+
+        # 与 ORDER BY vitality_score DESC 一致：空值排在最后
+        self._districts_by_vitality = tuple(sorted(
+            self._districts,
+            key=lambda d: (d['vitality_score'] is None, -(d['vitality_score'] or 0))
+        ))
+
+    def _load_hotpots(self):
+        shop_types = _CategoryEncoder()
+        (
+            self.hotpot_district, self.hotpot_price, self.hotpot_shop_type, self.hotpot_status,
+            self.hotpot_ids, self.hotpot_lng, self.hotpot_lat
+        ) = _load_columns(
+            (HotpotRestaurant.district_id, _int_column),
+            (HotpotRestaurant.price_avg, _float_column),
+            (HotpotRestaurant.shop_type, shop_types),
+            (HotpotRestaurant.status, lambda values: _int_column((0 if v is None else v for v in values), np.int8)),
+            (HotpotRestaurant.id, lambda values: _int_column(values, np.int64)),
+            (HotpotRestaurant.coordinates_lng, _float_column),
+            (HotpotRestaurant.coordinates_lat, _float_column)
+        )
+        self.shop_types = tuple(shop_types.categories)
+
+    def _load_teahouses(self):
+        # 文化标签为 JSON 文本，加载时逐批统计
+        tag_count = {}
+
+        def count_tags(values):
+            for value in values:
+                if value:
+                    try:
+                        for tag in json.loads(value):
+                            tag_count[tag] = tag_count.get(tag, 0) + 1
+                    except:
+                        pass
+
+        (
+            self.teahouse_district, self.teahouse_founding_year, _,
+            self.teahouse_ids, self.teahouse_lng, self.teahouse_lat
+        ) = _load_columns(
+            (Teahouse.district_id, _int_column),
+            (Teahouse.founding_year, _float_column),
+            (Teahouse.cultural_tags, count_tags),
+            (Teahouse.id, lambda values: _int_column(values, np.int64)),
+            (Teahouse.coordinates_lng, _float_column),
+            (Teahouse.coordinates_lat, _float_column)
+        )
+        self._cultural_tags = tuple(
+            {'tag': k, 'count': v}
+            for k, v in sorted(tag_count.items(), key=lambda x: x[1], reverse=True)
+        )
+
+    def _load_night_economy(self):
+        latest = []
+
+        def track_latest(values):
+            timestamps = [v for v in values if v is not None]
+            if timestamps:
+                latest.append(max(timestamps))
+
+        self.night_hour, self.night_population, self.night_consumption, _ = _load_columns(
+            (NightEconomy.hour, lambda values: _int_column(values, np.int16)),
+            (NightEconomy.population_index, _float_column),
+            (NightEconomy.consumption_heat, _float_column),
+            (NightEconomy.timestamp, track_latest)
+        )
+        self.night_latest = max(latest) if latest else None
+
+    # ==================== 地图 ====================
+
+    def layer_columns(self, layer: str) -> tuple:
+        """图层的 (ID, 经度, 纬度) 列（火锅店只取营业中的门店）"""
+        if layer == 'hotpot':
+            active = self.hotpot_status == 1
+            return self.hotpot_ids[active], self.hotpot_lng[active], self.hotpot_lat[active]
+        return self.teahouse_ids, self.teahouse_lng, self.teahouse_lat
+
+    def cluster_index(self, layers: tuple = CLUSTER_LAYERS) -> ClusterIndex:
+        """点位聚合索引，每个快照按图层组合在首次使用时构建一次"""
+        index = self._cluster_indexes.get(layers)
+        if index is None:
+            with self._cluster_lock:
+                index = self._cluster_indexes.get(layers)
+                if index is None:
+                    index = ClusterIndex.from_layers({layer: self.layer_columns(layer) for layer in layers})
+                    self._cluster_indexes[layers] = index
+        return index
+
+    # ==================== 火锅江湖 ====================
+
+    def count_by_district(self, district_column: np.ndarray) -> Dict[int, int]:
+        """按区县计数"""
+        ids, counts = np.unique(district_column, return_counts=True)
+        return dict(zip(ids.tolist(), counts.tolist()))
+
+    def density_matrix(self) -> List[Dict[str, Any]]:
+        counts = self.count_by_district(self.hotpot_district)
+        return [
+            {
+                'district': d['name'],
+                'density': d['hotpot_density'],
+                'count': counts.get(d['id'], 0)
+            }
+            for d in self._districts
+        ]
+
+    def hotpot_ranking(self) -> List[Dict[str, Any]]:
+        counts = self.count_by_district(self.hotpot_district)
+        result = [{'name': d['name'], 'count': counts.get(d['id'], 0)} for d in self._districts]
+        result.sort(key=lambda x: x['count'], reverse=True)
+        for i, item in enumerate(result, 1):
+            item['rank'] = i
+        return result
+
+    def price_distribution(self) -> List[Dict[str, Any]]:
+        prices = self.hotpot_price[~np.isnan(self.hotpot_price)]
+        edges = np.array([low for _, low, _ in PRICE_RANGES] + [PRICE_RANGES[-1][2]], dtype=np.float64)
+        bins = np.searchsorted(edges, prices, side='right') - 1
+        bins = bins[(bins >= 0) & (bins < len(PRICE_RANGES))]
+        counts = np.bincount(bins, minlength=len(PRICE_RANGES))
+        return [{'range': name, 'count': int(c)} for (name, _, _), c in zip(PRICE_RANGES, counts)]
+
+    def shop_type_distribution(self) -> List[Dict[str, Any]]:
+        codes = self.hotpot_shop_type[self.hotpot_shop_type >= 0]
+        counts = np.bincount(codes, minlength=len(self.shop_types))
+        return [
+            {'type': name, 'count': int(c)}
+            for name, c in zip(self.shop_types, counts)
+            if name and c
+        ]
+
+    # ==================== 夜间经济 ====================
+
+    def hourly_trend(self) -> List[Dict[str, Any]]:
+        if not len(self.night_hour):
+            return []
+        hours = np.unique(self.night_hour)
+        minlength = int(hours.max()) + 1
+        population = _nullable_mean(self.night_hour, self.night_population, minlength)
+        consumption = _nullable_mean(self.night_hour, self.night_consumption, minlength)
+        return [
+            {
+                'hour': int(h),
+                'population': round(float(np.nan_to_num(population[h]))),
+                'consumption': round(float(np.nan_to_num(consumption[h])))
+            }
+            for h in hours
+        ]
+
+    def city_operation(self) -> Dict[str, Any]:
+        return {
+            'total_districts': len(self._districts),
+            'total_hotpots': int(np.count_nonzero(self.hotpot_status == 1)),
+            'total_teahouses': len(self.teahouse_district),
+            'timestamp': self.night_latest.isoformat() if self.night_latest else None
+        }
+
+    # ==================== 茶馆岁月 ====================
+
+    def teahouse_time_series(self) -> List[Dict[str, Any]]:
+        years = self.teahouse_founding_year[~np.isnan(self.teahouse_founding_year)]
+        decades, counts = np.unique((years // 10 * 10).astype(np.int64), return_counts=True)
+        return [{'decade': int(d), 'count': int(c)} for d, c in zip(decades, counts)]
+
+    def teahouse_district_distribution(self) -> List[Dict[str, Any]]:
+        ids, first_seen, counts = np.unique(self.teahouse_district, return_index=True, return_counts=True)
+        dist_count = {}
+        for i in np.argsort(first_seen, kind='stable'):
+            name = self.district_names.get(int(ids[i]), '未知')
+            dist_count[name] = dist_count.get(name, 0) + int(counts[i])
+        return [
+            {'district': k, 'count': v}
+            for k, v in sorted(dist_count.items(), key=lambda x: x[1], reverse=True)
+        ]
+
+    # ==================== 数据洞察 ====================
+
+    def temperature_index(self) -> Dict[str, Any]:
+        if len(self._districts):
+            hotpot_score = float(np.nan_to_num(self.district_density).mean())
+            vitality_score = float(np.nan_to_num(self.district_vitality).mean())
+        else:
+            hotpot_score = 0
+            vitality_score = 0
+
+        teahouse_score = min(len(self.teahouse_district) * 0.1, 30)
+
+        if len(self.night_population):
+            night_score = float(np.nan_to_num(self.night_population).mean()) / 1000
+        else:
+            night_score = 0
+
+        # 归一化到0-100
+        normalize = lambda x, max_val: max(0, min(100, (x / max_val) * 100)) if x > 0 else 0
+
+        score = round(
+            normalize(hotpot_score, 20) * 0.3 +
+            normalize(night_score, 10) * 0.3 +
+            normalize(teahouse_score, 30) * 0.2 +
+            normalize(vitality_score, 100) * 0.2
+        )
+
+        return {
+            'score': score,
+            'date': date.today().isoformat(),
+            'factors': {
+                'hotpot_density': round(normalize(hotpot_score, 20)),
+                'night_economy': round(normalize(night_score, 10)),
+                'teahouse_culture': round(normalize(teahouse_score, 30)),
+                'vitality': round(normalize(vitality_score, 100))
+            }
+        }
+
+
+class SnapshotStore:
+    """快照持有者：按需加载，导入完成后原子替换"""
+
+    def __init__(self):
+        self._snapshot: Optional[DataSnapshot] = None
+        self._lock = threading.Lock()
+        self._listeners = []
+
+    def add_listener(self, callback):
+        """注册数据变化回调，快照替换后以发生变化的表名列表调用"""
+        self._listeners.append(callback)
+
+    def get(self, max_age: Optional[int] = None) -> DataSnapshot:
+        """获取当前快照
+
+        Args:
+            max_age: 快照最长有效期（秒），超过后由一个请求负责重新加载，
+                     其余请求继续使用旧快照；为空表示永不过期
+        """
+        snapshot = self._snapshot
+        if snapshot is None:
+            with self._lock:
+                if self._snapshot is None:
+                    self._snapshot = DataSnapshot.load()
+                return self._snapshot
+
+        if max_age and time.time() - snapshot.loaded_at > max_age:
+            if self._lock.acquire(blocking=False):
+                try:
+                    if self._snapshot is snapshot:
+                        self._swap(DataSnapshot.load())
+                finally:
+                    self._lock.release()
+                return self._snapshot
+
+        return snapshot
+
+    def refresh(self, notify=True) -> DataSnapshot:
+        """重新加载并替换快照（加载期间旧快照继续提供服务）
+
+        Args:
+            notify: 是否按表指纹差异通知监听者；调用方自行处理变更时传 False
+        """
+        snapshot = DataSnapshot.load()
+        with self._lock:
+            self._swap(snapshot, notify=notify)
+        return snapshot
+
+    def _swap(self, snapshot: DataSnapshot, notify=True):
+        """替换快照；表指纹（行数、最后更新时间）有变化时通知监听者"""
+        previous = self._snapshot
+        self._snapshot = snapshot
+        if not notify or previous is None:
+            return
+        changed = [
+            table for table, fingerprint in snapshot.fingerprint.items()
+            if previous.fingerprint.get(table) != fingerprint
+        ]
+        if changed:
+            for callback in self._listeners:
+                callback(changed)
+
+    def invalidate(self):
+        """丢弃当前快照，下次访问时重新加载"""
+        with self._lock:
+            self._snapshot = None
+
+
+# 全局快照实例
+snapshot_store = SnapshotStore()
@@ -0,0 +1,124 @@
+"""
+测试公共配置
+"""
+
+import os
+import sys
+
+# 与 app.py 一样以 flask-api 目录为导入根
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import date, datetime, timedelta
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+import json
+import pytest
+import random
+import sqlite3
+
+# GeoAlchemy2 在 SQLite 上建表时调用的 SpatiaLite 函数；测试不加载扩展，注册为空操作
+SPATIALITE_FUNCTIONS = {
+    'RecoverGeometryColumn': 5, 'CreateSpatialIndex': 2, 'DisableSpatialIndex': 2,
+    'DiscardGeometryColumn': 2, 'CheckSpatialMetaData': 0, 'InitSpatialMetaData': 1,
+}
+# 几何列读写时的转换函数，直接返回原值
+GEOMETRY_FUNCTIONS = ('AsEWKB', 'ST_AsEWKB', 'AsBinary', 'ST_AsBinary', 'GeomFromEWKT', 'ST_GeomFromEWKT')
+
+# 基准时间；门店每 3 家共用一个更新时间，用于测试增量导出在相同时间戳处分页
+BASE_TIME = datetime(2025, 1, 1, 12, 0, 0)
+
+
+@event.listens_for(Engine, 'connect')
+def _register_spatial_functions(dbapi_connection, connection_record):
+    if isinstance(dbapi_connection, sqlite3.Connection):
+        for name, arity in SPATIALITE_FUNCTIONS.items():
+            dbapi_connection.create_function(name, arity, lambda *args: 1)
+        for name in GEOMETRY_FUNCTIONS:
+            dbapi_connection.create_function(name, 1, lambda value: value)
+
+
+def seed_rows(db):
+    """写入固定的测试数据（区县、品牌、火锅店、茶馆、夜间经济、预警）"""
+    from models import Alert, Brand, District, HotpotRestaurant, NightEconomy, Teahouse
+
+    r = random.Random(7)
+    for i in range(1, 11):
+        db.session.add(District(
+            id=i, name=f'区县{i}', area_km2=round(r.uniform(10, 100), 2),
+            hotpot_density=round(r.uniform(1, 20), 2), population=r.randint(1000, 9000),
+            vitality_score=round(r.uniform(60, 95), 1),
+        ))
+    for i in range(1, 5):
+        db.session.add(Brand(
+            id=i, name=f'品牌{i}', market_share=round(r.uniform(1, 20), 2), avg_wait_time=r.randint(5, 60),
+            store_count=r.randint(1, 50), price_position='中端', update_date=date(2024, 12, 1),
+        ))
+    db.session.flush()
+
+    for i in range(1, 121):
+        price = r.choice([None, r.randint(30, 200)])
+        db.session.add(HotpotRestaurant(
+            id=i, name=f'火锅{i}', brand_id=r.choice([None, 1, 2, 3, 4]), district_id=r.randint(1, 9),
+            price_avg=price, price_min=price, price_max=price, rating=round(r.uniform(3, 5), 1),
+            review_count=r.randint(0, 500), shop_type=r.choice([None, '老字号', '网红店', '社区店']),
+            is_24h=r.random() < 0.1, status=r.choice([1, 1, 0]),
+            coordinates_lng=round(r.uniform(106.2, 106.8), 6), coordinates_lat=round(r.uniform(29.3, 29.8), 6),
+            updated_at=BASE_TIME + timedelta(minutes=i // 3),
+        ))
+    for i in range(1, 41):
+        db.session.add(Teahouse(
+            id=i, name=f'茶馆{i}', district_id=r.randint(1, 10),
+            founding_year=r.choice([None, r.randint(1900, 2020)]), avg_price=r.randint(10, 60),
+            popularity=r.randint(1, 100), is_historic=r.random() < 0.3,
+            cultural_tags=r.choice([None, json.dumps(r.sample(['川剧', '评书', '采耳', '盖碗茶'], 2))]),
+            coordinates_lng=round(r.uniform(106.2, 106.8), 6), coordinates_lat=round(r.uniform(29.3, 29.8), 6),
+            update_time=BASE_TIME + timedelta(minutes=i),
+        ))
+    row_id = 1
+    for day in range(2):
+        for hour in range(24):
+            for district_id in range(1, 4):
+                ts = BASE_TIME - timedelta(days=day) + timedelta(hours=hour)
+                db.session.add(NightEconomy(
+                    id=row_id, timestamp=ts, hour=ts.hour, district_id=district_id,
+                    population_index=r.choice([None, r.randint(100, 9000)]),
+                    consumption_heat=round(r.uniform(100, 900), 2), metro_passengers=r.randint(1, 100),
+                    active_businesses=r.randint(1, 50), weather='晴天', date=ts.date(), time=ts.time(),
+                ))
+                row_id += 1
+    for i in range(1, 8):
+        db.session.add(Alert(
+            id=i, alert_time=BASE_TIME - timedelta(hours=i), alert_type='暴雨预警',
+            content=f'预警{i}', impact_value='+1%', status=i % 2,
+        ))
+    db.session.commit()
+
+
+@pytest.fixture(scope='session')
+def app(tmp_path_factory):
+    """使用临时 SQLite 文件数据库并写入测试数据的应用（整个测试会话共用）"""
+    import config
+    from app import create_app
+    from models import db
+
+    # SQLite 的索引名在整个库内唯一，给各表的索引加上表名前缀
+    for table in db.metadata.tables.values():
+        for index in table.indexes:
+            if not index.name.startswith(table.name):
+                index.name = f'{table.name}_{index.name}'
+
+    path = tmp_path_factory.mktemp('db') / 'test.db'
+    config.config['sqlite'] = type('SQLiteTestingConfig', (config.TestingConfig,), {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'DATA_CHECK_INTERVAL': 0,
+    })
+    app = create_app('sqlite')
+    with app.app_context():
+        seed_rows(db)
+    return app
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
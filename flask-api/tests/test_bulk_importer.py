@@ -0,0 +1,198 @@
+"""
+批量导入（暂存 + 合并）测试，使用 SQLite
+"""
+
+from sqlalchemy import create_engine, inspect, text
+from utils.database import BulkImporter, CsvRecordReader, JsonRecordReader, RecordReader, open_records
+import pytest
+
+OLD = '2020-01-01 00:00:00'
+
+DISTRICTS = [
+    {'id': 1, 'name': '锦江区', 'area_km2': 60.0, 'hotpot_density': 1.5, 'population': 90, 'vitality_score': 88.0},
+    {'id': 2, 'name': '青羊区', 'area_km2': 67.0, 'hotpot_density': 1.2, 'population': 95, 'vitality_score': 85.0},
+    {'id': 3, 'name': '武侯区', 'area_km2': 75.0, 'hotpot_density': 1.8, 'population': 120, 'vitality_score': 90.0},
+]
+
+BRANDS = [
+    {'id': 1, 'name': '小龙坎', 'market_share': 0.12, 'avg_wait_time': 30, 'store_count': 80,
+     'price_position': '中端', 'update_date': '2025-01-01'},
+    {'id': 2, 'name': '蜀大侠', 'market_share': 0.08, 'avg_wait_time': 25, 'store_count': 60,
+     'price_position': '中端', 'update_date': '2025-01-01'},
+]
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'import.db'}")
+    with engine.begin() as conn:
+        conn.execute(text(
+            "CREATE TABLE districts (id INTEGER PRIMARY KEY, name VARCHAR(50), area_km2 FLOAT, "
+            "hotpot_density FLOAT, population INTEGER, vitality_score FLOAT, "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+        conn.execute(text(
+            "CREATE TABLE brands (id INTEGER PRIMARY KEY, name VARCHAR(50), market_share FLOAT, "
+            "avg_wait_time INTEGER, store_count INTEGER, price_position VARCHAR(20), update_date DATE, "
+            "created_at DATETIME, updated_at DATETIME)"
+        ))
+    yield engine
+    engine.dispose()
+
+
+def run_import(engine, tables, replace=()):
+    importer = BulkImporter(engine=engine, batch_size=2, replace=replace)
+    try:
+        for table, rows in tables.items():
+            importer.stage(table, [dict(row) for row in rows])
+        return importer.merge()
+    finally:
+        importer.cleanup()
+
+
+def fetch(engine, table):
+    with engine.connect() as conn:
+        return [dict(row) for row in conn.execute(text(f"SELECT * FROM {table} ORDER BY id")).mappings()]
+
+
+def age_rows(engine, table):
+    """把时间戳改为过去的时间，以便判断合并时是否被修改"""
+    with engine.begin() as conn:
+        conn.execute(text(f"UPDATE {table} SET created_at = :old, updated_at = :old"), {'old': OLD})
+
+
+def staging_tables(engine):
+    return [name for name in inspect(engine).get_table_names() if '__staging' in name]
+
+
+def test_merge_inserts_rows_with_timestamps(engine):
+    assert run_import(engine, {'districts': DISTRICTS, 'brands': BRANDS}) == ['districts', 'brands']
+
+    districts = fetch(engine, 'districts')
+    assert [row['name'] for row in districts] == ['锦江区', '青羊区', '武侯区']
+    assert all(row['created_at'] and row['updated_at'] for row in districts)
+    assert len(fetch(engine, 'brands')) == 2
+    assert staging_tables(engine) == []
+
+
+def test_reimport_is_noop(engine):
+    run_import(engine, {'districts': DISTRICTS, 'brands': BRANDS})
+    age_rows(engine, 'districts')
+    age_rows(engine, 'brands')
+    before = fetch(engine, 'districts'), fetch(engine, 'brands')
+
+    run_import(engine, {'districts': DISTRICTS, 'brands': BRANDS})
+
+    assert (fetch(engine, 'districts'), fetch(engine, 'brands')) == before
+
+
+def test_changed_row_keeps_created_at(engine):
+    run_import(engine, {'districts': DISTRICTS})
+    age_rows(engine, 'districts')
+
+    changed = [dict(row) for row in DISTRICTS]
+    changed[1]['vitality_score'] = 70.0
+    run_import(engine, {'districts': changed})
+
+    rows = {row['id']: row for row in fetch(engine, 'districts')}
+    assert rows[2]['vitality_score'] == 70.0
+    assert rows[2]['updated_at'] != OLD
+    assert all(row['created_at'] == OLD for row in rows.values())
+    assert rows[1]['updated_at'] == OLD and rows[3]['updated_at'] == OLD
+
+
+def test_failure_while_staging_leaves_tables_untouched(engine):
+    run_import(engine, {'districts': DISTRICTS})
+    before = fetch(engine, 'districts')
+
+    def broken_rows():
+        yield {**DISTRICTS[0], 'name': '已修改'}
+        yield {**DISTRICTS[1], 'name': '已修改'}
+        raise ValueError('数据文件损坏')
+
+    importer = BulkImporter(engine=engine, batch_size=1)
+    with pytest.raises(ValueError):
+        try:
+            importer.stage('districts', broken_rows())
+            importer.merge()
+        finally:
+            importer.cleanup()
+
+    assert fetch(engine, 'districts') == before
+    assert staging_tables(engine) == []
+
+
+def test_failed_merge_rolls_back_all_tables(engine):
+    run_import(engine, {'districts': DISTRICTS, 'brands': BRANDS})
+    before = fetch(engine, 'districts')
+
+    importer = BulkImporter(engine=engine, batch_size=10)
+    try:
+        importer.stage('districts', [{**row, 'name': '已修改'} for row in DISTRICTS])
+        importer.stage('brands', [dict(row) for row in BRANDS])
+        # 合并 brands 时暂存表已不存在，整个事务回滚
+        with engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE {importer.staging_table('brands')}"))
+        with pytest.raises(Exception):
+            importer.merge()
+    finally:
+        importer.cleanup()
+
+    assert fetch(engine, 'districts') == before
+
+
+def test_merge_keeps_missing_rows_by_default(engine):
+    run_import(engine, {'districts': DISTRICTS})
+    run_import(engine, {'districts': DISTRICTS[:2]})
+
+    assert [row['id'] for row in fetch(engine, 'districts')] == [1, 2, 3]
+
+
+def test_replace_deletes_missing_rows(engine):
+    run_import(engine, {'districts': DISTRICTS, 'brands': BRANDS})
+    run_import(engine, {'districts': DISTRICTS[:2], 'brands': BRANDS[:1]}, replace=['districts'])
+
+    assert [row['id'] for row in fetch(engine, 'districts')] == [1, 2]
+    assert [row['id'] for row in fetch(engine, 'brands')] == [1, 2]
+
+
+def test_concurrent_imports_use_separate_staging_tables(engine):
+    first = BulkImporter(engine=engine, batch_size=10)
+    second = BulkImporter(engine=engine, batch_size=10)
+    assert first.staging_table('districts') != second.staging_table('districts')
+
+    try:
+        first.stage('districts', [dict(row) for row in DISTRICTS[:1]])
+        second.stage('districts', [dict(row) for row in DISTRICTS[1:]])
+        first.merge()
+        second.merge()
+    finally:
+        first.cleanup()
+        second.cleanup()
+
+    assert [row['id'] for row in fetch(engine, 'districts')] == [1, 2, 3]
+    assert staging_tables(engine) == []
+
+
+def test_record_reader_requires_records(tmp_path):
+    path = tmp_path / 'empty.json'
+    path.write_text('[]', encoding='utf-8')
+    with pytest.raises(TypeError):
+        RecordReader(str(path))
+
+
+def test_csv_and_json_readers(tmp_path):
+    csv_path = tmp_path / 'districts.csv'
+    csv_path.write_text('\ufeffid,name,is_historic,population\n1,锦江区,True,\n', encoding='utf-8')
+    json_path = tmp_path / 'districts.json'
+    json_path.write_text('[{"id": 1, "name": "锦江区"}]', encoding='utf-8')
+
+    reader = open_records(str(csv_path))
+    assert isinstance(reader, CsvRecordReader)
+    assert list(reader) == [{'id': '1', 'name': '锦江区', 'is_historic': 1, 'population': None}]
+    assert reader.progress == 1.0
+
+    reader = open_records(str(json_path))
+    assert isinstance(reader, JsonRecordReader)
+    assert reader.progress == 0.0
+    assert list(reader) == [{'id': 1, 'name': '锦江区'}]
@@ -0,0 +1,168 @@
+"""
+数据变更检测与 ETag 测试
+"""
+
+from datetime import date, datetime
+from flask import Flask
+from services.change_watcher import ChangeWatcher
+from utils import http_cache
+from utils.data_version import DataVersion
+import pytest
+import time
+
+
+class FakeTables:
+    """可修改的表指纹"""
+
+    def __init__(self):
+        self.fingerprint = {'districts': (38, '2025-01-01'), 'alerts': (30, '2025-01-01')}
+        self.loads = 0
+
+    def __call__(self):
+        self.loads += 1
+        return dict(self.fingerprint)
+
+
+def test_first_check_records_baseline():
+    tables = FakeTables()
+    watcher = ChangeWatcher(interval=60, load=tables)
+    changes = []
+    watcher.add_listener(changes.append)
+
+    assert watcher.check() == []
+    assert changes == []
+    assert tables.loads == 1
+
+
+def test_detects_changed_tables():
+    tables = FakeTables()
+    watcher = ChangeWatcher(interval=60, load=tables)
+    changes = []
+    watcher.add_listener(changes.append)
+    watcher.check()
+
+    tables.fingerprint['alerts'] = (31, '2025-01-02')
+    assert watcher.check(force=True) == ['alerts']
+    assert changes == [['alerts']]
+    # 同一变更只通知一次
+    assert watcher.check(force=True) == []
+
+
+def test_check_respects_interval():
+    tables = FakeTables()
+    watcher = ChangeWatcher(interval=0.2, load=tables)
+    watcher.check()
+    tables.fingerprint['districts'] = (39, '2025-01-02')
+
+    assert watcher.check() == []
+    assert tables.loads == 1
+    time.sleep(0.25)
+    assert watcher.check() == ['districts']
+
+
+def test_disabled_watcher_never_queries():
+    tables = FakeTables()
+    watcher = ChangeWatcher(interval=0, load=tables)
+    assert watcher.check() == []
+    watcher.sync()
+    assert tables.loads == 0
+
+
+def test_sync_suppresses_own_changes():
+    tables = FakeTables()
+    watcher = ChangeWatcher(interval=60, load=tables)
+    changes = []
+    watcher.add_listener(changes.append)
+    watcher.check()
+
+    tables.fingerprint['districts'] = (40, '2025-01-03')
+    watcher.sync()
+    assert watcher.check(force=True) == []
+    assert changes == []
+
+
+def test_load_errors_are_ignored():
+    def failing():
+        raise RuntimeError('database unavailable')
+
+    watcher = ChangeWatcher(interval=60, load=failing)
+    assert watcher.check() == []
+    watcher.sync()
+
+
+def test_etag_changes_with_date(monkeypatch):
+    class Today(date):
+        value = date(2025, 11, 11)
+
+        @classmethod
+        def today(cls):
+            return cls.value
+
+    monkeypatch.setattr(http_cache, 'date', Today)
+    version, updated_at = http_cache.current_validators()
+    assert version.endswith('.20251111')
+
+    Today.value = date(2025, 11, 12)
+    next_version, next_updated_at = http_cache.current_validators()
+    assert next_version != version
+    assert next_version.split('.')[0] == version.split('.')[0]
+    # Last-Modified 不早于当天零点
+    assert next_updated_at >= time.mktime(date(2025, 11, 12).timetuple())
+
+
+FINGERPRINT = {
+    'districts': (38, datetime(2025, 1, 1, 8, 0, 0)),
+    'alerts': (30, datetime(2025, 1, 2, 9, 30, 0)),
+}
+
+
+def test_seeded_version_is_shared_across_processes():
+    first, second = DataVersion(), DataVersion()
+    time.sleep(0.002)
+    second_started = DataVersion()
+    first.seed(dict(FINGERPRINT))
+    second.seed(dict(FINGERPRINT))
+    second_started.seed(dict(FINGERPRINT))
+
+    assert first.get() == second.get() == second_started.get()
+    assert first.get()[1] == datetime(2025, 1, 2, 9, 30, 0).timestamp()
+
+
+def test_seeded_version_changes_with_counts():
+    version = DataVersion()
+    version.seed(FINGERPRINT)
+    deleted = DataVersion()
+    deleted.seed({**FINGERPRINT, 'districts': (37, FINGERPRINT['districts'][1])})
+
+    assert version.get()[0] != deleted.get()[0]
+
+
+def test_bump_after_seed_increases():
+    version = DataVersion()
+    version.seed(FINGERPRINT)
+    seeded = version.get()[0]
+
+    bumped = version.bump()
+    assert int(bumped, 16) > int(seeded, 16)
+
+    changed = {**FINGERPRINT, 'alerts': (31, datetime(2025, 1, 2, 9, 30, 0))}
+    # 指纹计算出的版本不大于当前版本时仍然递增
+    assert int(version.bump(changed), 16) == int(bumped, 16) + 1
+
+
+def test_bump_with_fingerprint_agrees_across_processes():
+    first, second = DataVersion(), DataVersion()
+    first.seed(FINGERPRINT)
+    second.seed(FINGERPRINT)
+    changed = {**FINGERPRINT, 'districts': (39, datetime(2030, 1, 1))}
+
+    assert first.bump(changed) == second.bump(changed)
+
+
+@pytest.mark.parametrize('path', ['/api/docs', '/api/swagger.json', '/api/export/table/districts'])
+def test_docs_and_downloads_skip_conditional_requests(path):
+    app = Flask(__name__)
+    with app.test_request_context(path):
+        assert not http_cache._is_cacheable_request()
+    with app.test_request_context('/api/map/districts'):
+        assert http_cache._is_cacheable_request()
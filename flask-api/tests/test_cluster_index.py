@@ -0,0 +1,78 @@
+"""
+点位聚合索引测试
+"""
+
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from services.cluster_service import ClusterIndex
+
+
+def random_index(seed=3, hotpots=400, teahouses=150, max_zoom=16):
+    r = np.random.default_rng(seed)
+    return ClusterIndex.from_layers({
+        'hotpot': (np.arange(1, hotpots + 1), r.uniform(106.2, 106.8, hotpots), r.uniform(29.3, 29.8, hotpots)),
+        'teahouse': (np.arange(1, teahouses + 1), r.uniform(106.2, 106.8, teahouses),
+                     r.uniform(29.3, 29.8, teahouses)),
+    }, max_zoom=max_zoom)
+
+
+def test_counts_sum_to_size_at_every_zoom():
+    index = random_index()
+    assert index.size == 550
+    assert len(index.levels) == index.max_zoom + 1
+
+    for zoom in range(index.max_zoom + 1):
+        clusters = index.query(zoom)
+        assert sum(cluster['count'] for cluster in clusters) == index.size
+        hotpots = sum(c['hotpot'] if 'hotpot' in c else c['layer'] == 'hotpot' for c in clusters)
+        assert hotpots == 400
+    # 缩放级别越小聚合越多
+    assert len(index.query(0)) == 1
+    assert len(index.query(16)) >= len(index.query(10)) >= len(index.query(5))
+
+
+def test_single_point_cells_carry_id_and_layer():
+    index = ClusterIndex.from_layers({
+        'hotpot': (np.array([11, 12]), np.array([106.55, 106.56]), np.array([29.56, 29.56])),
+        'teahouse': (np.array([21]), np.array([104.06]), np.array([30.67])),
+    })
+
+    # 成都的茶馆距离重庆的门店较远，中等缩放级别即为单点
+    clusters = index.query(8)
+    single = [cluster for cluster in clusters if cluster['count'] == 1]
+    assert single == [{'lng': pytest.approx(104.06), 'lat': pytest.approx(30.67), 'count': 1,
+                       'id': 21, 'layer': 'teahouse'}]
+    merged = [cluster for cluster in clusters if cluster['count'] == 2]
+    assert merged[0]['hotpot'] == 2 and merged[0]['teahouse'] == 0
+
+    # 最大级别下每个点都是单点，ID 与图层对应
+    points = {(cluster['layer'], cluster['id']) for cluster in index.query(16)}
+    assert points == {('hotpot', 11), ('hotpot', 12), ('teahouse', 21)}
+    # 超过最大级别时使用最大级别的结果
+    assert index.query(20) == index.query(16)
+
+
+def test_bbox_returns_clusters_with_centroid_inside():
+    index = random_index()
+    bbox = (106.4, 29.45, 106.6, 29.65)
+
+    for zoom in (6, 10, 13, 16):
+        everything = index.query(zoom)
+        inside = index.query(zoom, bbox)
+        # 低缩放级别的聚合中心可能都在范围外，即使部分成员点在范围内
+        assert inside or zoom < 10
+        assert all(bbox[0] <= c['lng'] <= bbox[2] and bbox[1] <= c['lat'] <= bbox[3] for c in inside)
+        expected = [c for c in everything if bbox[0] <= c['lng'] <= bbox[2] and bbox[1] <= c['lat'] <= bbox[3]]
+        assert inside == expected
+
+
+def test_missing_coordinates_are_skipped():
+    index = ClusterIndex.from_layers({
+        'hotpot': (np.array([1, 2, 3]), np.array([106.5, np.nan, 106.6]), np.array([29.5, 29.6, np.nan])),
+        'teahouse': (np.array([], dtype=np.int64), np.array([]), np.array([])),
+    })
+    assert index.size == 1
+    assert index.query(16) == [{'lng': pytest.approx(106.5), 'lat': pytest.approx(29.5), 'count': 1,
+                                'id': 1, 'layer': 'hotpot'}]
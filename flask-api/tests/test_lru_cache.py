@@ -0,0 +1,96 @@
+"""
+进程内 LRU 缓存测试
+"""
+
+from utils.cache import LRUCache
+import threading
+
+
+def test_get_or_set_runs_factory_once():
+    cache = LRUCache(cleanup_interval=0)
+    threads_count = 16
+    start = threading.Barrier(threads_count)
+    calls = []
+    results = []
+
+    def factory():
+        calls.append(1)
+        # 其他线程在此期间都会未命中并等待
+        threading.Event().wait(0.1)
+        return {'value': 42}
+
+    def worker():
+        start.wait()
+        results.append(cache.get_or_set('map:districts', factory))
+
+    threads = [threading.Thread(target=worker) for _ in range(threads_count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == [{'value': 42}] * threads_count
+    # 每个键的锁在使用后释放
+    assert cache._key_locks == {}
+
+
+def test_max_bytes_evicts_least_recently_used():
+    value = b'x' * 100
+    cache = LRUCache(max_entries=0, max_bytes=300, cleanup_interval=0)
+    cache.set('map:a', value)
+    cache.set('map:b', value)
+    cache.set('map:c', value)
+    # 访问 a 后 b 成为最久未使用的条目
+    assert cache.get('map:a') == value
+
+    cache.set('map:d', value)
+    assert cache.keys() == ['map:c', 'map:a', 'map:d']
+    assert cache.stats()['bytes'] == 300
+    assert cache.stats()['evictions'] == 1
+
+    cache.set('map:e', b'x' * 250)
+    assert cache.keys() == ['map:e']
+
+
+def test_value_larger_than_capacity_is_not_cached():
+    cache = LRUCache(max_bytes=100, cleanup_interval=0)
+    cache.set('map:a', b'x' * 50)
+    cache.set('map:big', b'x' * 200)
+
+    assert cache.get('map:big') is None
+    assert cache.get('map:a') == b'x' * 50
+
+
+def test_delete_prefix_during_factory_discards_result():
+    cache = LRUCache(cleanup_interval=0)
+    computing, invalidated = threading.Event(), threading.Event()
+
+    def factory():
+        computing.set()
+        invalidated.wait(5)
+        return 'stale'
+
+    result = []
+    thread = threading.Thread(target=lambda: result.append(cache.get_or_set('hotpot:brands', factory)))
+    thread.start()
+    assert computing.wait(5)
+    assert cache.delete_prefix('hotpot:') == 0
+    invalidated.set()
+    thread.join()
+
+    # 调用方仍拿到计算结果，但结果不写入缓存
+    assert result == ['stale']
+    assert cache.get('hotpot:brands') is None
+    assert cache.get_or_set('hotpot:brands', lambda: 'fresh') == 'fresh'
+    assert cache.get('hotpot:brands') == 'fresh'
+
+
+def test_delete_prefix_keeps_other_namespaces():
+    cache = LRUCache(cleanup_interval=0)
+    cache.set('hotpot:brands', 1)
+    cache.set('hotpot:ranking', 2)
+    cache.set('map:districts', 3)
+
+    assert cache.delete_prefix('hotpot:') == 2
+    assert cache.keys() == ['map:districts']
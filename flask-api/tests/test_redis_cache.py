@@ -0,0 +1,192 @@
+"""
+Redis 缓存测试（使用 fakeredis，多个客户端共享同一个 FakeServer 模拟多个 worker）
+"""
+
+from utils.cache import LRUCache
+from utils.redis_cache import RedisCache, TwoLevelCache, serialize, deserialize
+import threading
+import time
+import pytest
+
+fakeredis = pytest.importorskip('fakeredis')
+
+
+@pytest.fixture
+def server():
+    return fakeredis.FakeServer()
+
+
+@pytest.fixture
+def cache(server):
+    return RedisCache(fakeredis.FakeRedis(server=server), lock_timeout=10)
+
+
+def worker(server, **kwargs):
+    """共享同一 Redis 的另一个 worker"""
+    return RedisCache(fakeredis.FakeRedis(server=server), lock_timeout=kwargs.pop('lock_timeout', 10), **kwargs)
+
+
+class BrokenClient:
+    """所有命令都失败的 Redis 客户端"""
+
+    def __getattr__(self, name):
+        def fail(*args, **kwargs):
+            raise ConnectionError('redis down')
+        return fail
+
+
+def test_serialize_round_trip():
+    value = {'name': '火锅', 'count': 3, 'items': [1, 2.5, None], 'ok': True}
+    assert deserialize(serialize(value)) == value
+
+
+def test_get_set_and_many(cache):
+    cache.set('map:a', {'x': 1})
+    cache.set('map:b', None)
+    assert cache.get('map:a') == {'x': 1}
+    assert cache.get('map:missing', 'fallback') == 'fallback'
+    assert cache.get_many(['map:a', 'map:b', 'map:c'], default=0) == [{'x': 1}, None, 0]
+    assert cache.stats()['hits'] == 3
+
+
+def test_delete_prefix_and_namespace(cache):
+    cache.set('map:points:1', 1)
+    cache.set('map:points:2', 2)
+    cache.set('map:districts', 3)
+    cache.set('night:trend', 4)
+
+    assert cache.delete_prefix('map:points') == 2
+    assert cache.get('map:points:1') is None
+    assert cache.get('map:districts') == 3
+
+    assert cache.delete_namespace('map') == 1
+    assert cache.get('map:districts') is None
+    assert sorted(cache.keys()) == ['night:trend']
+
+
+def test_get_or_set_caches_result(cache):
+    calls = []
+
+    def factory():
+        calls.append(1)
+        return [1, 2, 3]
+
+    assert cache.get_or_set('hotpot:ranking', factory) == [1, 2, 3]
+    assert cache.get_or_set('hotpot:ranking', factory) == [1, 2, 3]
+    assert len(calls) == 1
+
+
+def test_get_or_set_skips_write_after_invalidation(cache):
+    def factory():
+        cache.delete_namespace('hotpot')
+        return 'stale'
+
+    assert cache.get_or_set('hotpot:ranking', factory) == 'stale'
+    assert cache.get('hotpot:ranking') is None
+
+
+def test_waiter_uses_holder_result(server, cache):
+    started = threading.Event()
+    calls = []
+
+    def slow():
+        calls.append('holder')
+        started.set()
+        time.sleep(0.3)
+        return 'holder'
+
+    holder = threading.Thread(target=cache.get_or_set, args=('night:trend', slow))
+    holder.start()
+    started.wait(1)
+    result = worker(server).get_or_set('night:trend', lambda: calls.append('waiter') or 'waiter')
+    holder.join()
+
+    assert result == 'holder'
+    assert calls == ['holder']
+
+
+def test_waiter_recomputes_when_holder_fails(server, cache):
+    started = threading.Event()
+    errors = []
+
+    def failing():
+        started.set()
+        time.sleep(0.2)
+        raise RuntimeError('query failed')
+
+    def run_holder():
+        try:
+            cache.get_or_set('night:trend', failing)
+        except RuntimeError as e:
+            errors.append(e)
+
+    holder = threading.Thread(target=run_holder)
+    holder.start()
+    started.wait(1)
+    begin = time.monotonic()
+    result = worker(server).get_or_set('night:trend', lambda: 'waiter')
+    elapsed = time.monotonic() - begin
+    holder.join()
+
+    assert result == 'waiter'
+    assert len(errors) == 1
+    # 持锁者失败后立即接手，而不是等到 lock_timeout（10 秒）
+    assert elapsed < 2
+    assert cache.get('night:trend') == 'waiter'
+
+
+def test_waiter_recomputes_when_lock_released_without_value(server, cache):
+    client = fakeredis.FakeRedis(server=server)
+    client.set(cache._key('lock:insight:alerts'), 'other', ex=10)
+    threading.Timer(0.2, client.delete, args=[cache._key('lock:insight:alerts')]).start()
+
+    begin = time.monotonic()
+    assert cache.get_or_set('insight:alerts', lambda: 'fresh') == 'fresh'
+    assert time.monotonic() - begin < 2
+
+
+def test_waiter_reraises_own_failure(server, cache):
+    client = fakeredis.FakeRedis(server=server)
+    client.set(cache._key('lock:insight:alerts'), 'other', ex=10)
+    threading.Timer(0.1, client.delete, args=[cache._key('lock:insight:alerts')]).start()
+
+    def failing():
+        raise RuntimeError('query failed')
+
+    with pytest.raises(RuntimeError):
+        cache.get_or_set('insight:alerts', failing)
+    assert not client.exists(cache._key('lock:insight:alerts'))
+
+
+def test_waiter_gives_up_after_lock_timeout(server):
+    client = fakeredis.FakeRedis(server=server)
+    cache = worker(server, lock_timeout=0.3)
+    client.set(cache._key('lock:map:districts'), 'other', ex=10)
+    assert cache.get_or_set('map:districts', lambda: 'own') == 'own'
+
+
+def test_redis_errors_fall_back_to_factory():
+    cache = RedisCache(BrokenClient())
+    assert cache.get('map:a', 'default') == 'default'
+    assert cache.get_or_set('map:a', lambda: 'computed') == 'computed'
+    cache.set('map:a', 1)
+    assert cache.stats()['errors'] >= 3
+
+
+def test_two_level_get_many(cache):
+    local = LRUCache()
+    two_level = TwoLevelCache(local, cache)
+    cache.set('map:a', 1)
+    two_level.set('map:b', None)
+
+    assert two_level.get_many(['map:a', 'map:b', 'map:c']) == [1, None, None]
+    assert two_level.get_many(['map:a', 'map:c'], default='none') == [1, 'none']
+    # L2 命中的值回填到 L1
+    assert local.get('map:a') == 1
+
+
+def test_two_level_get_or_set(server, cache):
+    two_level = TwoLevelCache(LRUCache(), cache)
+    assert two_level.get_or_set('teahouse:tags', lambda: ['川剧']) == ['川剧']
+    other = TwoLevelCache(LRUCache(), worker(server))
+    assert other.get_or_set('teahouse:tags', lambda: ['评书']) == ['川剧']
@@ -0,0 +1,67 @@
+"""
+内存快照与数据库查询结果一致性测试
+"""
+
+from services.data_service import DataService
+from services.snapshot_service import snapshot_store
+from utils.response import json_default
+import json
+import pytest
+
+# DataService 中有快照实现的方法及其参数
+SNAPSHOT_METHODS = [
+    ('get_districts', ()),
+    ('get_clusters', (5,)),
+    ('get_clusters', (12, (106.3, 29.4, 106.6, 29.7))),
+    ('get_clusters', (18,)),
+    ('get_density_matrix', ()),
+    ('get_brand_distribution', ()),
+    ('get_price_distribution', ()),
+    ('get_shop_type_distribution', ()),
+    ('get_hotpot_ranking', ()),
+    ('get_24hour_trend', ()),
+    ('get_district_comparison', ()),
+    ('get_metro_passengers', (0,)),
+    ('get_metro_passengers', (21,)),
+    ('get_city_operation', ()),
+    ('get_teahouse_time_series', ()),
+    ('get_teahouse_district_distribution', ()),
+    ('get_teahouse_cultural_tags', ()),
+    ('get_teahouse_wordcloud', ()),
+    ('get_city_temperature_index', ()),
+    ('get_district_vitality_ranking', ()),
+    ('get_active_alerts', ()),
+]
+
+
+def normalize(value):
+    """按接口输出的 JSON 比较，浮点数保留 6 位小数（数据库与 numpy 的求和顺序不同）"""
+    return _round(json.loads(json.dumps(value, default=json_default)))
+
+
+def _round(value):
+    if isinstance(value, float):
+        return round(value, 6)
+    if isinstance(value, dict):
+        return {key: _round(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_round(item) for item in value]
+    return value
+
+
+@pytest.mark.parametrize('method,args', SNAPSHOT_METHODS, ids=lambda value: str(value))
+def test_snapshot_matches_database(app, method, args):
+    service = DataService()
+    enabled = app.config['SNAPSHOT_ENABLED']
+    with app.app_context():
+        try:
+            app.config['SNAPSHOT_ENABLED'] = False
+            expected = getattr(service, method)(*args)
+            app.config['SNAPSHOT_ENABLED'] = True
+            snapshot_store.refresh(notify=False)
+            actual = getattr(service, method)(*args)
+        finally:
+            app.config['SNAPSHOT_ENABLED'] = enabled
+
+    assert expected, f"{method} 没有数据，测试数据需覆盖该方法"
+    assert normalize(actual) == normalize(expected)
@@ -1,79 +1,393 @@
 """
 缓存工具模块
-提供简单的内存缓存功能
+提供线程安全、有容量上限的 LRU/TTL 内存缓存
 """
 
+from flask import request, current_app
+from utils.response import encode_payload, payload_response
+from utils.data_version import data_version
 from functools import wraps
-from datetime import datetime, timedelta
+from collections import OrderedDict
 import json
+import sys
+import threading
+import time
 
 
-class SimpleCache:
-    """简单的内存缓存类"""
-    
-    def __init__(self):
-        self._cache = {}
-        self._expire_times = {}
-    
-    def get(self, key):
-        """获取缓存"""
-        if key not in self._cache:
-            return None
-        
-        # 检查是否过期
-        if key in self._expire_times:
-            if datetime.now() > self._expire_times[key]:
-                self.delete(key)
-                return None
-        
-        return self._cache[key]
-    
-    def set(self, key, value, timeout=300):
+# 缓存未命中标记（允许缓存 None）
+_MISSING = object()
+
+# 各数据表变更时需要失效的缓存命名空间
+TABLE_NAMESPACES = {
+    'districts': ('map', 'hotpot', 'night', 'teahouse', 'insight'),
+    'brands': ('hotpot',),
+    'hotpot_restaurants': ('map', 'hotpot', 'night', 'insight'),
+    'teahouses': ('map', 'teahouse', 'night', 'insight'),
+    'night_economy': ('night', 'insight'),
+    'alerts': ('insight',),
+}
+
+
+def key_namespace(key: str) -> str:
+    """缓存键的命名空间（第一个冒号之前的部分）"""
+    return key.partition(':')[0]
+
+
+def estimate_size(value) -> int:
+    """粗略估算对象占用的字节数（递归统计容器内元素）"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return len(value)
+
+    total = 0
+    seen = set()
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen:
+            continue
+        seen.add(id(obj))
+        total += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset)):
+            stack.extend(obj)
+    return total
+
+
+class LRUCache:
+    """线程安全的 LRU/TTL 内存缓存
+
+    - 按条目数和估算字节数双重限制容量，超出时淘汰最久未使用的条目
+    - 后台线程定期清理过期条目
+    - get_or_set 对同一个键只允许一个调用方重新计算（防止缓存击穿）
+    - 按命名空间维护键索引，按前缀删除只涉及受影响的键
+    """
+
+    def __init__(self, max_entries=1024, max_bytes=64 * 1024 * 1024,
+                 default_timeout=300, cleanup_interval=60):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.default_timeout = default_timeout
+        self.cleanup_interval = cleanup_interval
+
+        # key -> (value, expire_at, size)
+        self._cache = OrderedDict()
+        self._bytes = 0
+        # 命名空间 -> 键集合
+        self._namespaces = {}
+        # 命名空间 -> 失效代数，失效期间计算出的旧结果不再写入
+        self._generations = {}
+        self._lock = threading.RLock()
+        # key -> [lock, 引用计数]
+        self._key_locks = {}
+
+        self._stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'expirations': 0}
+        self._cleanup_thread = None
+        self._stop_event = threading.Event()
+
+    def configure(self, max_entries=None, max_bytes=None, default_timeout=None, cleanup_interval=None):
+        """更新容量配置，超出新上限的条目立即淘汰"""
+        with self._lock:
+            if max_entries is not None:
+                self.max_entries = max_entries
+            if max_bytes is not None:
+                self.max_bytes = max_bytes
+            if default_timeout is not None:
+                self.default_timeout = default_timeout
+            if cleanup_interval is not None:
+                self.cleanup_interval = cleanup_interval
+            self._evict()
+
+    def get(self, key, default=None):
+        """获取缓存，不存在或已过期时返回 default"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                self._stats['misses'] += 1
+                return default
+
+            value, expire_at, _ = entry
+            if expire_at is not None and time.monotonic() > expire_at:
+                self._remove(key)
+                self._stats['expirations'] += 1
+                self._stats['misses'] += 1
+                return default
+
+            self._cache.move_to_end(key)
+            self._stats['hits'] += 1
+            return value
+
+    def get_many(self, keys, default=None) -> list:
+        """批量获取缓存，未命中的位置为 default"""
+        return [self.get(key, default) for key in keys]
+
+    def set(self, key, value, timeout=None):
         """设置缓存
-        
+
         Args:
             key: 缓存键
             value: 缓存值
-            timeout: 过期时间（秒），默认5分钟
+            timeout: 过期时间（秒），为 None 时使用默认值，为 0 时永不过期
         """
-        self._cache[key] = value
-        if timeout:
-            self._expire_times[key] = datetime.now() + timedelta(seconds=timeout)
-    
+        if timeout is None:
+            timeout = self.default_timeout
+        size = estimate_size(value)
+        expire_at = time.monotonic() + timeout if timeout else None
+
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+            if self.max_bytes and size > self.max_bytes:
+                # 单个值超过总容量，不缓存
+                return
+            self._cache[key] = (value, expire_at, size)
+            self._bytes += size
+            self._namespaces.setdefault(key_namespace(key), set()).add(key)
+            self._evict()
+
+        self._ensure_cleanup_thread()
+
+    def get_or_set(self, key, factory, timeout=None):
+        """获取缓存，未命中时调用 factory 计算并写入
+
+        同一个键并发未命中时只有一个线程执行 factory，其余线程等待其结果。
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        key_lock = self._acquire_key_lock(key)
+        try:
+            with key_lock:
+                # 等待期间可能已由其他线程写入
+                value = self._peek(key)
+                if value is _MISSING:
+                    with self._lock:
+                        # 登记命名空间，计算期间按前缀删除时也能使本次结果作废
+                        generation = self._generations.setdefault(key_namespace(key), 0)
+                    value = factory()
+                    if generation == self._generations.get(key_namespace(key), 0):
+                        self.set(key, value, timeout=timeout)
+                return value
+        finally:
+            self._release_key_lock(key)
+
     def delete(self, key):
         """删除缓存"""
-        if key in self._cache:
-            del self._cache[key]
-        if key in self._expire_times:
-            del self._expire_times[key]
-    
+        with self._lock:
+            if key in self._cache:
+                self._remove(key)
+
+    def delete_prefix(self, prefix) -> int:
+        """删除指定前缀的所有缓存，返回删除数量
+
+        通过命名空间索引定位候选键，只遍历受影响的命名空间。
+        """
+        with self._lock:
+            keys = [key for key in self._prefix_candidates(prefix) if key.startswith(prefix)]
+            for key in keys:
+                self._remove(key)
+            # 没有已缓存的键时也要递增代数，丢弃正在计算中的旧结果
+            namespace, sep, _ = prefix.partition(':')
+            namespaces = {key_namespace(key) for key in keys}
+            if sep:
+                namespaces.add(namespace)
+            else:
+                namespaces.update(name for name in self._generations if name.startswith(prefix))
+            for namespace in namespaces:
+                self._bump_generation(namespace)
+            return len(keys)
+
+    def delete_namespace(self, namespace) -> int:
+        """删除整个命名空间的缓存，返回删除数量"""
+        with self._lock:
+            keys = list(self._namespaces.get(namespace, ()))
+            for key in keys:
+                self._remove(key)
+            self._bump_generation(namespace)
+            return len(keys)
+
     def clear(self):
         """清空所有缓存"""
-        self._cache.clear()
-        self._expire_times.clear()
-    
-    def cleanup(self):
-        """清理过期缓存"""
-        now = datetime.now()
-        expired_keys = [
-            key for key, expire_time in self._expire_times.items()
-            if now > expire_time
+        with self._lock:
+            self._cache.clear()
+            for namespace in list(self._namespaces):
+                self._bump_generation(namespace)
+            self._namespaces.clear()
+            self._bytes = 0
+
+    def cleanup(self) -> int:
+        """清理过期缓存，返回清理数量"""
+        now = time.monotonic()
+        with self._lock:
+            expired_keys = [
+                key for key, (_, expire_at, _) in self._cache.items()
+                if expire_at is not None and now > expire_at
+            ]
+            for key in expired_keys:
+                self._remove(key)
+            self._stats['expirations'] += len(expired_keys)
+            return len(expired_keys)
+
+    def keys(self):
+        """当前所有缓存键"""
+        with self._lock:
+            return list(self._cache.keys())
+
+    def stats(self) -> dict:
+        """命中、未命中、淘汰等统计信息"""
+        with self._lock:
+            return dict(self._stats, entries=len(self._cache), bytes=self._bytes)
+
+    def stop_cleanup(self):
+        """停止后台清理线程"""
+        self._stop_event.set()
+
+    # ==================== 内部方法 ====================
+
+    def _peek(self, key):
+        """读取未过期的值，不计入统计"""
+        with self._lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return _MISSING
+            value, expire_at, _ = entry
+            if expire_at is not None and time.monotonic() > expire_at:
+                return _MISSING
+            return value
+
+    def _remove(self, key):
+        _, _, size = self._cache.pop(key)
+        self._bytes -= size
+        namespace = key_namespace(key)
+        keys = self._namespaces.get(namespace)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._namespaces[namespace]
+
+    def _bump_generation(self, namespace):
+        self._generations[namespace] = self._generations.get(namespace, 0) + 1
+
+    def _prefix_candidates(self, prefix):
+        """可能匹配前缀的键"""
+        namespace, sep, _ = prefix.partition(':')
+        if sep:
+            return list(self._namespaces.get(namespace, ()))
+        # 前缀本身不含冒号时，匹配所有以其开头的命名空间
+        return [
+            key
+            for name, keys in self._namespaces.items() if name.startswith(prefix)
+            for key in keys
         ]
-        for key in expired_keys:
-            self.delete(key)
+
+    def _evict(self):
+        """淘汰最久未使用的条目直到满足容量限制"""
+        while self._cache and (
+            (self.max_entries and len(self._cache) > self.max_entries) or
+            (self.max_bytes and self._bytes > self.max_bytes)
+        ):
+            key = next(iter(self._cache))
+            self._remove(key)
+            self._stats['evictions'] += 1
+
+    def _acquire_key_lock(self, key) -> threading.Lock:
+        with self._lock:
+            entry = self._key_locks.get(key)
+            if entry is None:
+                entry = self._key_locks[key] = [threading.Lock(), 0]
+            entry[1] += 1
+            return entry[0]
+
+    def _release_key_lock(self, key):
+        with self._lock:
+            entry = self._key_locks[key]
+            entry[1] -= 1
+            if entry[1] == 0:
+                del self._key_locks[key]
+
+    def _ensure_cleanup_thread(self):
+        """首次写入时启动后台清理线程（fork 后的子进程会重新启动）"""
+        if not self.cleanup_interval:
+            return
+        thread = self._cleanup_thread
+        if thread is not None and thread.is_alive():
+            return
+        with self._lock:
+            if self._cleanup_thread is not None and self._cleanup_thread.is_alive():
+                return
+            self._stop_event.clear()
+            self._cleanup_thread = threading.Thread(
+                target=self._cleanup_loop, name='cache-cleanup', daemon=True
+            )
+            self._cleanup_thread.start()
+
+    def _cleanup_loop(self):
+        while not self._stop_event.wait(self.cleanup_interval):
+            self.cleanup()
+
+
+# 兼容旧名称
+SimpleCache = LRUCache
+
+
+class CacheProxy:
+    """全局缓存入口，实际后端由 init_cache 根据 CACHE_TYPE 选择"""
+
+    def __init__(self, backend):
+        self._backend = backend
+
+    @property
+    def backend(self):
+        return self._backend
+
+    def use(self, backend):
+        """切换缓存后端"""
+        self._backend = backend
+
+    def __getattr__(self, name):
+        return getattr(self._backend, name)
 
 
 # 全局缓存实例
-cache = SimpleCache()
+cache = CacheProxy(LRUCache())
+
+
+def init_cache(app):
+    """根据应用配置初始化全局缓存
+
+    CACHE_TYPE 为 RedisCache 时使用「进程内 LRU（L1）+ Redis（L2）」两级缓存，
+    多个 worker 共享 L2；否则只使用进程内 LRU。
+    """
+    local = LRUCache(
+        max_entries=app.config.get('CACHE_MAX_ENTRIES', 1024),
+        max_bytes=app.config.get('CACHE_MAX_BYTES', 64 * 1024 * 1024),
+        default_timeout=app.config.get('CACHE_DEFAULT_TIMEOUT', 300),
+        cleanup_interval=app.config.get('CACHE_CLEANUP_INTERVAL', 60)
+    )
+
+    if app.config.get('CACHE_TYPE', 'SimpleCache').lower() in ('rediscache', 'redis'):
+        from utils.redis_cache import RedisCache, TwoLevelCache, create_redis_client
+
+        remote = RedisCache(
+            create_redis_client(app.config),
+            key_prefix=app.config.get('CACHE_KEY_PREFIX', 'cf:'),
+            default_timeout=app.config.get('CACHE_DEFAULT_TIMEOUT', 300)
+        )
+        cache.use(TwoLevelCache(local, remote, l1_timeout=app.config.get('CACHE_L1_TIMEOUT', 5)))
+        data_version.configure(remote.client, key_prefix=remote.key_prefix)
+    else:
+        cache.use(local)
 
 
 def cache_response(timeout=300, key_prefix=''):
     """缓存装饰器
-    
+
     Args:
         timeout: 缓存过期时间（秒）
         key_prefix: 缓存键前缀
-    
+
     Example:
         @cache_response(timeout=600, key_prefix='districts')
         def get_districts():
@@ -88,30 +402,82 @@ def cache_response(timeout=300, key_prefix=''):
                 cache_key += f":{str(args)}"
             if kwargs:
                 cache_key += f":{json.dumps(kwargs, sort_keys=True)}"
-            
-            # 尝试从缓存获取
-            cached = cache.get(cache_key)
-            if cached is not None:
-                return cached
-            
-            # 执行函数并缓存结果
-            result = f(*args, **kwargs)
-            cache.set(cache_key, result, timeout=timeout)
-            
-            return result
+
+            # 未命中时只有一个调用方执行函数，其余等待其结果
+            return cache.get_or_set(cache_key, lambda: f(*args, **kwargs), timeout=timeout)
         return decorated_function
     return decorator
 
 
+def cached_route(namespace, timeout=None):
+    """路由缓存装饰器，用于 Resource 的 GET 方法
+
+    缓存键由命名空间、请求路径和查询参数组成，过期时间默认取
+    Config.CACHE_TIMEOUTS 中对应命名空间的配置。缓存的是预先编码（及压缩）
+    好的 JSON 字节，命中时直接返回，不再重复序列化。
+
+    Args:
+        namespace: 缓存命名空间（map / hotpot / night / teahouse / insight）
+        timeout: 过期时间（秒），为空时使用配置
+
+    Example:
+        @api.route('/districts')
+        class Districts(Resource):
+            @cached_route('map')
+            def get(self):
+                return data_service.get_districts()
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated_function(*args, **kwargs):
+            ttl = timeout if timeout is not None else namespace_timeout(namespace)
+            payload = cache.get_or_set(
+                route_cache_key(namespace),
+                lambda: encode_payload(f(*args, **kwargs)),
+                timeout=ttl
+            )
+            return payload_response(payload)
+        return decorated_function
+    return decorator
+
+
+def namespace_timeout(namespace) -> int:
+    """命名空间的缓存时间（秒），取自 Config.CACHE_TIMEOUTS"""
+    return current_app.config.get('CACHE_TIMEOUTS', {}).get(
+        namespace, current_app.config.get('CACHE_DEFAULT_TIMEOUT', 300)
+    )
+
+
+def route_cache_key(namespace, path=None, args=None) -> str:
+    """生成路由缓存键，默认使用当前请求的路径和查询参数"""
+    if path is None:
+        path = request.path
+    if args is None:
+        args = request.args
+    cache_key = f"{namespace}:{path}"
+    if args:
+        cache_key += '?' + '&'.join(f"{k}={v}" for k, v in sorted(args.items(multi=True)))
+    return cache_key
+
+
 def clear_cache_by_prefix(prefix):
     """清除指定前缀的缓存
-    
+
     Args:
         prefix: 缓存键前缀
     """
-    keys_to_delete = [
-        key for key in cache._cache.keys()
-        if key.startswith(prefix)
-    ]
-    for key in keys_to_delete:
-        cache.delete(key)
+    cache.delete_prefix(prefix)
+
+
+def invalidate_tables(*tables):
+    """数据表变更后清除受影响命名空间的缓存
+
+    Args:
+        *tables: 发生变更的表名，如 'hotpot_restaurants'
+    """
+    namespaces = set()
+    for table in tables:
+        namespaces.update(TABLE_NAMESPACES.get(table, ()))
+    for namespace in namespaces:
+        cache.delete_namespace(namespace)
+    return namespaces
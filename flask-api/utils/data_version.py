@@ -0,0 +1,126 @@
+"""
+数据版本号
+每次数据导入后递增，用于生成 ETag / Last-Modified 以及通知前端刷新
+"""
+
+from datetime import datetime
+import threading
+import time
+import logging
+import zlib
+
+logger = logging.getLogger(__name__)
+
+
+class DataVersion:
+    """数据版本号
+
+    默认保存在进程内；配置 Redis 后保存在 Redis 中，所有 worker 共享同一版本。
+    版本由数据库各表指纹计算（见 seed / bump），未配置 Redis 时各 worker 对同一份数据也得到同一版本。
+    """
+
+    def __init__(self, check_interval=1.0):
+        now = time.time()
+        # 以启动时间作为初始版本，重启后客户端的旧 ETag 自动失效
+        self._version = f"{int(now * 1000):x}"
+        self._updated_at = now
+        self._lock = threading.Lock()
+
+        self._client = None
+        self._key = None
+        self._check_interval = check_interval
+        self._checked_at = 0.0
+
+    def configure(self, client=None, key_prefix='cf:'):
+        """使用 Redis 共享版本号"""
+        self._client = client
+        self._key = f"{key_prefix}__data_version__"
+        self._checked_at = 0.0
+
+    def get(self):
+        """当前版本
+
+        Returns:
+            (版本号字符串, 更新时间戳)
+        """
+        if self._client is not None and time.monotonic() - self._checked_at > self._check_interval:
+            self._sync()
+        return self._version, self._updated_at
+
+    def seed(self, fingerprint: dict):
+        """以数据库各表指纹作为初始版本（启动时调用）
+
+        Args:
+            fingerprint: 表名 -> (行数, 最后更新时间)，见 snapshot_service.load_fingerprint
+        """
+        version, updated_at = fingerprint_version(fingerprint)
+        with self._lock:
+            self._version = f"{version:x}"
+            self._updated_at = updated_at or self._updated_at
+
+    def bump(self, fingerprint: dict = None) -> str:
+        """递增版本号，返回新版本
+
+        Args:
+            fingerprint: 变更后的表指纹，传入时按指纹计算版本，否则按当前时间
+        """
+        now = time.time()
+        with self._lock:
+            if fingerprint is not None:
+                version = f"{fingerprint_version(fingerprint)[0]:x}"
+            else:
+                version = f"{int(now * 1000):x}"
+            if int(version, 16) <= int(self._version, 16):
+                version = f"{int(self._version, 16) + 1:x}"
+            self._version, self._updated_at = version, now
+
+        if self._client is not None:
+            try:
+                self._client.hset(self._key, mapping={'version': version, 'updated_at': now})
+                self._checked_at = time.monotonic()
+            except Exception as e:
+                logger.warning(f"写入数据版本失败: {e}")
+        return version
+
+    def _sync(self):
+        """从 Redis 读取版本；Redis 中尚无版本时写入本进程的版本"""
+        try:
+            self._client.hsetnx(self._key, 'version', self._version)
+            self._client.hsetnx(self._key, 'updated_at', self._updated_at)
+            data = self._client.hgetall(self._key)
+            with self._lock:
+                self._version = data[b'version'].decode()
+                self._updated_at = float(data[b'updated_at'])
+        except Exception as e:
+            logger.warning(f"读取数据版本失败: {e}")
+        self._checked_at = time.monotonic()
+
+
+def _timestamp(value):
+    if isinstance(value, str):
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return None
+    if isinstance(value, datetime):
+        return value.timestamp()
+    return None
+
+
+def fingerprint_version(fingerprint: dict):
+    """由表指纹计算版本
+
+    版本为最后更新时间（秒）* 1000 加上指纹的哈希（0-999），与按毫秒时间生成的版本可以比较大小；
+    只有行数变化（如删除）时哈希不同，版本也随之改变。
+
+    Returns:
+        (版本整数, 最后更新时间戳，无时间时为 None)
+    """
+    stamps = [_timestamp(value[-1]) for value in fingerprint.values() if value]
+    latest = max((stamp for stamp in stamps if stamp is not None), default=None)
+    digest = zlib.crc32(repr(sorted(fingerprint.items())).encode('utf-8')) % 1000
+    return int(latest or 0) * 1000 + digest, latest
+
+
+# 全局数据版本
+data_version = DataVersion()
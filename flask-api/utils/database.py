@@ -2,10 +2,29 @@
 数据库工具函数
 """
 
-from models import db, District, Brand, HotpotRestaurant, Teahouse, NightEconomy, Alert
+from abc import ABC, abstractmethod
+from flask import current_app
+from models import db
+from services.change_watcher import change_watcher
+from services.snapshot_service import load_fingerprint, snapshot_store
+from sqlalchemy import text
+from utils.cache import invalidate_tables
+from utils.data_version import data_version
+from utils.event_stream import event_broadcaster
+import csv
+import io
 import json
 import os
-from typing import List
+import time
+import uuid
+from typing import Callable, Dict, Iterable, Iterator, List
+
+try:
+    import ijson
+except ImportError:  # ijson 为可选依赖，未安装时整体加载 JSON 文件
+    ijson = None
+
+PROGRESS_INTERVAL = 2  # 导入进度输出间隔（秒）
 
 
 def init_db():
@@ -14,176 +33,513 @@ def init_db():
     print("✅ 数据库表创建完成")
 
 
+def on_data_changed(tables):
+    """数据表变更后的统一处理：清除受影响的接口缓存、递增数据版本并推送给前端
+
+    Args:
+        tables: 发生变更的表名列表
+    """
+    if not tables:
+        return
+    invalidate_tables(*tables)
+    try:
+        fingerprint = load_fingerprint()
+    except Exception as e:
+        print(f"⚠️  读取数据表指纹失败: {e}")
+        fingerprint = None
+    event_broadcaster.announce(data_version.bump(fingerprint), tables)
+    # 本次变更已处理，更新指纹基准
+    change_watcher.sync(fingerprint)
+
+
+def on_external_change(tables):
+    """指纹检查发现外部写入后：替换内存快照（若启用）并按数据变更处理"""
+    if current_app.config.get('SNAPSHOT_ENABLED', False):
+        snapshot_store.refresh(notify=False)
+    on_data_changed(tables)
+
+
+class RecordReader(ABC):
+    """流式读取数据文件中的记录
+
+    子类实现 _records 逐条产生记录字典；迭代过程中 progress 为已读取字节占文件大小的比例。
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.size = os.path.getsize(path)
+        self._file = None
+        self._done = False
+
+    def __iter__(self):
+        with open(self.path, 'rb') as f:
+            self._file = f
+            yield from self._records(f)
+        self._done = True
+
+    @abstractmethod
+    def _records(self, f) -> Iterator[dict]:
+        """从以二进制方式打开的文件 f 中逐条产生记录"""
+
+    @property
+    def progress(self) -> float:
+        if self._done:
+            return 1.0
+        if self._file is None or self._file.closed or not self.size:
+            return 0.0
+        return min(self._file.tell() / self.size, 1.0)
+
+
+class JsonRecordReader(RecordReader):
+    """JSON 数组文件
+
+    安装 ijson 时逐条解析记录，内存占用与文件大小无关；否则退回 json.load 整体加载。
+    """
+
+    def _records(self, f):
+        if ijson is not None:
+            yield from ijson.items(f, 'item', use_float=True)
+        else:
+            yield from json.load(f)
+
+
+class CsvRecordReader(RecordReader):
+    """带表头的 CSV 文件（兼容导出接口生成的带 BOM 文件）
+
+    空字符串视为 NULL，True / False 转为 1 / 0。
+    """
+
+    BOOLEANS = {'true': 1, 'false': 0}
+
+    def _records(self, f):
+        for row in csv.DictReader(io.TextIOWrapper(f, encoding='utf-8-sig', newline='')):
+            yield {key: self._value(value) for key, value in row.items()}
+
+    def _value(self, value: str):
+        if value == '':
+            return None
+        return self.BOOLEANS.get(value.lower(), value)
+
+
+def open_records(path: str) -> RecordReader:
+    """按扩展名选择 CSV / JSON 读取器"""
+    if path.lower().endswith('.csv'):
+        return CsvRecordReader(path)
+    return JsonRecordReader(path)
+
+
 def load_json_data(json_file: str):
-    """从JSON文件加载数据"""
+    """从JSON文件流式读取记录，文件不存在时返回 None"""
     if not os.path.exists(json_file):
         print(f"⚠️  数据文件不存在: {json_file}")
         return
 
-    with open(json_file, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data
+    return JsonRecordReader(json_file)
+
+
+def _progress_printer(table: str) -> Callable[[int, float], None]:
+    """每隔 PROGRESS_INTERVAL 秒输出一次导入进度与吞吐量"""
+    started = last = time.perf_counter()
+
+    def report(count: int, progress: float):
+        nonlocal last
+        now = time.perf_counter()
+        if now - last < PROGRESS_INTERVAL:
+            return
+        last = now
+        print(f"   {table}: {count} 条（{progress:.0%}），{count / (now - started):,.0f} 行/秒")
+
+    return report
+
+
+def _district_row(item: dict) -> dict:
+    return {
+        'id': item['id'],
+        'name': item['name'],
+        'area_km2': item.get('area_km2'),
+        'hotpot_density': item.get('hotpot_density'),
+        'population': item.get('population'),
+        'vitality_score': item.get('vitality_score')
+    }
+
+
+def _brand_row(item: dict) -> dict:
+    return {
+        'id': item['id'],
+        'name': item['name'],
+        'market_share': item.get('market_share'),
+        'avg_wait_time': item.get('avg_wait_time'),
+        'store_count': item.get('store_count'),
+        'price_position': item.get('price_position', '中端'),
+        'update_date': item.get('update_date')
+    }
+
+
+def _hotpot_row(item: dict) -> dict:
+    coordinates = item.get('coordinates') or {}
+    return {
+        'id': item['id'],
+        'name': item['name'],
+        'brand_id': item.get('brand_id'),
+        'address': item.get('address'),
+        'district_id': item['district_id'],
+        'price_min': item.get('price_min'),
+        'price_max': item.get('price_max'),
+        'price_avg': item.get('price_avg'),
+        'rating': item.get('rating'),
+        'review_count': item.get('review_count'),
+        'shop_type': item.get('shop_type'),
+        'business_hours': item.get('business_hours'),
+        'is_24h': item.get('is_24h', False),
+        'open_date': item.get('open_date'),
+        'status': item.get('status', 1),
+        'coordinates_lng': item.get('coordinates_lng', coordinates.get('lng')),
+        'coordinates_lat': item.get('coordinates_lat', coordinates.get('lat'))
+    }
+
+
+def _teahouse_row(item: dict) -> dict:
+    coordinates = item.get('coordinates') or {}
+    return {
+        'id': item['id'],
+        'name': item['name'],
+        'address': item.get('address'),
+        'district_id': item['district_id'],
+        'founding_year': item.get('founding_year'),
+        'tea_type': item.get('tea_type'),
+        'avg_price': item.get('avg_price'),
+        'popularity': item.get('popularity'),
+        'is_historic': item.get('is_historic', False),
+        'community_type': item.get('community_type'),
+        'cultural_tags': _json_text(item.get('cultural_tags', [])),
+        'coordinates_lng': item.get('coordinates_lng', coordinates.get('lng')),
+        'coordinates_lat': item.get('coordinates_lat', coordinates.get('lat')),
+        'update_time': item.get('update_time')
+    }
+
+
+def _json_text(value):
+    """JSON 文件中为数组，CSV 中已是 JSON 文本"""
+    return value if value is None or isinstance(value, str) else json.dumps(value)
+
+
+def _night_economy_row(item: dict) -> dict:
+    return {
+        'id': item['id'],
+        'timestamp': item.get('timestamp'),
+        'hour': item['hour'],
+        'district_id': item['district_id'],
+        'population_index': item.get('population_index'),
+        'consumption_heat': item.get('consumption_heat'),
+        'metro_passengers': item.get('metro_passengers'),
+        'active_businesses': item.get('active_businesses'),
+        'weather': item.get('weather'),
+        'special_event': item.get('special_event'),
+        'date': item.get('date'),
+        'time': item.get('time')
+    }
+
+
+def _alert_row(item: dict) -> dict:
+    return {
+        'id': item['id'],
+        'alert_time': item.get('alert_time'),
+        'alert_type': item['alert_type'],
+        'content': item.get('content'),
+        'impact_value': item.get('impact_value'),
+        'status': item.get('status', 1)
+    }
+
+
+# 可导入的表：表名 -> (数据文件, 行映射函数)，按外键依赖顺序排列
+IMPORT_SOURCES = {
+    'districts': ('districts.json', _district_row),
+    'brands': ('brands.json', _brand_row),
+    'hotpot_restaurants': ('hotpot_restaurants.json', _hotpot_row),
+    'teahouses': ('teahouses.json', _teahouse_row),
+    'night_economy': ('night_economy_realtime.json', _night_economy_row),
+    'alerts': ('alerts.json', _alert_row),
+}
+
+# 暂存表名为 {table}__staging_{导入ID}，并发的导入各用各的暂存表
+STAGING_SUFFIX = '__staging'
+
+# 导入时填写的时间列（表结构没有服务端默认值，源数据缺失时取数据库当前时间）
+IMPORT_TIMESTAMPS = {
+    'districts': ('created_at', 'updated_at'),
+    'brands': ('created_at', 'updated_at'),
+    'hotpot_restaurants': ('created_at', 'updated_at'),
+    'teahouses': ('created_at', 'update_time'),
+    'night_economy': ('created_at',),
+    'alerts': ('created_at',),
+}
+
+# 覆盖已有行且数据有变化时刷新为当前时间的列（增量导出与快照指纹依赖它）
+REFRESHED_TIMESTAMPS = {
+    'districts': 'updated_at',
+    'brands': 'updated_at',
+    'hotpot_restaurants': 'updated_at',
+}
+
+# 合并时由经纬度生成 location 的表（MySQL SRID 4326 按 POINT(纬度 经度) 存储）
+LOCATION_TABLES = ('hotpot_restaurants', 'teahouses')
+LOCATION_SQL = "ST_GeomFromText(CONCAT('POINT(', coordinates_lat, ' ', coordinates_lng, ')'), 4326)"
+
+
+def _batched(items: Iterable, size: int):
+    batch = []
+    for item in items:
+        batch.append(item)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class BulkImporter:
+    """批量 UPSERT 导入
+
+    - 数据先按批写入本次导入专用的暂存表（{table}__staging_{导入ID}），暂存期间业务表不受影响，
+      同时运行的多个导入（命令行、后台任务、多个 worker）互不干扰
+    - 全部暂存完成后在一个事务内按外键顺序合并到业务表（按主键 UPSERT），
+      大屏要么看到导入前的数据，要么看到完整的新数据，任何一步失败都整体回滚
+    - 已有行按主键覆盖，重复导入同一份数据结果不变（数据未变化的行不刷新 updated_at）；
+      created_at 保留首次导入的时间
+    - 默认只合并：新文件中没有的行仍保留在业务表中；replace 中的表在同一事务内删除这些行，
+      合并后与导入文件完全一致（没有暂存任何行的表不做删除，避免空文件清空业务表）
+    - 暂存表只包含导入的列，location 在合并时由经纬度生成
+    """
+
+    def __init__(self, engine=None, batch_size: int = None, replace: Iterable[str] = ()):
+        self.engine = engine or db.engine
+        self.batch_size = batch_size or current_app.config.get('IMPORT_BATCH_SIZE', 5000)
+        self.replace = set(replace)
+        self.suffix = f"{STAGING_SUFFIX}_{uuid.uuid4().hex[:8]}"
+        self._staged = {}  # 表名 -> 暂存的列名
+
+    @property
+    def dialect(self) -> str:
+        return self.engine.dialect.name
+
+    def stage(self, table: str, rows: Iterable[dict], on_progress: Callable[[int], None] = None) -> int:
+        """把行按批写入暂存表，返回行数
+
+        Args:
+            table: 表名
+            rows: 行字典的可迭代对象，逐批消费，不会整体载入内存
+            on_progress: 每写完一批后以累计行数回调
+        """
+        self._staged[table] = []
+        timestamps = IMPORT_TIMESTAMPS.get(table, ())
+        now = self._now() if timestamps else None
+        count = 0
+        started = time.perf_counter()
+        statement = None
+        for batch in _batched(rows, self.batch_size):
+            for row in batch:
+                for column in timestamps:
+                    if row.get(column) is None:
+                        row[column] = now
+            if statement is None:
+                columns = list(batch[0])
+                self._create_staging(table, columns)
+                statement = text(
+                    f"INSERT INTO {self.staging_table(table)} ({', '.join(columns)}) "
+                    f"VALUES ({', '.join(':' + column for column in columns)})"
+                )
+            with self.engine.begin() as conn:
+                conn.execute(statement, batch)
+            count += len(batch)
+            if on_progress is not None:
+                on_progress(count)
+
+        elapsed = time.perf_counter() - started
+        rate = count / elapsed if elapsed > 0 else 0
+        print(f"📦 暂存 {table}: {count} 条，{elapsed:.2f}s，{rate:,.0f} 行/秒")
+        return count
+
+    def merge(self) -> List[str]:
+        """在一个事务内把所有暂存表合并到业务表，返回有数据的表"""
+        tables = [table for table in IMPORT_SOURCES if self._staged.get(table)]
+        with self.engine.begin() as conn:
+            for table in tables:
+                conn.execute(text(self._upsert_sql(table, self._staged[table])))
+            # 删除按外键逆序进行，先删子表再删父表
+            for table in reversed(tables):
+                if table in self.replace:
+                    conn.execute(text(
+                        f"DELETE FROM {table} WHERE id NOT IN (SELECT id FROM {self.staging_table(table)})"
+                    ))
+        return tables
+
+    def cleanup(self):
+        """删除本次导入创建的暂存表"""
+        with self.engine.begin() as conn:
+            for table in self._staged:
+                conn.execute(text(f"DROP TABLE IF EXISTS {self.staging_table(table)}"))
+        self._staged.clear()
+
+    def staging_table(self, table: str) -> str:
+        """本次导入使用的暂存表名"""
+        return table + self.suffix
+
+    def _now(self):
+        """数据库当前时间，与 CURRENT_TIMESTAMP 使用同一时区"""
+        with self.engine.connect() as conn:
+            return conn.execute(text("SELECT CURRENT_TIMESTAMP")).scalar()
+
+    def _create_staging(self, table: str, columns: List[str]):
+        """按导入的列建暂存表（不复制索引与 location 的 NOT NULL 约束）"""
+        staging = self.staging_table(table)
+        self._staged[table] = columns
+        with self.engine.begin() as conn:
+            conn.execute(text(f"DROP TABLE IF EXISTS {staging}"))
+            conn.execute(text(f"CREATE TABLE {staging} AS SELECT {', '.join(columns)} FROM {table} WHERE 1 = 0"))
+
+    def _upsert_sql(self, table: str, columns: List[str]) -> str:
+        targets, values = list(columns), list(columns)
+        if self.dialect == 'mysql' and table in LOCATION_TABLES and 'coordinates_lng' in columns:
+            targets.append('location')
+            values.append(LOCATION_SQL)
+
+        insert = (
+            f"INSERT INTO {table} ({', '.join(targets)}) "
+            f"SELECT {', '.join(values)} FROM {self.staging_table(table)}"
+        )
+        refreshed = REFRESHED_TIMESTAMPS.get(table)
+        updates = [column for column in targets if column not in ('id', 'created_at', refreshed)]
+        # 判断行是否变化的列（location 由经纬度生成，不单独比较）
+        compared = [column for column in updates if column != 'location']
+
+        if self.dialect == 'mysql':
+            assignments = [f"{column} = VALUES({column})" for column in updates]
+            if refreshed:
+                # 只在数据变化时刷新更新时间；MySQL 按从左到右的顺序赋值，须放在其他列之前
+                unchanged = ' AND '.join(f"{column} <=> VALUES({column})" for column in compared)
+                assignments.insert(0, f"{refreshed} = IF({unchanged}, {refreshed}, CURRENT_TIMESTAMP)")
+            return f"{insert} ON DUPLICATE KEY UPDATE {', '.join(assignments)}"
+
+        # SQLite：INSERT ... SELECT 需要 WHERE 子句消除 ON CONFLICT 的语法歧义；数据未变化的行不更新
+        assignments = [f"{column} = excluded.{column}" for column in updates]
+        if refreshed:
+            assignments.append(f"{refreshed} = CURRENT_TIMESTAMP")
+        changed = ' OR '.join(f"{table}.{column} IS NOT excluded.{column}" for column in compared)
+        return (
+            f"{insert} WHERE true ON CONFLICT(id) DO UPDATE SET {', '.join(assignments)}"
+            + (f" WHERE {changed}" if changed else "")
+        )
 
 
-def import_districts():
-    """导入区县数据"""
-    data = load_json_data('../public/data/districts.json')
-    if not data:
-        return
+def import_tables(tables: List[str] = None, data_dir: str = None, notify: bool = True,
+                  replace: bool = False) -> Dict[str, int]:
+    """从 JSON 文件批量导入数据表
+
+    Args:
+        tables: 要导入的表名列表，默认全部
+        data_dir: 数据文件目录，默认 IMPORT_DATA_DIR
+        notify: 导入后是否刷新快照并通知数据变更
+        replace: 是否删除导入文件中没有的行，默认只合并
+
+    Returns:
+        各表导入的行数
+    """
+    data_dir = data_dir or current_app.config['IMPORT_DATA_DIR']
+    tables = [table for table in IMPORT_SOURCES if tables is None or table in tables]
+    importer = BulkImporter(replace=tables if replace else ())
+    imported = {}
+    try:
+        for table in tables:
+            path = os.path.join(data_dir, IMPORT_SOURCES[table][0])
+            if not os.path.exists(path):
+                print(f"⚠️  数据文件不存在: {path}")
+                imported[table] = 0
+                continue
+            imported[table] = _stage_file(importer, table, path)
+        importer.merge()
+    finally:
+        importer.cleanup()
+
+    for table, count in imported.items():
+        print(f"✅ 导入 {table}: {count} 条")
+
+    changed = [table for table, count in imported.items() if count]
+    if notify and changed:
+        # 导入完成后整体替换内存快照，再清除受影响命名空间的接口缓存、递增数据版本
+        snapshot_store.refresh(notify=False)
+        on_data_changed(changed)
+    return imported
+
+
+def import_file(table: str, path: str, on_progress: Callable[[int, float], None] = None,
+                notify: bool = True, replace: bool = False) -> int:
+    """把单个 CSV / JSON 文件批量导入到指定表
+
+    Args:
+        table: 表名（IMPORT_SOURCES 中的键）
+        path: 数据文件路径
+        on_progress: 进度回调 (累计行数, 已读取字节比例)，默认输出到控制台
+        notify: 导入后是否刷新快照并通知数据变更
+        replace: 是否删除导入文件中没有的行，默认只合并
+
+    Returns:
+        导入的行数
+    """
+    importer = BulkImporter(replace=[table] if replace else ())
+    try:
+        count = _stage_file(importer, table, path, on_progress)
+        importer.merge()
+    finally:
+        importer.cleanup()
+
+    if notify and count:
+        snapshot_store.refresh(notify=False)
+        on_data_changed([table])
+    return count
+
+
+def _stage_file(importer: BulkImporter, table: str, path: str,
+                on_progress: Callable[[int, float], None] = None) -> int:
+    reader = open_records(path)
+    to_row = IMPORT_SOURCES[table][1]
+    on_progress = on_progress or _progress_printer(table)
+    return importer.stage(table, map(to_row, reader), lambda count: on_progress(count, reader.progress))
 
-    for item in data:
-        district = District(
-            id=item['id'],
-            name=item['name'],
-            area_km2=item.get('area_km2'),
-            hotpot_density=item.get('hotpot_density'),
-            population=item.get('population'),
-            vitality_score=item.get('vitality_score')
-        )
-        db.session.add(district)
 
-    db.session.commit()
-    print(f"✅ 导入区县数据: {len(data)} 条")
+def import_districts():
+    """导入区县数据"""
+    return import_tables(['districts'])['districts']
 
 
 def import_brands():
     """导入品牌数据"""
-    data = load_json_data('../public/data/brands.json')
-    if not data:
-        return
-
-    for item in data:
-        brand = Brand(
-            id=item['id'],
-            name=item['name'],
-            market_share=item.get('market_share'),
-            avg_wait_time=item.get('avg_wait_time'),
-            store_count=item.get('store_count'),
-            price_position=item.get('price_position', '中端'),
-            update_date=item.get('update_date')
-        )
-        db.session.add(brand)
-
-    db.session.commit()
-    print(f"✅ 导入品牌数据: {len(data)} 条")
+    return import_tables(['brands'])['brands']
 
 
 def import_hotpot_restaurants():
     """导入火锅店数据"""
-    data = load_json_data('../public/data/hotpot_restaurants.json')
-    if not data:
-        return
-
-    for item in data:
-        restaurant = HotpotRestaurant(
-            id=item['id'],
-            name=item['name'],
-            brand_id=item.get('brand_id'),
-            address=item.get('address'),
-            district_id=item['district_id'],
-            price_min=item.get('price_min'),
-            price_max=item.get('price_max'),
-            price_avg=item.get('price_avg'),
-            rating=item.get('rating'),
-            review_count=item.get('review_count'),
-            shop_type=item.get('shop_type'),
-            business_hours=item.get('business_hours'),
-            is_24h=item.get('is_24h', False),
-            open_date=item.get('open_date'),
-            status=item.get('status', 1)
-        )
-        db.session.add(restaurant)
-
-    db.session.commit()
-    print(f"✅ 导入火锅店数据: {len(data)} 条")
+    return import_tables(['hotpot_restaurants'])['hotpot_restaurants']
 
 
 def import_teahouses():
     """导入茶馆数据"""
-    data = load_json_data('../public/data/teahouses.json')
-    if not data:
-        return
-
-    for item in data:
-        teahouse = Teahouse(
-            id=item['id'],
-            name=item['name'],
-            address=item.get('address'),
-            district_id=item['district_id'],
-            founding_year=item.get('founding_year'),
-            tea_type=item.get('tea_type'),
-            avg_price=item.get('avg_price'),
-            popularity=item.get('popularity'),
-            is_historic=item.get('is_historic', False),
-            community_type=item.get('community_type'),
-            cultural_tags=json.dumps(item.get('cultural_tags', [])),
-            coordinates_lng=item.get('coordinates', {}).get('lng'),
-            coordinates_lat=item.get('coordinates', {}).get('lat'),
-            update_time=item.get('update_time')
-        )
-        db.session.add(teahouse)
-
-    db.session.commit()
-    print(f"✅ 导入茶馆数据: {len(data)} 条")
+    return import_tables(['teahouses'])['teahouses']
 
 
 def import_night_economy():
     """导入夜间经济数据"""
-    data = load_json_data('../public/data/night_economy_realtime.json')
-    if not data:
-        return
-
-    for item in data:
-        night_economy = NightEconomy(
-            id=item['id'],
-            timestamp=item.get('timestamp'),
-            hour=item['hour'],
-            district_id=item['district_id'],
-            population_index=item.get('population_index'),
-            consumption_heat=item.get('consumption_heat'),
-            metro_passengers=item.get('metro_passengers'),
-            active_businesses=item.get('active_businesses'),
-            weather=item.get('weather'),
-            special_event=item.get('special_event'),
-            date=item.get('date'),
-            time=item.get('time')
-        )
-        db.session.add(night_economy)
-
-    db.session.commit()
-    print(f"✅ 导入夜间经济数据: {len(data)} 条")
+    return import_tables(['night_economy'])['night_economy']
 
 
 def import_alerts():
     """导入预警数据"""
-    data = load_json_data('../public/data/alerts.json')
-    if not data:
-        return
-
-    for item in data:
-        alert = Alert(
-            id=item['id'],
-            alert_time=item.get('alert_time'),
-            alert_type=item['alert_type'],
-            content=item.get('content'),
-            impact_value=item.get('impact_value'),
-            status=item.get('status', 1)
-        )
-        db.session.add(alert)
-
-    db.session.commit()
-    print(f"✅ 导入预警数据: {len(data)} 条")
+    return import_tables(['alerts'])['alerts']
 
 
 def import_all_data():
-    """导入所有数据"""
+    """导入所有数据（可重复执行，已有数据按主键覆盖）"""
     print("🚀 开始导入数据...")
-    import_districts()
-    import_brands()
-    import_hotpot_restaurants()
-    import_teahouses()
-    import_night_economy()
-    import_alerts()
+    import_tables()
     print("🎉 所有数据导入完成！")
 
 
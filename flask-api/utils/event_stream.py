@@ -0,0 +1,196 @@
+"""
+数据变更推送（Server-Sent Events）
+数据版本变化时向所有大屏推送一条事件，代替前端定时轮询
+"""
+
+from services.change_watcher import change_watcher
+from services.dashboard_service import PANELS
+from services.snapshot_service import snapshot_store
+from utils.cache import TABLE_NAMESPACES
+from utils.data_version import data_version
+import json
+import logging
+import queue
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+def affected_panels(tables) -> dict:
+    """变更的表影响到的缓存命名空间与面板"""
+    namespaces = set()
+    for table in tables or ():
+        namespaces.update(TABLE_NAMESPACES.get(table, ()))
+    panels = [name for name, (namespace, _) in PANELS.items() if namespace in namespaces]
+    return {'namespaces': sorted(namespaces), 'panels': panels}
+
+
+class EventBroadcaster:
+    """事件广播器
+
+    - 每个事件只编码一次，按订阅者逐一放入各自的队列，N 个连接的成本只有一次计算
+    - 订阅者队列有上限，慢连接只保留最新的事件（前端只关心最新版本）
+    - 配置 Redis 后通过发布/订阅在多个 worker 之间转发，每个 worker 只维持一个订阅连接
+    - 后台线程定期检查表指纹、快照和数据版本，补发外部导入或丢失的版本变更
+    """
+
+    def __init__(self, heartbeat=15, poll_interval=5, queue_size=16):
+        self.heartbeat = heartbeat
+        self.poll_interval = poll_interval
+        self.queue_size = queue_size
+
+        self._subscribers = set()
+        self._lock = threading.Lock()
+        self._last_version = None
+        self._app = None
+        self._client = None
+        self._channel = None
+        self._threads_started = False
+
+    def configure(self, app, client=None, key_prefix='cf:'):
+        """绑定应用，可选使用 Redis 在 worker 之间转发事件"""
+        self._app = app
+        self.heartbeat = app.config.get('SSE_HEARTBEAT', self.heartbeat)
+        self.poll_interval = app.config.get('SSE_POLL_INTERVAL', self.poll_interval)
+        self.queue_size = app.config.get('SSE_QUEUE_SIZE', self.queue_size)
+        self._client = client
+        self._channel = f"{key_prefix}__events__"
+
+    # ==================== 发布 ====================
+
+    def announce(self, version: str, tables=None):
+        """数据版本变更后发布事件（Redis 模式下所有 worker 都会收到）"""
+        event = {'version': version, 'tables': sorted(tables or ()), **affected_panels(tables)}
+        if self._client is not None:
+            try:
+                self._client.publish(self._channel, json.dumps(event, ensure_ascii=False))
+                return
+            except Exception as e:
+                logger.warning(f"发布数据变更事件失败: {e}")
+        self._deliver(event)
+
+    def _deliver(self, event: dict):
+        """向本进程的订阅者分发事件，同一版本只分发一次"""
+        version = event['version']
+        with self._lock:
+            if self._last_version is not None and int(version, 16) <= int(self._last_version, 16):
+                return
+            self._last_version = version
+            subscribers = list(self._subscribers)
+
+        message = self._format('version', event, event_id=version)
+        for q in subscribers:
+            self._put(q, message)
+
+    def _put(self, q: queue.Queue, message: bytes):
+        try:
+            q.put_nowait(message)
+        except queue.Full:
+            # 丢弃最旧的事件，保留最新版本
+            try:
+                q.get_nowait()
+            except queue.Empty:
+                pass
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                pass
+
+    @staticmethod
+    def _format(event: str, data: dict, event_id=None) -> bytes:
+        lines = []
+        if event_id is not None:
+            lines.append(f"id: {event_id}")
+        lines.append(f"event: {event}")
+        lines.append(f"data: {json.dumps(data, ensure_ascii=False, separators=(',', ':'))}")
+        return ('\n'.join(lines) + '\n\n').encode('utf-8')
+
+    # ==================== 订阅 ====================
+
+    def stream(self):
+        """单个客户端的 SSE 字节流
+
+        连接后立即发送当前版本，客户端据此判断断线期间是否有变更；
+        空闲时定期发送注释行作为心跳，防止代理断开连接。
+        """
+        self._ensure_threads()
+        q = queue.Queue(maxsize=self.queue_size)
+        with self._lock:
+            self._subscribers.add(q)
+
+        try:
+            version, updated_at = data_version.get()
+            yield f"retry: {self.heartbeat * 1000}\n\n".encode('utf-8')
+            yield self._format('version', {'version': version, 'updated_at': updated_at}, event_id=version)
+            while True:
+                try:
+                    yield q.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    yield b': ping\n\n'
+        finally:
+            with self._lock:
+                self._subscribers.discard(q)
+
+    def subscriber_count(self) -> int:
+        with self._lock:
+            return len(self._subscribers)
+
+    # ==================== 后台线程 ====================
+
+    def _ensure_threads(self):
+        if self._threads_started:
+            return
+        with self._lock:
+            if self._threads_started:
+                return
+            self._threads_started = True
+            self._last_version = data_version.get()[0]
+
+        threading.Thread(target=self._watch, name='sse-watcher', daemon=True).start()
+        if self._client is not None:
+            threading.Thread(target=self._listen, name='sse-listener', daemon=True).start()
+
+    def _watch(self):
+        """定期检查表指纹与快照是否过期（发现外部导入）以及数据版本是否变化"""
+        while True:
+            time.sleep(self.poll_interval)
+            if not self.subscriber_count():
+                continue
+            try:
+                if self._app is not None:
+                    with self._app.app_context():
+                        change_watcher.check()
+                        if self._app.config.get('SNAPSHOT_ENABLED', False):
+                            snapshot_store.get(max_age=self._app.config.get('SNAPSHOT_MAX_AGE'))
+                version, _ = data_version.get()
+                self._deliver({'version': version, 'tables': [], 'namespaces': [], 'panels': []})
+            except Exception as e:
+                logger.warning(f"检查数据版本失败: {e}")
+
+    def _listen(self):
+        """订阅 Redis 频道，转发其他 worker 发布的事件"""
+        while True:
+            try:
+                pubsub = self._client.pubsub(ignore_subscribe_messages=True)
+                pubsub.subscribe(self._channel)
+                for message in pubsub.listen():
+                    if message.get('type') == 'message':
+                        self._deliver(json.loads(message['data']))
+            except Exception as e:
+                logger.warning(f"订阅数据变更事件失败: {e}")
+                time.sleep(self.poll_interval)
+
+
+# 全局事件广播器
+event_broadcaster = EventBroadcaster()
+
+
+def init_event_stream(app):
+    """根据应用配置初始化事件推送"""
+    client = None
+    if app.config.get('CACHE_TYPE', 'SimpleCache').lower() in ('rediscache', 'redis'):
+        from utils.redis_cache import create_redis_client
+
+        client = create_redis_client(app.config, socket_timeout=None)
+    event_broadcaster.configure(app, client, key_prefix=app.config.get('CACHE_KEY_PREFIX', 'cf:'))
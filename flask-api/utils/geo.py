@@ -0,0 +1,69 @@
+"""
+地理坐标工具
+视野范围解析与 Web 墨卡托瓦片换算，与前端 TileService.lngLatToTile 一致
+"""
+
+import math
+from typing import Optional, Tuple
+
+# Web 墨卡托的纬度范围
+MAX_LATITUDE = 85.05112878
+
+MAX_ZOOM = 22
+
+BBox = Tuple[float, float, float, float]  # (minLng, minLat, maxLng, maxLat)
+
+
+def parse_bbox(value: Optional[str]) -> Optional[BBox]:
+    """解析 "minLng,minLat,maxLng,maxLat"，格式不正确时抛出 ValueError"""
+    if not value:
+        return None
+    parts = [float(part) for part in value.split(',')]
+    if len(parts) != 4 or not all(math.isfinite(part) for part in parts):
+        raise ValueError(value)
+    min_lng, min_lat, max_lng, max_lat = parts
+    if min_lng > max_lng or min_lat > max_lat:
+        raise ValueError(value)
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def lnglat_to_world(lng: float, lat: float) -> Tuple[float, float]:
+    """经纬度 -> Web 墨卡托平面坐标（0~1，原点在左上角）"""
+    lat = max(min(lat, MAX_LATITUDE), -MAX_LATITUDE)
+    x = (lng + 180) / 360
+    y = (1 - math.asinh(math.tan(math.radians(lat))) / math.pi) / 2
+    return x, y
+
+
+def world_to_lnglat(x: float, y: float) -> Tuple[float, float]:
+    """Web 墨卡托平面坐标 -> 经纬度"""
+    lng = x * 360 - 180
+    lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y))))
+    return lng, lat
+
+
+def lnglat_to_tile(lng: float, lat: float, zoom: int) -> Tuple[int, int]:
+    """经纬度所在的瓦片编号"""
+    n = 2 ** zoom
+    x, y = lnglat_to_world(lng, lat)
+    return min(max(int(x * n), 0), n - 1), min(max(int(y * n), 0), n - 1)
+
+
+def tile_bounds(x: int, y: int, zoom: int) -> BBox:
+    """瓦片的经纬度范围"""
+    n = 2 ** zoom
+    min_lng, max_lat = world_to_lnglat(x / n, y / n)
+    max_lng, min_lat = world_to_lnglat((x + 1) / n, (y + 1) / n)
+    return min_lng, min_lat, max_lng, max_lat
+
+
+def snap_bbox(bbox: BBox, zoom: int) -> BBox:
+    """把视野范围向外扩展到该级别的瓦片边界
+
+    视野的细微平移落在同一组瓦片内，返回的点位保持稳定。
+    """
+    min_x, max_y = lnglat_to_tile(bbox[0], bbox[1], zoom)
+    max_x, min_y = lnglat_to_tile(bbox[2], bbox[3], zoom)
+    west, _, _, north = tile_bounds(min_x, min_y, zoom)
+    _, south, east, _ = tile_bounds(max_x, max_y, zoom)
+    return west, south, east, north
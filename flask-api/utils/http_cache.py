@@ -0,0 +1,108 @@
+"""
+HTTP 条件请求支持
+基于数据版本与当天日期为 /api/* 的 GET 请求生成 ETag / Last-Modified，
+客户端数据未变化时直接返回 304 Not Modified
+"""
+
+from flask import request, g, Response
+from werkzeug.http import http_date
+from datetime import date
+from services.change_watcher import change_watcher
+from utils.data_version import data_version
+import time
+
+
+API_PREFIX = '/api/'
+
+# 不参与条件请求的路径（文件下载、导入任务、事件推送、接口文档）
+EXCLUDED_PREFIXES = (
+    '/api/export',
+    '/api/import',
+    '/api/stream',
+    '/api/swagger.json',
+    '/api/docs',
+    '/swagger.json',
+)
+
+# 不同压缩编码的同一版本使用不同的强 ETag
+ENCODING_SUFFIXES = ('-gzip', '-br')
+
+
+def _is_cacheable_request() -> bool:
+    return (
+        request.method in ('GET', 'HEAD') and
+        request.path.startswith(API_PREFIX) and
+        not request.path.startswith(EXCLUDED_PREFIXES)
+    )
+
+
+def _strip_encoding(tag: str) -> str:
+    for suffix in ENCODING_SUFFIXES:
+        if tag.endswith(suffix):
+            return tag[:-len(suffix)]
+    return tag
+
+
+def current_validators():
+    """当前的 (ETag 版本, 更新时间戳)
+
+    部分接口按当天日期计算（如城市温度指数），版本中带上日期，
+    更新时间不早于当天零点，跨天后客户端的缓存随之失效。
+    """
+    version, updated_at = data_version.get()
+    today = date.today()
+    return f"{version}.{today:%Y%m%d}", max(updated_at, time.mktime(today.timetuple()))
+
+
+def _version_matches(version: str, updated_at: float) -> bool:
+    """If-None-Match / If-Modified-Since 是否与当前版本一致"""
+    if_none_match = request.if_none_match
+    if if_none_match:
+        if if_none_match.star_tag:
+            return True
+        return any(_strip_encoding(tag) == version for tag in if_none_match.as_set())
+
+    if request.if_modified_since is not None:
+        return int(updated_at) <= request.if_modified_since.timestamp()
+
+    return False
+
+
+def _set_validators(response, version: str, updated_at: float):
+    etag = version
+    encoding = response.headers.get('Content-Encoding')
+    if encoding in ('gzip', 'br'):
+        etag = f"{version}-{encoding}"
+    response.set_etag(etag)
+    response.headers['Last-Modified'] = http_date(int(updated_at))
+    # 允许缓存，但每次使用前都需向服务端验证
+    response.headers['Cache-Control'] = 'no-cache'
+    response.vary.add('Accept-Encoding')
+
+
+def register_http_cache(app):
+    """注册 ETag / Last-Modified 处理"""
+
+    @app.before_request
+    def check_not_modified():
+        """数据版本未变化时直接返回 304"""
+        if not _is_cacheable_request():
+            return None
+
+        # 到达检查间隔时比较表指纹，发现外部写入后数据版本随之递增
+        change_watcher.check()
+        version, updated_at = current_validators()
+        g.data_version = (version, updated_at)
+
+        if _version_matches(version, updated_at):
+            response = Response(status=304)
+            _set_validators(response, version, updated_at)
+            return response
+        return None
+
+    @app.after_request
+    def add_validators(response):
+        """为成功的 GET 响应添加 ETag / Last-Modified"""
+        if response.status_code == 200 and 'data_version' in g and _is_cacheable_request():
+            _set_validators(response, *g.data_version)
+        return response
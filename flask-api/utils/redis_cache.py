@@ -0,0 +1,346 @@
+"""
+Redis 缓存后端
+多个 worker 共享的二级缓存，以及「进程内 LRU + Redis」两级缓存组合
+"""
+
+from utils.cache import key_namespace, _MISSING
+from utils.response import json_default
+import json
+import logging
+import time
+import uuid
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - 未安装 msgpack 时退回 JSON
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+
+def serialize(value) -> bytes:
+    """将缓存值编码为紧凑的二进制格式（优先 msgpack）"""
+    if msgpack is not None:
+        return msgpack.packb(value, use_bin_type=True, default=json_default)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8')
+
+
+def deserialize(data: bytes):
+    """解码 serialize 生成的数据"""
+    if msgpack is not None:
+        return msgpack.unpackb(data, raw=False)
+    return json.loads(data)
+
+
+def create_redis_client(config, socket_timeout=1):
+    """根据应用配置创建 Redis 客户端
+
+    Args:
+        socket_timeout: 读写超时（秒），长期阻塞的订阅连接传 None
+    """
+    import redis
+
+    return redis.Redis(
+        host=config.get('CACHE_REDIS_HOST', 'localhost'),
+        port=config.get('CACHE_REDIS_PORT', 6379),
+        db=config.get('CACHE_REDIS_DB', 0),
+        password=config.get('CACHE_REDIS_PASSWORD') or None,
+        socket_timeout=socket_timeout,
+        socket_connect_timeout=1
+    )
+
+
+class RedisCache:
+    """Redis 缓存
+
+    - 每个命名空间维护一个 Redis 集合记录其中的键，用于按前缀/命名空间失效
+    - get_or_set 通过 SET NX 锁保证多个 worker 只有一个重新计算
+    - Redis 不可用时记录警告并按未命中处理，不影响接口返回
+    """
+
+    def __init__(self, client, key_prefix='cf:', default_timeout=300, lock_timeout=30):
+        self.client = client
+        self.key_prefix = key_prefix
+        self.default_timeout = default_timeout
+        self.lock_timeout = lock_timeout
+        self._stats = {'hits': 0, 'misses': 0, 'errors': 0}
+
+    def get(self, key, default=None):
+        """获取缓存"""
+        return self.get_many([key], default=default)[0]
+
+    def get_many(self, keys, default=None) -> list:
+        """批量获取缓存（单次 MGET 往返）"""
+        keys = list(keys)
+        if not keys:
+            return []
+        try:
+            raw_values = self.client.mget([self._key(key) for key in keys])
+        except Exception as e:
+            self._on_error('mget', e)
+            return [default] * len(keys)
+
+        result = []
+        for raw in raw_values:
+            if raw is None:
+                self._stats['misses'] += 1
+                result.append(default)
+            else:
+                self._stats['hits'] += 1
+                result.append(deserialize(raw))
+        return result
+
+    def set(self, key, value, timeout=None):
+        """设置缓存"""
+        self.set_many({key: value}, timeout=timeout)
+
+    def set_many(self, mapping, timeout=None):
+        """批量设置缓存（管道一次提交）"""
+        if timeout is None:
+            timeout = self.default_timeout
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            for key, value in mapping.items():
+                pipe.set(self._key(key), serialize(value), ex=timeout or None)
+                index_key = self._index_key(key_namespace(key))
+                pipe.sadd(index_key, key)
+                if timeout:
+                    # 索引集合比其中的键活得更久，失效时统一清理
+                    pipe.expire(index_key, timeout * 2)
+                else:
+                    pipe.persist(index_key)
+            pipe.execute()
+        except Exception as e:
+            self._on_error('set', e)
+
+    def get_or_set(self, key, factory, timeout=None):
+        """获取缓存，未命中时由一个 worker 计算，其余 worker 等待结果
+
+        持锁的 worker 释放锁后仍没有写入结果（计算失败或结果因失效被丢弃）时，
+        等待者立即重新竞争锁，由其中一个重新计算，factory 的异常照常抛出。
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        lock_key = self._key(f"lock:{key}")
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + self.lock_timeout
+        while True:
+            try:
+                acquired = self.client.set(lock_key, token, nx=True, ex=self.lock_timeout)
+            except Exception as e:
+                self._on_error('lock', e)
+                return factory()
+            if acquired:
+                break
+            value = self._wait_for(key, lock_key, deadline)
+            if value is not _MISSING:
+                return value
+            if time.monotonic() >= deadline:
+                # 持锁者迟迟没有结果，自行计算
+                return factory()
+
+        try:
+            generation = self._generation(key_namespace(key))
+            value = factory()
+            if generation == self._generation(key_namespace(key)):
+                self.set(key, value, timeout=timeout)
+            return value
+        finally:
+            try:
+                if self.client.get(lock_key) == token.encode():
+                    self.client.delete(lock_key)
+            except Exception as e:
+                self._on_error('unlock', e)
+
+    def delete(self, key):
+        """删除缓存"""
+        try:
+            pipe = self.client.pipeline(transaction=False)
+            pipe.delete(self._key(key))
+            pipe.srem(self._index_key(key_namespace(key)), key)
+            pipe.execute()
+        except Exception as e:
+            self._on_error('delete', e)
+
+    def delete_namespace(self, namespace) -> int:
+        """删除整个命名空间的缓存"""
+        return self._delete_matching(namespace, None)
+
+    def delete_prefix(self, prefix) -> int:
+        """删除指定前缀的缓存"""
+        namespace, sep, _ = prefix.partition(':')
+        if sep:
+            return self._delete_matching(namespace, prefix)
+        try:
+            namespaces = [
+                name.decode()[len(self._index_key('')):]
+                for name in self.client.scan_iter(match=self._index_key(prefix) + '*')
+            ]
+        except Exception as e:
+            self._on_error('scan', e)
+            return 0
+        return sum(self._delete_matching(name, prefix) for name in namespaces)
+
+    def clear(self):
+        """清空本应用的全部缓存键"""
+        try:
+            keys = list(self.client.scan_iter(match=self.key_prefix + '*'))
+            if keys:
+                self.client.delete(*keys)
+        except Exception as e:
+            self._on_error('clear', e)
+
+    def cleanup(self) -> int:
+        """过期由 Redis 负责，无需清理"""
+        return 0
+
+    def keys(self):
+        """当前所有缓存键（遍历命名空间索引）"""
+        try:
+            result = []
+            for index_key in self.client.scan_iter(match=self._index_key('') + '*'):
+                result.extend(member.decode() for member in self.client.smembers(index_key))
+            return result
+        except Exception as e:
+            self._on_error('keys', e)
+            return []
+
+    def stats(self) -> dict:
+        """命中、未命中、错误统计"""
+        return dict(self._stats)
+
+    # ==================== 内部方法 ====================
+
+    def _key(self, key) -> str:
+        return f"{self.key_prefix}{key}"
+
+    def _index_key(self, namespace) -> str:
+        return f"{self.key_prefix}__ns__:{namespace}"
+
+    def _generation_key(self, namespace) -> str:
+        return f"{self.key_prefix}__gen__:{namespace}"
+
+    def _generation(self, namespace) -> int:
+        try:
+            return int(self.client.get(self._generation_key(namespace)) or 0)
+        except Exception as e:
+            self._on_error('generation', e)
+            return 0
+
+    def _wait_for(self, key, lock_key, deadline):
+        """等待持锁的 worker 写入结果；锁已释放或超时仍未写入时返回 _MISSING"""
+        while time.monotonic() < deadline:
+            time.sleep(0.05)
+            try:
+                pipe = self.client.pipeline(transaction=False)
+                pipe.get(self._key(key))
+                pipe.exists(lock_key)
+                raw, locked = pipe.execute()
+            except Exception as e:
+                self._on_error('wait', e)
+                return _MISSING
+            if raw is not None:
+                self._stats['hits'] += 1
+                return deserialize(raw)
+            if not locked:
+                return _MISSING
+        return _MISSING
+
+    def _delete_matching(self, namespace, prefix) -> int:
+        index_key = self._index_key(namespace)
+        try:
+            members = [member.decode() for member in self.client.smembers(index_key)]
+            keys = [key for key in members if prefix is None or key.startswith(prefix)]
+            pipe = self.client.pipeline(transaction=True)
+            if keys:
+                pipe.delete(*[self._key(key) for key in keys])
+                pipe.srem(index_key, *keys)
+            pipe.incr(self._generation_key(namespace))
+            pipe.execute()
+            return len(keys)
+        except Exception as e:
+            self._on_error('delete', e)
+            return 0
+
+    def _on_error(self, operation, error):
+        self._stats['errors'] += 1
+        logger.warning(f"Redis 缓存 {operation} 失败: {error}")
+
+
+class TwoLevelCache:
+    """两级缓存：进程内 LRU（L1）在前，Redis（L2）在后
+
+    L1 只保留很短时间（l1_timeout），其他 worker 触发的失效最多延迟这么久可见。
+    """
+
+    def __init__(self, local, remote, l1_timeout=5):
+        self.local = local
+        self.remote = remote
+        self.l1_timeout = l1_timeout
+
+    def get(self, key, default=None):
+        value = self.local.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+        value = self.remote.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self.local.set(key, value, timeout=self.l1_timeout)
+        return value
+
+    def get_many(self, keys, default=None) -> list:
+        """批量获取：先查 L1，缺失部分一次性从 L2 取回"""
+        keys = list(keys)
+        result = [self.local.get(key, _MISSING) for key in keys]
+        missing = [i for i, value in enumerate(result) if value is _MISSING]
+        if missing:
+            remote_values = self.remote.get_many([keys[i] for i in missing], default=_MISSING)
+            for i, value in zip(missing, remote_values):
+                if value is not _MISSING:
+                    self.local.set(keys[i], value, timeout=self.l1_timeout)
+                result[i] = value
+        return [default if value is _MISSING else value for value in result]
+
+    def set(self, key, value, timeout=None):
+        self.remote.set(key, value, timeout=timeout)
+        self.local.set(key, value, timeout=self._l1_timeout(timeout))
+
+    def get_or_set(self, key, factory, timeout=None):
+        """进程内与跨进程两层防击穿"""
+        return self.local.get_or_set(
+            key,
+            lambda: self.remote.get_or_set(key, factory, timeout=timeout),
+            timeout=self._l1_timeout(timeout)
+        )
+
+    def delete(self, key):
+        self.remote.delete(key)
+        self.local.delete(key)
+
+    def delete_namespace(self, namespace) -> int:
+        self.local.delete_namespace(namespace)
+        return self.remote.delete_namespace(namespace)
+
+    def delete_prefix(self, prefix) -> int:
+        self.local.delete_prefix(prefix)
+        return self.remote.delete_prefix(prefix)
+
+    def clear(self):
+        self.remote.clear()
+        self.local.clear()
+
+    def cleanup(self) -> int:
+        return self.local.cleanup()
+
+    def keys(self):
+        return self.remote.keys()
+
+    def stats(self) -> dict:
+        return {'l1': self.local.stats(), 'l2': self.remote.stats()}
+
+    def _l1_timeout(self, timeout):
+        if not timeout:
+            return self.l1_timeout
+        return min(timeout, self.l1_timeout)
@@ -2,8 +2,23 @@
 统一响应格式化工具
 """
 
-from flask import jsonify
+from flask import jsonify, request, Response
 from typing import Any, Optional
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+import gzip
+import json
+
+try:
+    import brotli
+except ImportError:  # brotli 为可选依赖
+    brotli = None
+
+
+# 小于该字节数的响应不压缩
+MIN_COMPRESS_SIZE = 1024
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 9
 
 
 def success_response(data: Any = None, message: str = 'success', code: int = 200):
@@ -68,3 +83,68 @@ def paginated_response(items: list, page: int, per_page: int, total: int):
         }
     }
     return jsonify(response), 200
+
+
+def json_default(obj):
+    """JSON 序列化无法直接编码的类型"""
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, time):
+        return obj.isoformat()
+    if isinstance(obj, timedelta):
+        # PyMySQL 把 TIME 列读为 timedelta，按 HH:MM:SS 输出
+        seconds = int(obj.total_seconds())
+        sign = '-' if seconds < 0 else ''
+        hours, rest = divmod(abs(seconds), 3600)
+        return f"{sign}{hours:02d}:{rest // 60:02d}:{rest % 60:02d}"
+    raise TypeError(f"无法序列化类型: {type(obj).__name__}")
+
+
+def encode_payload(data: Any) -> dict:
+    """预先编码响应数据
+
+    生成紧凑 JSON 字节，并在数据较大时预先压缩为 gzip / brotli，
+    结果可直接放入缓存，之后的请求只需复制字节。
+
+    Returns:
+        {'body': JSON 字节, 'gzip': gzip 字节或 None, 'br': brotli 字节或 None}
+    """
+    body = json.dumps(data, ensure_ascii=False, separators=(',', ':'), default=json_default).encode('utf-8')
+    return compress_payload(body)
+
+
+def compress_payload(body: bytes) -> dict:
+    """为已编码的 JSON 字节生成压缩版本，返回格式同 encode_payload"""
+    payload = {'body': body, 'gzip': None, 'br': None}
+    if len(body) >= MIN_COMPRESS_SIZE:
+        payload['gzip'] = gzip.compress(body, compresslevel=GZIP_LEVEL, mtime=0)
+        if brotli is not None:
+            payload['br'] = brotli.compress(body, quality=BROTLI_QUALITY)
+    return payload
+
+
+def payload_response(payload: dict, code: int = 200):
+    """按客户端 Accept-Encoding 返回预编码的响应
+
+    Args:
+        payload: encode_payload 的结果
+        code: HTTP 状态码
+
+    Returns:
+        Response 对象
+    """
+    body = payload['body']
+    encoding = None
+    if payload.get('br') and request.accept_encodings['br']:
+        body, encoding = payload['br'], 'br'
+    elif payload.get('gzip') and request.accept_encodings['gzip']:
+        body, encoding = payload['gzip'], 'gzip'
+
+    response = Response(body, status=code, mimetype='application/json')
+    if encoding:
+        response.headers['Content-Encoding'] = encoding
+    if payload.get('gzip'):
+        response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,100 @@
+"""
+流式 ZIP 写入
+条目数据由调用方预先压缩（raw deflate），按顺序逐块输出，无需可回退的输出流
+"""
+
+from datetime import datetime
+import struct
+
+ZIP64_VERSION = 45
+FLAG_DATA_DESCRIPTOR = 0x08   # 大小与 CRC 写在数据之后
+FLAG_UTF8 = 0x800             # 文件名为 UTF-8
+METHOD_DEFLATED = 8
+ZIP64_EXTRA_ID = 0x0001
+MAX_32 = 0xFFFFFFFF
+
+
+def _dos_datetime(moment: datetime):
+    dos_time = (moment.hour << 11) | (moment.minute << 5) | (moment.second // 2)
+    dos_date = ((moment.year - 1980) << 9) | (moment.month << 5) | moment.day
+    return dos_time, dos_date
+
+
+class ZipStreamWriter:
+    """按顺序生成 ZIP 字节流
+
+    所有条目都使用 zip64 和数据描述符，单个文件与整个归档都不受 4GB 限制。
+
+    Example:
+        writer = ZipStreamWriter()
+        yield writer.begin_entry('a.csv')
+        yield writer.data(compressed)
+        yield writer.end_entry(crc, len(compressed), raw_size)
+        yield writer.finish()
+    """
+
+    def __init__(self):
+        self.offset = 0
+        self._entries = []
+        self._current = None
+
+    def begin_entry(self, name: str, modified: datetime = None) -> bytes:
+        """条目的本地文件头"""
+        encoded = name.encode('utf-8')
+        dos_time, dos_date = _dos_datetime(modified or datetime.now())
+        self._current = {
+            'name': encoded, 'time': dos_time, 'date': dos_date, 'offset': self.offset
+        }
+        # 大小在数据描述符中给出，本地头的 zip64 字段置 0
+        extra = struct.pack('<HHQQ', ZIP64_EXTRA_ID, 16, 0, 0)
+        header = struct.pack(
+            '<IHHHHHIIIHH',
+            0x04034b50, ZIP64_VERSION, FLAG_DATA_DESCRIPTOR | FLAG_UTF8, METHOD_DEFLATED,
+            dos_time, dos_date, 0, MAX_32, MAX_32, len(encoded), len(extra)
+        ) + encoded + extra
+        return self._track(header)
+
+    def data(self, chunk: bytes) -> bytes:
+        """条目的压缩数据块"""
+        return self._track(chunk)
+
+    def end_entry(self, crc: int, compressed_size: int, size: int) -> bytes:
+        """条目的数据描述符"""
+        entry = self._current
+        entry.update(crc=crc, compressed_size=compressed_size, size=size)
+        self._entries.append(entry)
+        self._current = None
+        return self._track(struct.pack('<IIQQ', 0x08074b50, crc, compressed_size, size))
+
+    def finish(self) -> bytes:
+        """中央目录与结束记录"""
+        directory = bytearray()
+        for entry in self._entries:
+            extra = struct.pack(
+                '<HHQQQ', ZIP64_EXTRA_ID, 24, entry['size'], entry['compressed_size'], entry['offset']
+            )
+            directory += struct.pack(
+                '<IHHHHHHIIIHHHHHII',
+                0x02014b50, ZIP64_VERSION, ZIP64_VERSION, FLAG_DATA_DESCRIPTOR | FLAG_UTF8,
+                METHOD_DEFLATED, entry['time'], entry['date'], entry['crc'], MAX_32, MAX_32,
+                len(entry['name']), len(extra), 0, 0, 0, 0o100644 << 16, MAX_32
+            ) + entry['name'] + extra
+
+        directory_offset = self.offset
+        count = len(self._entries)
+        zip64_end_offset = directory_offset + len(directory)
+        tail = struct.pack(
+            '<IQHHIIQQQQ',
+            0x06064b50, 44, ZIP64_VERSION, ZIP64_VERSION, 0, 0,
+            count, count, len(directory), directory_offset
+        )
+        tail += struct.pack('<IIQI', 0x07064b50, 0, zip64_end_offset, 1)
+        tail += struct.pack(
+            '<IHHHHIIH',
+            0x06054b50, 0, 0, min(count, 0xFFFF), min(count, 0xFFFF), MAX_32, MAX_32, 0
+        )
+        return self._track(bytes(directory) + tail)
+
+    def _track(self, data: bytes) -> bytes:
+        self.offset += len(data)
+        return data
@@ -9,13 +9,33 @@ import json
 import random
 import csv
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Iterable
 from dataclasses import dataclass
 import argparse
+import hashlib
 import os
+import re
+import struct
+import tempfile
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from itertools import chain, islice
 import pymysql
 from pymysql.cursors import DictCursor
 
+try:
+    import numpy as np
+except ImportError:  # 仅 --engine numpy 需要
+    np = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # 仅 --format parquet 需要
+    pa = pq = None
+
 # ==================== 基础配置 ====================
 # 重庆地理范围
 CHONGQING_BOUNDS = {
@@ -56,6 +76,63 @@ TEA_FEATURES = ["盖碗茶", "川剧", "评书", "采耳", "麻将", "茶艺", "
 # 预警类型
 ALERT_TYPES = ["暴雨预警", "高温预警", "节假日高峰", "交通管制", "演唱会活动", "体育赛事"]
 
+# 每批生成的行数
+GENERATE_BATCH_SIZE = 5000
+
+# 压测数据规模档位：固定种子与基准时间，同一档位（同一版本的脚本）每次生成完全相同的数据
+# 区县固定为重庆 38 个区县，夜间经济天数随门店规模增加
+PROFILE_BASE_TIME = '2025-01-01T21:00:00'
+SCALE_PROFILES = {
+    'small': {'hotpot': 5000, 'teahouse': 300, 'days': 7, 'alerts': 30, 'engine': 'python'},
+    'medium': {'hotpot': 100000, 'teahouse': 6000, 'days': 30, 'alerts': 200, 'engine': 'python'},
+    'large': {'hotpot': 1000000, 'teahouse': 60000, 'days': 180, 'alerts': 1000, 'engine': 'numpy'},
+    'xl': {'hotpot': 10000000, 'teahouse': 600000, 'days': 365, 'alerts': 5000, 'engine': 'numpy'},
+}
+for _name, _profile in SCALE_PROFILES.items():
+    _profile.setdefault('seed', f'profile-{_name}')
+    _profile.setdefault('base_time', PROFILE_BASE_TIME)
+
+# 空间字段（WKT 字符串）
+GEO_FIELDS = ['center', 'boundary', 'location']
+
+
+# ==================== WKT -> WKB ====================
+_RING_PATTERN = re.compile(r'\(([^()]*)\)')
+_POLYGON_PATTERN = re.compile(r'\(\s*(\([^()]*\)(?:\s*,\s*\([^()]*\))*)\s*\)')
+
+
+def _wkb_ring(text: str) -> bytes:
+    points = [point.split() for point in text.split(',')]
+    return struct.pack('<I', len(points)) + b''.join(
+        struct.pack('<dd', float(x), float(y)) for x, y in points
+    )
+
+
+def _wkb_polygon(text: str) -> bytes:
+    rings = _RING_PATTERN.findall(text)
+    return struct.pack('<BII', 1, 3, len(rings)) + b''.join(_wkb_ring(ring) for ring in rings)
+
+
+def wkt_to_wkb(wkt: str) -> bytes:
+    """将生成的 WKT（POINT / POLYGON / MULTIPOLYGON）转换为小端 WKB
+
+    坐标顺序保持不变，ST_GeomFromWKB(x, 4326) 与 ST_GeomFromText(wkt, 4326) 结果一致。
+    """
+    kind, _, body = wkt.partition('(')
+    kind = kind.strip().upper()
+    body = '(' + body
+    if kind == 'POINT':
+        x, y = body.strip('() ').split()
+        return struct.pack('<BIdd', 1, 1, float(x), float(y))
+    if kind == 'POLYGON':
+        return _wkb_polygon(body)
+    if kind == 'MULTIPOLYGON':
+        polygons = _POLYGON_PATTERN.findall(body.strip()[1:-1])
+        return struct.pack('<BII', 1, 6, len(polygons)) + b''.join(
+            _wkb_polygon(f'({polygon})') for polygon in polygons
+        )
+    raise ValueError(f"不支持的 WKT 类型: {kind}")
+
 
 @dataclass
 class District:
@@ -175,7 +252,8 @@ class Alert:
 
 
 class DataGenerator:
-    def __init__(self):
+    def __init__(self, rng: random.Random = None):
+        self.rng = rng or random.Random()
         self.district_centers = {}
         self.brand_ids = {}
 
@@ -205,12 +283,12 @@ class DataGenerator:
         if district_name and district_name in self.district_centers:
             base_lng, base_lat = self.district_centers[district_name]
             # 在区县中心点附近随机偏移（增大偏移范围）
-            lng = base_lng + random.uniform(-0.15, 0.15)
-            lat = base_lat + random.uniform(-0.12, 0.12)
+            lng = base_lng + self.rng.uniform(-0.15, 0.15)
+            lat = base_lat + self.rng.uniform(-0.12, 0.12)
         else:
             # 如果没有指定区县，在整个重庆范围内随机生成
-            lng = random.uniform(CHONGQING_BOUNDS["lng_min"], CHONGQING_BOUNDS["lng_max"])
-            lat = random.uniform(CHONGQING_BOUNDS["lat_min"], CHONGQING_BOUNDS["lat_max"])
+            lng = self.rng.uniform(CHONGQING_BOUNDS["lng_min"], CHONGQING_BOUNDS["lng_max"])
+            lat = self.rng.uniform(CHONGQING_BOUNDS["lat_min"], CHONGQING_BOUNDS["lat_max"])
 
         # 确保在边界内
         lng = max(CHONGQING_BOUNDS["lng_min"], min(CHONGQING_BOUNDS["lng_max"], lng))
@@ -223,13 +301,21 @@ class DataGenerator:
         # 使用正弦波模拟
         distance = abs(hour - peak_hour)
         wave = 1 + 0.8 * (1 - min(distance, 12) / 12)
-        noise = random.uniform(0.7, 1.3)
+        noise = self.rng.uniform(0.7, 1.3)
         return int(base_value * wave * noise)
 
 
 class TableGenerator:
-    def __init__(self):
-        self.gen = DataGenerator()
+    def __init__(self, seed=None, now: datetime = None):
+        """
+        Args:
+            seed: 随机种子，相同种子生成相同数据
+            now: 数据的基准时间（默认当前时间），所有时间字段都相对它生成
+        """
+        self.rng = random.Random(seed)
+        self.gen = DataGenerator(self.rng)
+        self.now = now or datetime.now()
+        self.now_str = self.now.strftime('%Y-%m-%d %H:%M:%S')
         self.next_id = {
             'district': 1,
             'brand': 1,
@@ -241,6 +327,7 @@ class TableGenerator:
 
     def generate_districts(self) -> List[District]:
         """生成区县基础数据（必须最先执行）- 适配Flask模型"""
+        rng = self.rng
         results = []
         main_city_ids = range(1, 10)  # 主城九区
 
@@ -251,9 +338,9 @@ class TableGenerator:
 
             # 主城九区密度更高
             is_main_city = i < 10
-            density = random.uniform(15, 25) if is_main_city else random.uniform(0.5, 5)
-            population = random.randint(300000, 2000000) if is_main_city else random.randint(50000, 500000)
-            vitality = random.uniform(80, 95) if is_main_city else random.uniform(60, 85)
+            density = rng.uniform(15, 25) if is_main_city else rng.uniform(0.5, 5)
+            population = rng.randint(300000, 2000000) if is_main_city else rng.randint(50000, 500000)
+            vitality = rng.uniform(80, 95) if is_main_city else rng.uniform(60, 85)
 
             # 生成 WKT 格式的中心点和边界
             center_wkt = self.gen.generate_wkt_point(center_lng, center_lat)
@@ -263,15 +350,15 @@ class TableGenerator:
             results.append(District(
                 id=i,
                 name=name,
-                area_km2=round(random.uniform(50 if is_main_city else 1000,
+                area_km2=round(rng.uniform(50 if is_main_city else 1000,
                                               350 if is_main_city else 4000), 2),
                 hotpot_density=round(density, 2),
                 population=population,
                 vitality_score=round(vitality, 1),
                 center=center_wkt,
                 boundary=boundary_wkt,
-                created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                created_at=self.now_str,
+                updated_at=self.now_str
             ))
 
         self.next_id['district'] = len(results) + 1
@@ -281,6 +368,7 @@ class TableGenerator:
 
     def generate_brands(self) -> List[Brand]:
         """生成品牌维度数据（第二执行）"""
+        rng = self.rng
         results = []
         # 确保市场份额总和约100%
         remaining_share = 100.0
@@ -290,7 +378,7 @@ class TableGenerator:
             if i == brand_count:
                 share = round(remaining_share, 1)
             else:
-                share = round(random.uniform(5, min(20, remaining_share - (brand_count - i) * 5)), 1)
+                share = round(rng.uniform(5, min(20, remaining_share - (brand_count - i) * 5)), 1)
                 remaining_share -= share
 
             self.gen.brand_ids[brand_name] = i
@@ -299,12 +387,12 @@ class TableGenerator:
                 id=i,
                 name=brand_name,
                 market_share=share,
-                avg_wait_time=random.randint(15, 90),
-                store_count=random.randint(50, 300),
-                price_position=random.choice(['高端', '中端', '大众']),
-                update_date=datetime.now().strftime('%Y-%m-%d'),
-                created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                avg_wait_time=rng.randint(15, 90),
+                store_count=rng.randint(50, 300),
+                price_position=rng.choice(['高端', '中端', '大众']),
+                update_date=self.now.strftime('%Y-%m-%d'),
+                created_at=self.now_str,
+                updated_at=self.now_str
             ))
 
         self.next_id['brand'] = len(results) + 1
@@ -312,56 +400,61 @@ class TableGenerator:
 
     def generate_hotpot_restaurants(self, count: int = 8000) -> List[HotpotRestaurant]:
         """生成火锅门店数据 - 适配Flask模型"""
-        results = []
+        return [item for batch in self.iter_hotpot_restaurants(count) for item in batch]
+
+    def iter_hotpot_restaurants(self, count: int, batch_size: int = GENERATE_BATCH_SIZE) -> Iterator[List[HotpotRestaurant]]:
+        """分批生成火锅门店数据"""
+        rng = self.rng
         # 主城九区占70%门店
         main_districts = list(range(1, 10))
         other_districts = list(range(10, len(DISTRICTS) + 1))
+        batch = []
 
         for i in range(count):
             # 70%概率选择主城九区
-            district_id = random.choice(main_districts) if random.random() < 0.7 else random.choice(other_districts)
+            district_id = rng.choice(main_districts) if rng.random() < 0.7 else rng.choice(other_districts)
             district_name = DISTRICTS[district_id - 1]
 
             # 随机坐标
             lng, lat = self.gen.random_location(district_name)
 
             # 品牌（80%使用知名品牌，20%个体经营）
-            if random.random() < 0.8:
-                brand_id = random.randint(1, len(HOTPOT_BRANDS))
+            if rng.random() < 0.8:
+                brand_id = rng.randint(1, len(HOTPOT_BRANDS))
             else:
                 brand_id = None  # 个体经营
 
             # 价格逻辑
-            shop_type = random.choice(['老字号', '网红店', '社区店', '连锁'])
+            shop_type = rng.choice(['老字号', '网红店', '社区店', '连锁'])
             if shop_type == '社区店':
-                price_avg = random.randint(60, 90)
+                price_avg = rng.randint(60, 90)
             elif shop_type == '网红店':
-                price_avg = random.randint(120, 250)
+                price_avg = rng.randint(120, 250)
             else:
-                price_avg = random.randint(80, 150)
+                price_avg = rng.randint(80, 150)
 
-            price_min = max(30, price_avg - random.randint(10, 30))
-            price_max = price_avg + random.randint(20, 50)
+            price_min = max(30, price_avg - rng.randint(10, 30))
+            price_max = price_avg + rng.randint(20, 50)
 
             # 评分和评论数
-            rating = round(random.uniform(3.5, 4.8), 1)
-            review_count = random.randint(50, 5000)
+            rating = round(rng.uniform(3.5, 4.8), 1)
+            review_count = rng.randint(50, 5000)
 
             # 开业日期
-            days_ago = random.randint(30, 7300)
-            open_date = (datetime.now() - timedelta(days=days_ago)).strftime('%Y-%m-%d')
+            days_ago = rng.randint(30, 7300)
+            open_date = (self.now - timedelta(days=days_ago)).strftime('%Y-%m-%d')
 
             # 是否24小时营业（5%概率）
-            is_24h = random.random() < 0.05
+            is_24h = rng.random() < 0.05
 
             # 生成 POINT WKT
             location_wkt = self.gen.generate_wkt_point(lng, lat)
 
-            results.append(HotpotRestaurant(
+            batch.append(HotpotRestaurant(
                 id=self.next_id['hotpot'],
-                name=f"{district_name}{random.choice(['老', '重庆', '地道'])}{random.choice(['火锅', '老火锅'])}",
+                name=f"{district_name}{rng.choice(['老', '重庆', '地道'])}{rng.choice(['火锅', '老火锅'])}",
                 brand_id=brand_id,
-                address=f"{district_name}{random.randint(1, 500)}号",
+                address=f"{district_name}{rng.randint(1, 500)}号",
                 district_id=district_id,
                 price_min=price_min,
                 price_max=price_max,
@@ -369,136 +462,542 @@ class TableGenerator:
                 rating=rating,
                 review_count=review_count,
                 shop_type=shop_type,
-                business_hours="00:00-24:00" if is_24h else f"{random.randint(9, 11)}:00-23:00",
+                business_hours="00:00-24:00" if is_24h else f"{rng.randint(9, 11)}:00-23:00",
                 is_24h=is_24h,
                 open_date=open_date,
                 status=1,
                 coordinates_lng=lng,
                 coordinates_lat=lat,
                 location=location_wkt,
-                created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                updated_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                created_at=self.now_str,
+                updated_at=self.now_str
             ))
             self.next_id['hotpot'] += 1
 
-        return results
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
 
     def generate_teahouses(self, count: int = 500) -> List[Teahouse]:
         """生成茶馆数据 - 适配Flask模型"""
-        results = []
+        return [item for batch in self.iter_teahouses(count) for item in batch]
+
+    def iter_teahouses(self, count: int, batch_size: int = GENERATE_BATCH_SIZE) -> Iterator[List[Teahouse]]:
+        """分批生成茶馆数据"""
+        rng = self.rng
+        batch = []
 
         for i in range(count):
-            district_id = random.randint(1, len(DISTRICTS))
+            district_id = rng.randint(1, len(DISTRICTS))
             district_name = DISTRICTS[district_id - 1]
             lng, lat = self.gen.random_location(district_name)
 
             # 百年老店概率
-            is_historic = random.random() < 0.08
-            founding_year = random.randint(1900, 1950) if is_historic else random.randint(1950, 2024)
+            is_historic = rng.random() < 0.08
+            founding_year = rng.randint(1900, 1950) if is_historic else rng.randint(1950, 2024)
 
             # 特色标签
-            features = random.sample(TEA_FEATURES, random.randint(1, 3))
+            features = rng.sample(TEA_FEATURES, rng.randint(1, 3))
 
             # 类型
             if founding_year < 1950:
                 community_type = '社区型'
             elif founding_year < 2000:
-                community_type = random.choice(['社区型', '景区型'])
+                community_type = rng.choice(['社区型', '景区型'])
             else:
-                community_type = random.choice(['景区型', '商务型'])
+                community_type = rng.choice(['景区型', '商务型'])
 
             # 生成 POINT WKT
             location_wkt = self.gen.generate_wkt_point(lng, lat)
 
-            results.append(Teahouse(
+            batch.append(Teahouse(
                 id=self.next_id['teahouse'],
-                name=f"{district_name}{random.choice(['老茶馆', '茶舍', '茶园', '茶艺馆'])}",
-                address=f"{district_name}{random.randint(1, 500)}号",
+                name=f"{district_name}{rng.choice(['老茶馆', '茶舍', '茶园', '茶艺馆'])}",
+                address=f"{district_name}{rng.randint(1, 500)}号",
                 district_id=district_id,
                 founding_year=founding_year,
                 tea_type=','.join(features),
-                avg_price=round(random.uniform(15, 80), 2),
-                popularity=random.randint(10, 1000),
+                avg_price=round(rng.uniform(15, 80), 2),
+                popularity=rng.randint(10, 1000),
                 is_historic=is_historic,
                 community_type=community_type,
                 cultural_tags=json.dumps(features),
                 coordinates_lng=lng,
                 coordinates_lat=lat,
                 location=location_wkt,
-                created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                update_time=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                created_at=self.now_str,
+                update_time=self.now_str
             ))
             self.next_id['teahouse'] += 1
 
-        return results
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
 
     def generate_night_economy(self, days: int = 7) -> List[NightEconomyRealtime]:
         """生成夜间经济实时数据"""
-        results = []
+        return [item for batch in self.iter_night_economy(days) for item in batch]
+
+    def iter_night_economy(self, days: int, batch_size: int = GENERATE_BATCH_SIZE,
+                           start_day: int = 0) -> Iterator[List[NightEconomyRealtime]]:
+        """分批生成夜间经济实时数据
+
+        Args:
+            start_day: 从基准时间往前第几天开始（分片生成时使用）
+        """
+        rng = self.rng
         weather_options = ['晴天', '多云', '小雨', '阴天']
+        batch = []
 
         # 只为主城九区生成数据
         main_district_ids = list(range(1, 10))
 
-        for day in range(days):
+        for day in range(start_day, start_day + days):
+            day_start = (self.now - timedelta(days=day)).replace(minute=0, second=0, microsecond=0)
+            date_str = day_start.strftime('%Y-%m-%d')
             for hour in range(24):
+                # 计算日期和时间
+                time_str = f'{hour:02d}:00:00'
+                timestamp = f'{date_str} {time_str}'
+
                 for district_id in main_district_ids:
                     # 基础人流
-                    base_population = random.randint(1000, 8000)
+                    base_population = rng.randint(1000, 8000)
                     population = self.gen.time_series_value(hour, base_population)
 
                     # 特殊事件（低概率）
                     special_event = ''
-                    if random.random() < 0.02:
-                        special_event = random.choice(['演唱会', '体育赛事', '节日活动'])
-
-                    # 计算日期和时间
-                    current_datetime = (datetime.now() - timedelta(days=day)).replace(
-                        hour=hour, minute=0, second=0
-                    )
-                    timestamp = current_datetime.strftime('%Y-%m-%d %H:%M:%S')
-                    date_str = current_datetime.strftime('%Y-%m-%d')
-                    time_str = current_datetime.strftime('%H:%M:%S')
+                    if rng.random() < 0.02:
+                        special_event = rng.choice(['演唱会', '体育赛事', '节日活动'])
 
-                    results.append(NightEconomyRealtime(
+                    batch.append(NightEconomyRealtime(
                         id=self.next_id['night'],
                         timestamp=timestamp,
                         hour=hour,
                         district_id=district_id,
                         population_index=population,
-                        consumption_heat=round(population * random.uniform(0.8, 1.5), 2),
-                        metro_passengers=random.randint(5000, 20000) if 6 <= hour <= 23 else random.randint(200, 2000),
-                        active_businesses=random.randint(500, 3000),
-                        weather=random.choice(weather_options),
+                        consumption_heat=round(population * rng.uniform(0.8, 1.5), 2),
+                        metro_passengers=rng.randint(5000, 20000) if 6 <= hour <= 23 else rng.randint(200, 2000),
+                        active_businesses=rng.randint(500, 3000),
+                        weather=rng.choice(weather_options),
                         special_event=special_event if special_event else None,
                         date=date_str,
                         time=time_str,
-                        created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                        created_at=self.now_str
                     ))
                     self.next_id['night'] += 1
 
-        return results
+                    if len(batch) >= batch_size:
+                        yield batch
+                        batch = []
+
+        if batch:
+            yield batch
 
     def generate_alerts(self, count: int = 50) -> List[Alert]:
         """生成预警数据"""
-        results = []
+        return [item for batch in self.iter_alerts(count) for item in batch]
+
+    def iter_alerts(self, count: int, batch_size: int = GENERATE_BATCH_SIZE) -> Iterator[List[Alert]]:
+        """分批生成预警数据"""
+        rng = self.rng
+        batch = []
 
         for i in range(count):
-            alert_type = random.choice(ALERT_TYPES)
-            district_name = random.choice(DISTRICTS)
+            alert_type = rng.choice(ALERT_TYPES)
+            district_name = rng.choice(DISTRICTS)
 
-            results.append(Alert(
+            batch.append(Alert(
                 id=self.next_id['alert'],
-                alert_time=(datetime.now() - timedelta(hours=random.randint(0, 168))).strftime('%Y-%m-%d %H:%M:%S'),
+                alert_time=(self.now - timedelta(hours=rng.randint(0, 168))).strftime('%Y-%m-%d %H:%M:%S'),
                 alert_type=alert_type,
-                content=f"{district_name} {alert_type}：{random.choice(['火锅预订率↑', '交通延误↑', '人流激增↑'])}",
-                impact_value=f"+{random.randint(10, 50)}%",
-                status=random.choice([0, 1]),
-                created_at=datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+                content=f"{district_name} {alert_type}：{rng.choice(['火锅预订率↑', '交通延误↑', '人流激增↑'])}",
+                impact_value=f"+{rng.randint(10, 50)}%",
+                status=rng.choice([0, 1]),
+                created_at=self.now_str
             ))
             self.next_id['alert'] += 1
 
-        return results
+            if len(batch) >= batch_size:
+                yield batch
+                batch = []
+
+        if batch:
+            yield batch
+
+
+# ==================== 向量化生成（NumPy） ====================
+# WKB 点：字节序 + 类型 + 两个坐标，按 21 字节紧密排列
+POINT_WKB = np.dtype([('order', 'u1'), ('type', '<u4'), ('x', '<f8'), ('y', '<f8')]) if np else None
+
+
+def _numpy_seed(seed) -> int:
+    """将任意种子（如 '42:hotpot_restaurants:3'）转换为 numpy 可用的整数种子"""
+    return int.from_bytes(hashlib.sha256(str(seed).encode('utf-8')).digest()[:16], 'little')
+
+
+def _lookup(values) -> 'np.ndarray':
+    table = np.empty(len(values), dtype=object)
+    table[:] = values
+    return table
+
+
+@dataclass
+class CategoryColumn:
+    """字符串列的编码形式：codes 为取值表 values 的下标，-1 表示空值
+
+    字符串只在取值表中出现一次，跨进程传递、写 Parquet（字典编码）和写 TSV 都按取值表处理。
+    """
+    codes: Any
+    values: List[Optional[str]]
+
+    def __len__(self) -> int:
+        return len(self.codes)
+
+    def take(self, values=None, missing=None) -> list:
+        """按编码展开为逐行的值（可传入已转换的取值表），空值为 missing"""
+        table = list(self.values if values is None else values) + [missing]
+        return _lookup(table)[self.codes].tolist()
+
+
+class ColumnarTableGenerator:
+    """按列整批生成数据（--engine numpy）
+
+    与 TableGenerator 的取值分布一致，但每列由一次 numpy 调用生成，
+    返回 {字段名: 列} 的列式批次：字符串为 CategoryColumn，可空整数为 masked array，
+    空间字段为 POINT_WKB 结构化数组，其余为普通 numpy 数组。
+    """
+
+    def __init__(self, seed=None, now: datetime = None, centers: Dict[str, tuple] = None):
+        if np is None:
+            raise RuntimeError("numpy 引擎需要安装 numpy：pip install numpy")
+        self.rng = np.random.default_rng(_numpy_seed(seed))
+        self.now = now or datetime.now()
+        self.now_str = self.now.strftime('%Y-%m-%d %H:%M:%S')
+        centers = centers or {}
+        fallback = (CHONGQING_BOUNDS['center_lng'], CHONGQING_BOUNDS['center_lat'])
+        self.center_lng, self.center_lat = np.array(
+            [centers.get(name, fallback) for name in DISTRICTS], dtype=np.float64
+        ).T
+
+    @staticmethod
+    def _category(codes, values) -> CategoryColumn:
+        return CategoryColumn(np.asarray(codes, dtype=np.int32), list(values))
+
+    def _constant(self, n: int, value: str) -> CategoryColumn:
+        return self._category(np.zeros(n), [value])
+
+    def _choice(self, options, n: int) -> CategoryColumn:
+        return self._category(self.rng.integers(0, len(options), n), options)
+
+    def _locations(self, district_idx: 'np.ndarray'):
+        """区县中心点附近的随机坐标（同 DataGenerator.random_location）"""
+        n = len(district_idx)
+        lng = self.center_lng[district_idx] + self.rng.uniform(-0.15, 0.15, n)
+        lat = self.center_lat[district_idx] + self.rng.uniform(-0.12, 0.12, n)
+        lng = np.round(np.clip(lng, CHONGQING_BOUNDS['lng_min'], CHONGQING_BOUNDS['lng_max']), 7)
+        lat = np.round(np.clip(lat, CHONGQING_BOUNDS['lat_min'], CHONGQING_BOUNDS['lat_max']), 7)
+
+        # 与 generate_wkt_point 一致：POINT(纬度 经度)
+        location = np.empty(n, dtype=POINT_WKB)
+        location['order'] = 1
+        location['type'] = 1
+        location['x'] = lat
+        location['y'] = lng
+        return lng, lat, location
+
+    def _addresses(self, district_idx: 'np.ndarray') -> CategoryColumn:
+        return self._category(
+            district_idx * 500 + self.rng.integers(0, 500, len(district_idx)),
+            [f"{name}{number}号" for name in DISTRICTS for number in range(1, 501)]
+        )
+
+    def hotpot_restaurants(self, count: int, start_id: int = 1) -> Dict[str, Any]:
+        rng = self.rng
+        main_count = 9
+        district_idx = np.where(
+            rng.random(count) < 0.7,
+            rng.integers(0, main_count, count),
+            rng.integers(main_count, len(DISTRICTS), count)
+        )
+        lng, lat, location = self._locations(district_idx)
+
+        brand_id = np.ma.masked_array(
+            rng.integers(1, len(HOTPOT_BRANDS) + 1, count), mask=rng.random(count) >= 0.8
+        )
+
+        shop_types = ['老字号', '网红店', '社区店', '连锁']
+        shop_idx = rng.integers(0, len(shop_types), count)
+        price_avg = np.select(
+            [shop_idx == 2, shop_idx == 1],
+            [rng.integers(60, 91, count), rng.integers(120, 251, count)],
+            rng.integers(80, 151, count)
+        )
+        price_min = np.maximum(30, price_avg - rng.integers(10, 31, count))
+        price_max = price_avg + rng.integers(20, 51, count)
+
+        open_dates = [(self.now - timedelta(days=days)).strftime('%Y-%m-%d') for days in range(30, 7301)]
+        is_24h = rng.random(count) < 0.05
+        names = [
+            f"{name}{prefix}{suffix}"
+            for name in DISTRICTS for prefix in ['老', '重庆', '地道'] for suffix in ['火锅', '老火锅']
+        ]
+
+        return {
+            'id': np.arange(start_id, start_id + count),
+            'name': self._category(
+                district_idx * 6 + rng.integers(0, 3, count) * 2 + rng.integers(0, 2, count), names
+            ),
+            'brand_id': brand_id,
+            'address': self._addresses(district_idx),
+            'district_id': district_idx + 1,
+            'price_min': price_min,
+            'price_max': price_max,
+            'price_avg': price_avg,
+            'rating': np.round(rng.uniform(3.5, 4.8, count), 1),
+            'review_count': rng.integers(50, 5001, count),
+            'shop_type': self._category(shop_idx, shop_types),
+            'business_hours': self._category(
+                np.where(is_24h, 3, rng.integers(0, 3, count)),
+                ['9:00-23:00', '10:00-23:00', '11:00-23:00', '00:00-24:00']
+            ),
+            'is_24h': is_24h,
+            'open_date': self._category(rng.integers(0, len(open_dates), count), open_dates),
+            'status': np.ones(count, dtype=np.int64),
+            'coordinates_lng': lng,
+            'coordinates_lat': lat,
+            'location': location,
+            'created_at': self._constant(count, self.now_str),
+            'updated_at': self._constant(count, self.now_str),
+        }
+
+    def teahouses(self, count: int, start_id: int = 1) -> Dict[str, Any]:
+        rng = self.rng
+        district_idx = rng.integers(0, len(DISTRICTS), count)
+        lng, lat, location = self._locations(district_idx)
+
+        is_historic = rng.random(count) < 0.08
+        founding_year = np.where(is_historic, rng.integers(1900, 1951, count), rng.integers(1950, 2025, count))
+
+        # 特色标签：每行随机排列取前 k 个（同 random.sample），按 (k, 前三个标签) 编号查表
+        k = rng.integers(1, 4, count)
+        picks = np.argsort(rng.random((count, len(TEA_FEATURES))), axis=1)[:, :3]
+        width = len(TEA_FEATURES)
+        code = (k - 1) * width ** 3 + picks[:, 0] * width ** 2 + picks[:, 1] * width + picks[:, 2]
+        combos = [
+            [TEA_FEATURES[i] for i in (a, b, c)[:size]]
+            for size in (1, 2, 3) for a in range(width) for b in range(width) for c in range(width)
+        ]
+
+        community_types = ['社区型', '景区型', '商务型']
+        community = np.where(
+            founding_year < 1950, 0,
+            np.where(founding_year < 2000, 0, 1) + (rng.random(count) >= 0.5)
+        )
+
+        return {
+            'id': np.arange(start_id, start_id + count),
+            'name': self._category(
+                district_idx * 4 + rng.integers(0, 4, count),
+                [f"{name}{suffix}" for name in DISTRICTS for suffix in ['老茶馆', '茶舍', '茶园', '茶艺馆']]
+            ),
+            'address': self._addresses(district_idx),
+            'district_id': district_idx + 1,
+            'founding_year': founding_year,
+            'tea_type': self._category(code, [','.join(tags) for tags in combos]),
+            'avg_price': np.round(rng.uniform(15, 80, count), 2),
+            'popularity': rng.integers(10, 1001, count),
+            'is_historic': is_historic,
+            'community_type': self._category(community, community_types),
+            'cultural_tags': self._category(code, [json.dumps(tags) for tags in combos]),
+            'coordinates_lng': lng,
+            'coordinates_lat': lat,
+            'location': location,
+            'created_at': self._constant(count, self.now_str),
+            'update_time': self._constant(count, self.now_str),
+        }
+
+    def night_economy(self, days: int, start_id: int = 1, start_day: int = 0) -> Dict[str, Any]:
+        rng = self.rng
+        district_count = 9
+        count = days * 24 * district_count
+        hour = np.tile(np.repeat(np.arange(24), district_count), days)
+        day_hour = np.repeat(np.arange(days * 24), district_count)
+
+        dates = [
+            (self.now - timedelta(days=day)).strftime('%Y-%m-%d')
+            for day in range(start_day, start_day + days)
+        ]
+        times = [f'{h:02d}:00:00' for h in range(24)]
+
+        # 时间节律：峰值 21 点，同 DataGenerator.time_series_value
+        wave = 1 + 0.8 * (1 - np.minimum(np.abs(hour - 21), 12) / 12)
+        population = (rng.integers(1000, 8001, count) * wave * rng.uniform(0.7, 1.3, count)).astype(np.int64)
+
+        special_event = np.where(rng.random(count) < 0.02, rng.integers(0, 3, count), -1)
+
+        return {
+            'id': np.arange(start_id, start_id + count),
+            'timestamp': self._category(day_hour, [f'{date} {time_str}' for date in dates for time_str in times]),
+            'hour': hour,
+            'district_id': np.tile(np.arange(1, district_count + 1), days * 24),
+            'population_index': population,
+            'consumption_heat': np.round(population * rng.uniform(0.8, 1.5, count), 2),
+            'metro_passengers': np.where(
+                (hour >= 6) & (hour <= 23), rng.integers(5000, 20001, count), rng.integers(200, 2001, count)
+            ),
+            'active_businesses': rng.integers(500, 3001, count),
+            'weather': self._choice(['晴天', '多云', '小雨', '阴天'], count),
+            'special_event': self._category(special_event, ['演唱会', '体育赛事', '节日活动']),
+            'date': self._category(day_hour // 24, dates),
+            'time': self._category(hour, times),
+            'created_at': self._constant(count, self.now_str),
+        }
+
+    def alerts(self, count: int, start_id: int = 1) -> Dict[str, Any]:
+        rng = self.rng
+        effects = ['火锅预订率↑', '交通延误↑', '人流激增↑']
+        type_idx = rng.integers(0, len(ALERT_TYPES), count)
+        code = (type_idx * len(DISTRICTS) + rng.integers(0, len(DISTRICTS), count)) * len(effects) \
+            + rng.integers(0, len(effects), count)
+
+        return {
+            'id': np.arange(start_id, start_id + count),
+            'alert_time': self._category(rng.integers(0, 169, count), [
+                (self.now - timedelta(hours=hours)).strftime('%Y-%m-%d %H:%M:%S') for hours in range(169)
+            ]),
+            'alert_type': self._category(type_idx, ALERT_TYPES),
+            'content': self._category(code, [
+                f"{name} {alert_type}：{effect}"
+                for alert_type in ALERT_TYPES for name in DISTRICTS for effect in effects
+            ]),
+            'impact_value': self._category(rng.integers(0, 41, count), [f"+{value}%" for value in range(10, 51)]),
+            'status': rng.integers(0, 2, count),
+            'created_at': self._constant(count, self.now_str),
+        }
+
+
+def is_columnar(batch) -> bool:
+    """批次是否为列式（numpy 引擎生成的 {字段名: 列}）"""
+    return isinstance(batch, dict)
+
+
+def batch_length(batch) -> int:
+    return len(batch['id']) if is_columnar(batch) else len(batch)
+
+
+def batch_fields(batch) -> List[str]:
+    if is_columnar(batch):
+        return list(batch)
+    return [f.name for f in batch[0].__dataclass_fields__.values()]
+
+
+def is_point_column(column) -> bool:
+    return not isinstance(column, CategoryColumn) and column.dtype == POINT_WKB
+
+
+def column_values(column) -> list:
+    """列式批次的一列转换为 Python 值（空值为 None，空间字段为 WKB 字节）"""
+    if isinstance(column, CategoryColumn):
+        return column.take()
+    if is_point_column(column):
+        buffer = column.tobytes()
+        size = POINT_WKB.itemsize
+        return [buffer[i:i + size] for i in range(0, len(buffer), size)]
+    if np.ma.isMaskedArray(column):
+        return np.where(np.ma.getmaskarray(column), None, column.data.astype(object)).tolist()
+    return column.tolist()
+
+
+def column_wkt(column) -> list:
+    """POINT_WKB 列转换为 WKT（与 generate_wkt_point 一致）"""
+    return [f"POINT({x} {y})" for x, y in zip(column['x'].tolist(), column['y'].tolist())]
+
+
+# ==================== 分片并行生成 ====================
+# 表 -> (TableGenerator 分批方法, ColumnarTableGenerator 方法, next_id 键, 每个分片的单位数)
+# 门店/茶馆/预警按行数分片，夜间经济按天分片
+SHARD_SPECS = {
+    'hotpot_restaurants': ('iter_hotpot_restaurants', 'hotpot_restaurants', 'hotpot', 50000),
+    'teahouses': ('iter_teahouses', 'teahouses', 'teahouse', 50000),
+    'night_economy': ('iter_night_economy', 'night_economy', 'night', 30),
+    'alerts': ('iter_alerts', 'alerts', 'alert', 50000),
+}
+
+# numpy 引擎的分片更大，摊薄每个分片建取值表的开销
+COLUMNAR_SHARD_SCALE = 4
+
+# 夜间经济每天的行数（24小时 × 主城九区）
+NIGHT_ROWS_PER_DAY = 24 * 9
+
+
+def _shard_batches(task) -> Iterator[List[Any]]:
+    """生成单个分片（每个分片使用独立的确定性种子）"""
+    table, start, size, start_id, seed, centers, now, batch_size, engine = task
+    method, columnar, id_key, _ = SHARD_SPECS[table]
+    if engine == 'numpy':
+        generator = ColumnarTableGenerator(seed=seed, now=now, centers=centers)
+        if table == 'night_economy':
+            return iter([generator.night_economy(size, start_id, start_day=start)])
+        return iter([getattr(generator, columnar)(size, start_id)])
+
+    generator = TableGenerator(seed=seed, now=now)
+    generator.gen.district_centers = centers
+    generator.next_id[id_key] = start_id
+    if table == 'night_economy':
+        return generator.iter_night_economy(size, batch_size, start_day=start)
+    return getattr(generator, method)(size, batch_size)
+
+
+def _generate_shard(task) -> List[List[Any]]:
+    """子进程入口：生成整个分片并返回其全部批次"""
+    return list(_shard_batches(task))
+
+
+def iter_table_batches(table: str, total: int, seed, centers: Dict[str, tuple], now: datetime,
+                       workers: int = 1, batch_size: int = GENERATE_BATCH_SIZE,
+                       engine: str = 'python') -> Iterator[Any]:
+    """分片生成一个表的数据，按顺序逐批返回
+
+    分片大小固定、种子由 (seed, 表名, 分片序号) 决定，因此输出与 workers 数量无关。
+    workers > 1 时分片在多个进程中生成，最多同时保留 2 × workers 个分片的结果。
+
+    Args:
+        total: 行数（夜间经济为天数）
+        centers: 区县中心点（generate_districts 之后的 gen.district_centers）
+        engine: python 逐行生成数据类列表；numpy 每个分片生成一个列式批次
+    """
+    shard_size = SHARD_SPECS[table][3]
+    if engine == 'numpy':
+        shard_size *= COLUMNAR_SHARD_SCALE
+    tasks = []
+    for index, start in enumerate(range(0, total, shard_size)):
+        start_id = start * NIGHT_ROWS_PER_DAY + 1 if table == 'night_economy' else start + 1
+        tasks.append((
+            table, start, min(shard_size, total - start), start_id,
+            f'{seed}:{table}:{index}', centers, now, batch_size, engine
+        ))
+
+    if workers <= 1:
+        for task in tasks:
+            yield from _shard_batches(task)
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        task_iter = iter(tasks)
+        pending = deque(pool.submit(_generate_shard, task) for task in islice(task_iter, workers * 2))
+        while pending:
+            batches = pending.popleft().result()
+            task = next(task_iter, None)
+            if task is not None:
+                pending.append(pool.submit(_generate_shard, task))
+            yield from batches
 
 
 class DatabaseManager:
@@ -513,7 +1012,8 @@ class DatabaseManager:
             'password': password,
             'database': database,
             'charset': 'utf8mb4',
-            'cursorclass': DictCursor
+            'cursorclass': DictCursor,
+            'local_infile': True
         }
         self.connection = None
     
@@ -614,6 +1114,183 @@ class DatabaseManager:
             return 0
 
 
+class BulkLoader:
+    """批量导入引擎
+
+    - infile：写入临时 TSV（空间字段为 WKB 十六进制），使用 LOAD DATA LOCAL INFILE 导入，
+      服务端未开启 local_infile 时自动改用 values
+    - values：拼接大批量多行 INSERT ... VALUES，空间字段使用 ST_GeomFromWKB
+    导入期间关闭外键与唯一性检查并暂停非唯一索引维护，结束后恢复。
+    """
+
+    def __init__(self, connection, mode: str = 'infile', batch_size: int = 5000):
+        self.connection = connection
+        self.mode = mode
+        self.batch_size = batch_size
+
+    def load(self, data: List[Any], table_name: str) -> int:
+        """导入一个表，返回导入行数"""
+        return self.load_batches([data], table_name)
+
+    def load_batches(self, batches: Iterable[Any], table_name: str) -> int:
+        """逐批导入一个表，返回导入行数
+
+        批次为数据类列表或 numpy 引擎的列式批次，可来自生成器（边生成边导入）。
+        """
+        batches = iter(batches)
+        first = next((batch for batch in batches if batch_length(batch)), None)
+        if first is None:
+            return 0
+
+        fields = batch_fields(first)
+        batches = chain([first], batches)
+        if self.mode == 'infile' and not self._local_infile_enabled():
+            print("  ⚠️  服务端未开启 local_infile，改用多行 INSERT")
+            self.mode = 'values'
+
+        start = time.perf_counter()
+        try:
+            with self._bulk_session(table_name):
+                if self.mode == 'infile':
+                    lines = (self._tsv_lines(batch, fields) for batch in batches)
+                    loaded = self._load_infile(lines, fields, table_name)
+                else:
+                    rows = (self._rows(batch, fields) for batch in batches)
+                    loaded = self._load_values(rows, fields, table_name)
+            self.connection.commit()
+        except Exception as e:
+            self.connection.rollback()
+            print(f"\n❌ 导入 {table_name} 失败: {e}")
+            return 0
+
+        elapsed = max(time.perf_counter() - start, 1e-6)
+        print(f"\n✅ 成功导入 {loaded} 条数据到 {table_name}"
+              f"（{self.mode}，{elapsed:.2f}s，{loaded / elapsed:,.0f} 行/秒）")
+        return loaded
+
+    def _local_infile_enabled(self) -> bool:
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute("SHOW GLOBAL VARIABLES LIKE 'local_infile'")
+                row = cursor.fetchone()
+            return bool(row) and str(row['Value']).upper() in ('ON', '1')
+        except pymysql.err.MySQLError:
+            return False
+
+    @contextmanager
+    def _bulk_session(self, table_name: str):
+        """导入期间关闭约束检查与非唯一索引维护"""
+        with self.connection.cursor() as cursor:
+            cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+            cursor.execute("SET UNIQUE_CHECKS = 0")
+            # InnoDB 会忽略 DISABLE KEYS（仅产生警告），MyISAM 表则推迟到最后统一重建索引
+            cursor.execute(f"ALTER TABLE {table_name} DISABLE KEYS")
+        try:
+            yield
+        finally:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"ALTER TABLE {table_name} ENABLE KEYS")
+                cursor.execute("SET UNIQUE_CHECKS = 1")
+                cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+
+    @staticmethod
+    def _row(item, fields) -> list:
+        row = []
+        for field in fields:
+            val = getattr(item, field)
+            if val is None or val == '':
+                row.append(None)
+            elif field in GEO_FIELDS:
+                row.append(wkt_to_wkb(val))
+            else:
+                row.append(val)
+        return row
+
+    def _rows(self, batch, fields) -> list:
+        if is_columnar(batch):
+            return list(zip(*(column_values(batch[field]) for field in fields)))
+        return [self._row(item, fields) for item in batch]
+
+    def _tsv_lines(self, batch, fields) -> list:
+        if is_columnar(batch):
+            columns = [self._tsv_column(batch[field]) for field in fields]
+            return ['\t'.join(row) + '\n' for row in zip(*columns)]
+        return [
+            '\t'.join(self._tsv_value(val) for val in self._row(item, fields)) + '\n'
+            for item in batch
+        ]
+
+    @classmethod
+    def _tsv_column(cls, column) -> list:
+        """列式批次的一列按列转换为 TSV 文本（字符串列只转义取值表）"""
+        if isinstance(column, CategoryColumn):
+            return column.take([cls._tsv_value(val) for val in column.values], missing='\\N')
+        if is_point_column(column):
+            text = column.tobytes().hex()
+            size = POINT_WKB.itemsize * 2
+            return [text[i:i + size] for i in range(0, len(text), size)]
+        if np.ma.isMaskedArray(column):
+            return np.where(np.ma.getmaskarray(column), '\\N', column.data.astype(str)).tolist()
+        if column.dtype == bool:
+            column = column.astype(np.uint8)
+        return column.astype(str).tolist()
+
+    @staticmethod
+    def _tsv_value(val) -> str:
+        if val is None:
+            return '\\N'
+        if isinstance(val, bytes):
+            return val.hex()
+        if isinstance(val, bool):
+            return '1' if val else '0'
+        return (str(val).replace('\\', '\\\\').replace('\t', '\\t')
+                .replace('\n', '\\n').replace('\r', '\\r'))
+
+    def _load_infile(self, line_batches: Iterable[List[str]], fields: List[str], table_name: str) -> int:
+        """写入临时 TSV 后 LOAD DATA LOCAL INFILE"""
+        fd, path = tempfile.mkstemp(suffix='.tsv', prefix=f'{table_name}_')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='\n') as f:
+                for lines in line_batches:
+                    f.writelines(lines)
+
+            columns = [f'@{field}' if field in GEO_FIELDS else field for field in fields]
+            assignments = [
+                f"{field} = ST_GeomFromWKB(UNHEX(@{field}), 4326)"
+                for field in fields if field in GEO_FIELDS
+            ]
+            sql = (
+                f"LOAD DATA LOCAL INFILE %s INTO TABLE {table_name} CHARACTER SET utf8mb4 "
+                f"FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n' "
+                f"({', '.join(columns)})"
+            )
+            if assignments:
+                sql += f" SET {', '.join(assignments)}"
+
+            with self.connection.cursor() as cursor:
+                return cursor.execute(sql, (path,))
+        finally:
+            os.remove(path)
+
+    def _load_values(self, row_batches: Iterable[list], fields: List[str], table_name: str) -> int:
+        """多行 INSERT ... VALUES，每条语句最多 batch_size 行"""
+        placeholder = '(' + ', '.join(
+            'ST_GeomFromWKB(%s, 4326)' if field in GEO_FIELDS else '%s' for field in fields
+        ) + ')'
+        prefix = f"INSERT INTO {table_name} ({', '.join(fields)}) VALUES "
+
+        loaded = 0
+        with self.connection.cursor() as cursor:
+            for rows in row_batches:
+                for i in range(0, len(rows), self.batch_size):
+                    batch = rows[i:i + self.batch_size]
+                    params = [val for row in batch for val in row]
+                    cursor.execute(prefix + ', '.join([placeholder] * len(batch)), params)
+                    loaded += len(batch)
+                    print(f"  已导入 {loaded} 条数据...", end='\r')
+        return loaded
+
+
 class DataExporter:
     """数据导出工具"""
 
@@ -653,24 +1330,108 @@ class DataExporter:
     @staticmethod
     def to_csv(data: List[Any], filepath: str):
         """导出CSV文件"""
-        if not data:
-            return
+        DataExporter.to_csv_batches([data], filepath)
 
-        fields = [f.name for f in data[0].__dataclass_fields__.values()]
+    @staticmethod
+    def to_csv_batches(batches: Iterable[Any], filepath: str) -> int:
+        """逐批写入CSV文件（数据类列表或列式批次，可来自生成器），返回行数"""
+        batches = iter(batches)
+        first = next((batch for batch in batches if batch_length(batch)), None)
+        if first is None:
+            return 0
+
+        fields = batch_fields(first)
+        count = 0
 
         with open(filepath, 'w', newline='', encoding='utf-8') as f:
             writer = csv.writer(f)
             writer.writerow(fields)
-            for item in data:
-                row = []
-                for field in fields:
-                    val = getattr(item, field)
-                    if val is None:
-                        row.append('')
-                    else:
-                        row.append(str(val))
-                writer.writerow(row)
+            for batch in chain([first], batches):
+                if is_columnar(batch):
+                    writer.writerows(zip(*(
+                        column_wkt(batch[field]) if is_point_column(batch[field])
+                        else column_values(batch[field])
+                        for field in fields
+                    )))
+                else:
+                    writer.writerows(
+                        ['' if getattr(item, field) is None else str(getattr(item, field)) for field in fields]
+                        for item in batch
+                    )
+                count += batch_length(batch)
         print(f"CSV已保存至: {filepath}")
+        return count
+
+    @staticmethod
+    def _arrow_table(batch, fields: List[str], schema=None):
+        """批次转换为 Arrow 表，空间字段为 WKB"""
+        arrays = []
+        for field in fields:
+            if is_columnar(batch):
+                column = batch[field]
+                if isinstance(column, CategoryColumn):
+                    arrays.append(pa.DictionaryArray.from_arrays(
+                        pa.array(column.codes, mask=column.codes < 0), pa.array(column.values, pa.string())
+                    ))
+                elif is_point_column(column):
+                    points = pa.FixedSizeBinaryArray.from_buffers(
+                        pa.binary(POINT_WKB.itemsize), len(column), [None, pa.py_buffer(column.tobytes())]
+                    )
+                    arrays.append(points.cast(pa.binary()))
+                elif np.ma.isMaskedArray(column):
+                    arrays.append(pa.array(column.data, mask=np.ma.getmaskarray(column)))
+                else:
+                    arrays.append(pa.array(column))
+            else:
+                values = [getattr(item, field) for item in batch]
+                if field in GEO_FIELDS:
+                    values = [wkt_to_wkb(val) if val else None for val in values]
+                arrays.append(pa.array(values, pa.binary() if field in GEO_FIELDS else None))
+        if schema is None:
+            return pa.Table.from_arrays(arrays, names=fields)
+        return pa.Table.from_arrays(arrays, names=fields).cast(schema)
+
+    @staticmethod
+    def to_parquet_batches(batches: Iterable[Any], filepath: str) -> int:
+        """逐批写入 Parquet 文件（每批一个行组，zstd 压缩），返回行数"""
+        if pa is None:
+            raise RuntimeError("Parquet 导出需要安装 pyarrow：pip install pyarrow")
+
+        batches = iter(batches)
+        first = next((batch for batch in batches if batch_length(batch)), None)
+        if first is None:
+            return 0
+
+        fields = batch_fields(first)
+        table = DataExporter._arrow_table(first, fields)
+        count = 0
+        schema = table.schema
+        with pq.ParquetWriter(filepath, schema, compression='zstd') as writer:
+            writer.write_table(table)
+            count += table.num_rows
+            for batch in batches:
+                table = DataExporter._arrow_table(batch, fields, schema)
+                writer.write_table(table)
+                count += table.num_rows
+        print(f"Parquet已保存至: {filepath}")
+        return count
+
+
+def write_manifest(out_dir: str, params: Dict[str, Any], files: List[str]) -> str:
+    """写入数据集清单：生成参数与每个输出文件的 SHA-256"""
+    digests = {}
+    for path in files:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        digests[os.path.basename(path)] = digest.hexdigest()
+
+    path = os.path.join(out_dir, 'dataset_manifest.json')
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump({**params, 'files': digests}, f, ensure_ascii=False, indent=2, sort_keys=True)
+        f.write('\n')
+    return path
 
 
 def main():
@@ -680,7 +1441,8 @@ def main():
     parser.add_argument('--teahouse', type=int, default=300, help='茶馆数量（默认300）')
     parser.add_argument('--days', type=int, default=7, help='夜间经济数据天数（默认7天）')
     parser.add_argument('--alerts', type=int, default=30, help='预警事件数量（默认30）')
-    parser.add_argument('--format', choices=['sql', 'csv', 'both', 'db'], default='db', help='导出格式（db=直接入库）')
+    parser.add_argument('--format', choices=['sql', 'csv', 'both', 'db', 'parquet'], default='db',
+                        help='导出格式（db=直接入库）')
     parser.add_argument('--output-dir', default='./output', help='输出目录')
     
     # 数据库连接参数
@@ -690,18 +1452,47 @@ def main():
     parser.add_argument('--db-password', default='qwer4321', help='数据库密码（默认为空）')
     parser.add_argument('--db-name', default='city_fireworks', help='数据库名（默认city_fireworks）')
     parser.add_argument('--clear', action='store_true', help='清空现有数据后再插入')
-
+    parser.add_argument('--load-mode', choices=['infile', 'values', 'insert'], default='infile',
+                        help='入库方式：infile=LOAD DATA LOCAL INFILE（不可用时退回 values），'
+                             'values=多行 INSERT，insert=逐行 executemany（默认infile）')
+    parser.add_argument('--bulk-batch', type=int, default=5000, help='values 模式每条语句的行数（默认5000）')
+    parser.add_argument('--workers', type=int, default=1, help='生成数据的进程数（默认1）')
+    parser.add_argument('--seed', help='随机种子（相同种子生成相同数据，默认随机并打印）')
+    parser.add_argument('--engine', choices=['python', 'numpy'], default='python',
+                        help='生成引擎：python=逐行生成，numpy=按列向量化生成（默认python）')
+    parser.add_argument('--base-time', help='数据的基准时间（ISO 格式，默认当前时间），所有时间字段都相对它生成')
+    parser.add_argument('--profile', choices=list(SCALE_PROFILES),
+                        help='压测数据规模档位，使用固定的数据量、种子、基准时间与引擎（可被显式参数覆盖）')
+
+    # 档位作为默认值，命令行显式指定的参数优先
+    known, _ = parser.parse_known_args()
+    if known.profile:
+        parser.set_defaults(**SCALE_PROFILES[known.profile])
     args = parser.parse_args()
+    if args.engine == 'numpy' and (args.format in ('sql', 'both') or
+                                   (args.format == 'db' and args.load_mode == 'insert')):
+        parser.error("numpy 引擎仅支持 --format db（infile/values）、csv、parquet")
 
     # 创建输出目录
     os.makedirs(args.output_dir, exist_ok=True)
 
+    seed = args.seed if args.seed is not None else str(random.SystemRandom().randrange(10 ** 9))
+    try:
+        base_time = datetime.fromisoformat(args.base_time) if args.base_time else datetime.now().replace(microsecond=0)
+    except ValueError:
+        parser.error("--base-time 须为 ISO 格式时间，如 2025-01-01T21:00:00")
+
     # 初始化生成器
-    generator = TableGenerator()
+    generator = TableGenerator(seed=f'{seed}:base', now=base_time)
     exporter = DataExporter()
 
     print("=" * 50)
     print("开始生成《市井烟火》重庆数据...")
+    if args.profile:
+        print(f"数据档位: {args.profile}")
+    print(f"随机种子: {seed}，基准时间: {generator.now_str}"
+          f"（复现: --seed {seed} --base-time {base_time.isoformat()} --engine {args.engine}）")
+    print(f"进程数: {args.workers}，引擎: {args.engine}")
     print("=" * 50)
 
     # 1. 生成区县数据（必须最先）
@@ -714,22 +1505,21 @@ def main():
     brands = generator.generate_brands()
     print(f"✅ 已生成 {len(brands)} 条品牌数据\n")
 
-    # 3. 生成其他数据
-    print("🍲 生成火锅门店数据...")
-    hotpots = generator.generate_hotpot_restaurants(args.hotpot)
-    print(f"✅ 已生成 {len(hotpots)} 条火锅门店数据\n")
-
-    print("🍵 生成茶馆数据...")
-    teahouses = generator.generate_teahouses(args.teahouse)
-    print(f"✅ 已生成 {len(teahouses)} 条茶馆数据\n")
-
-    print("🌃 生成夜间经济数据...")
-    night_data = generator.generate_night_economy(args.days)
-    print(f"✅ 已生成 {len(night_data)} 条夜间经济数据\n")
+    # 3. 其他数据按分片流式生成，边生成边导出
+    def stream(table: str, total: int):
+        return iter_table_batches(
+            table, total, seed, generator.gen.district_centers, generator.now,
+            workers=args.workers, engine=args.engine
+        )
 
-    print("⚠️  生成预警数据...")
-    alerts = generator.generate_alerts(args.alerts)
-    print(f"✅ 已生成 {len(alerts)} 条预警数据\n")
+    counts: Dict[str, int] = {}
+    outputs: List[str] = []
+    tables = [
+        ('hotpot_restaurants', args.hotpot),
+        ('teahouses', args.teahouse),
+        ('night_economy', args.days),
+        ('alerts', args.alerts),
+    ]
 
     # 5. 导出/导入数据
     if args.format == 'db':
@@ -775,24 +1565,30 @@ def main():
                 db.clear_table('districts')
                 print()
             
+            if args.load_mode == 'insert':
+                def load_batches(batches, table_name):
+                    return sum(db.insert_batch(batch, table_name) for batch in batches)
+            else:
+                load_batches = BulkLoader(db.connection, args.load_mode, args.bulk_batch).load_batches
+
             # 按顺序插入数据（注意外键依赖）
             print("1️⃣  插入区县数据...")
-            db.insert_batch(districts, 'districts')
+            load_batches([districts], 'districts')
             
             print("\n2️⃣  插入品牌数据...")
-            db.insert_batch(brands, 'brands')
+            load_batches([brands], 'brands')
             
-            print("\n3️⃣  插入火锅门店数据...")
-            db.insert_batch(hotpots, 'hotpot_restaurants')
+            print("\n3️⃣  生成并插入火锅门店数据...")
+            load_batches(stream('hotpot_restaurants', args.hotpot), 'hotpot_restaurants')
             
-            print("\n4️⃣  插入茶馆数据...")
-            db.insert_batch(teahouses, 'teahouses')
+            print("\n4️⃣  生成并插入茶馆数据...")
+            load_batches(stream('teahouses', args.teahouse), 'teahouses')
             
-            print("\n5️⃣  插入夜间经济数据...")
-            db.insert_batch(night_data, 'night_economy')
+            print("\n5️⃣  生成并插入夜间经济数据...")
+            load_batches(stream('night_economy', args.days), 'night_economy')
             
-            print("\n6️⃣  插入预警数据...")
-            db.insert_batch(alerts, 'alerts')
+            print("\n6️⃣  生成并插入预警数据...")
+            load_batches(stream('alerts', args.alerts), 'alerts')
             
             print("\n" + "=" * 50)
             print("🎉 所有数据已成功导入数据库！")
@@ -801,12 +1597,43 @@ def main():
         finally:
             db.close()
     
-    elif args.format in ['sql', 'both']:
+    elif args.format in ('csv', 'parquet'):
+        print(f"📊 生成并导出{args.format.upper()}文件...")
+        out_dir = args.output_dir
+        write = exporter.to_csv_batches if args.format == 'csv' else exporter.to_parquet_batches
+        extension = f'.{args.format}'
+        for table, data in (('districts', districts), ('brands', brands)):
+            path = os.path.join(out_dir, table + extension)
+            counts[table] = write([data], path)
+            outputs.append(path)
+        for table, total in tables:
+            filename = 'night_economy_realtime' if table == 'night_economy' else table
+            path = os.path.join(out_dir, filename + extension)
+            start = time.perf_counter()
+            counts[table] = count = write(stream(table, total), path)
+            outputs.append(path)
+            elapsed = max(time.perf_counter() - start, 1e-6)
+            print(f"  {table}: {count} 条（{elapsed:.2f}s，{count / elapsed:,.0f} 行/秒）")
+        print(f"✅ {args.format.upper()}文件已生成在: {out_dir}/\n")
+
+    else:
+        # SQL 文件需要完整数据，整表生成后再导出
+        print("🍲 生成火锅门店、茶馆、夜间经济与预警数据...")
+        hotpots, teahouses, night_data, alerts = (
+            [item for batch in stream(table, total) for item in batch] for table, total in tables
+        )
+        counts.update(zip(
+            ['districts', 'brands', 'hotpot_restaurants', 'teahouses', 'night_economy', 'alerts'],
+            map(len, [districts, brands, hotpots, teahouses, night_data, alerts])
+        ))
+        print(f"✅ 已生成 {len(hotpots)} 条火锅门店、{len(teahouses)} 条茶馆、"
+              f"{len(night_data)} 条夜间经济、{len(alerts)} 条预警数据\n")
+
         print("💾 导出SQL文件...")
         sql_file = os.path.join(args.output_dir, 'chongqing_data.sql')
         with open(sql_file, 'w', encoding='utf-8') as f:
             f.write("-- 《市井烟火》重庆城市人文数据\n")
-            f.write("-- 生成时间: " + datetime.now().strftime('%Y-%m-%d %H:%M:%S') + "\n")
+            f.write("-- 生成时间: " + generator.now_str + "\n")
             f.write("-- 数据量: {}条火锅, {}条茶馆, {}条夜间经济, {}条预警\n\n".format(
                 len(hotpots), len(teahouses), len(night_data), len(alerts)
             ))
@@ -829,18 +1656,30 @@ def main():
             f.write("-- 6. 预警数据\n")
             f.write(exporter.to_sql(alerts, 'alerts') + "\n")
 
+        outputs.append(sql_file)
         print(f"✅ SQL文件已生成: {sql_file}\n")
 
-    if args.format in ['csv', 'both']:
-        print("📊 导出CSV文件...")
-        csv_dir = args.output_dir
-        exporter.to_csv(districts, os.path.join(csv_dir, 'districts.csv'))
-        exporter.to_csv(brands, os.path.join(csv_dir, 'brands.csv'))
-        exporter.to_csv(hotpots, os.path.join(csv_dir, 'hotpot_restaurants.csv'))
-        exporter.to_csv(teahouses, os.path.join(csv_dir, 'teahouses.csv'))
-        exporter.to_csv(night_data, os.path.join(csv_dir, 'night_economy_realtime.csv'))
-        exporter.to_csv(alerts, os.path.join(csv_dir, 'alerts.csv'))
-        print(f"✅ CSV文件已生成在: {csv_dir}/\n")
+        if args.format == 'both':
+            print("📊 导出CSV文件...")
+            csv_dir = args.output_dir
+            for filename, data in (
+                ('districts', districts), ('brands', brands), ('hotpot_restaurants', hotpots),
+                ('teahouses', teahouses), ('night_economy_realtime', night_data), ('alerts', alerts)
+            ):
+                path = os.path.join(csv_dir, f'{filename}.csv')
+                exporter.to_csv(data, path)
+                outputs.append(path)
+            print(f"✅ CSV文件已生成在: {csv_dir}/\n")
+
+    if outputs:
+        manifest = write_manifest(args.output_dir, {
+            'profile': args.profile,
+            'seed': seed,
+            'base_time': base_time.isoformat(),
+            'engine': args.engine,
+            'rows': counts,
+        }, outputs)
+        print(f"🧾 数据清单（含各文件 SHA-256，用于比对数据集是否一致）: {manifest}\n")
 
     if args.format != 'db':
         print("=" * 50)
@@ -0,0 +1,9 @@
+"""
+测试公共配置
+"""
+
+import os
+import sys
+
+# 数据生成脚本位于仓库根目录
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
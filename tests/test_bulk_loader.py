@@ -0,0 +1,247 @@
+"""
+get_data_to_mysql.BulkLoader 测试（使用记录 SQL 的假连接，不需要 MySQL）
+"""
+
+from dataclasses import dataclass
+from typing import Optional
+import re
+import pytest
+
+np = pytest.importorskip('numpy')
+
+from get_data_to_mysql import (
+    BulkLoader, CategoryColumn, POINT_WKB, column_values, column_wkt, wkt_to_wkb
+)
+
+
+@dataclass
+class Row:
+    id: int
+    name: Optional[str]
+    is_open: bool
+    location: Optional[str]
+
+
+class FakeCursor:
+    def __init__(self, connection):
+        self.connection = connection
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def execute(self, sql, params=None):
+        self.connection.statements.append((sql, params))
+        if sql.startswith('LOAD DATA'):
+            # 临时文件在 execute 返回后删除，这里先读出内容
+            with open(params[0], encoding='utf-8', newline='') as f:
+                self.connection.tsv = f.read()
+            return self.connection.tsv.count('\n')
+        if sql.startswith('INSERT'):
+            return sql.count('), (') + 1
+        return 0
+
+    def fetchone(self):
+        return {'Variable_name': 'local_infile', 'Value': self.connection.local_infile}
+
+
+class FakeConnection:
+    def __init__(self, local_infile='ON'):
+        self.local_infile = local_infile
+        self.statements = []
+        self.tsv = None
+        self.committed = False
+
+    def cursor(self):
+        return FakeCursor(self)
+
+    def commit(self):
+        self.committed = True
+
+    def rollback(self):
+        pass
+
+    def inserts(self):
+        return [(sql, params) for sql, params in self.statements if sql.startswith('INSERT')]
+
+
+_UNESCAPE = {'N': None, 't': '\t', 'n': '\n', 'r': '\r', '\\': '\\', '0': '\0'}
+
+
+def parse_tsv_line(line: str) -> list:
+    """按 LOAD DATA 的规则（FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\'）解析一行"""
+    assert line.endswith('\n') and '\n' not in line[:-1]
+    values = []
+    for field in line[:-1].split('\t'):
+        if field == '\\N':
+            values.append(None)
+        else:
+            values.append(re.sub(r'\\(.)', lambda m: _UNESCAPE[m.group(1)], field))
+    return values
+
+
+# ==================== TSV 转义 ====================
+
+@pytest.mark.parametrize('value, expected', [
+    (None, '\\N'),
+    (True, '1'),
+    (False, '0'),
+    (12.5, '12.5'),
+    (b'\x01\xff', '01ff'),
+    ('a\tb', 'a\\tb'),
+    ('line1\nline2\r\n', 'line1\\nline2\\r\\n'),
+    ('C:\\temp', 'C:\\\\temp'),
+    ('\\N', '\\\\N'),
+])
+def test_tsv_value(value, expected):
+    assert BulkLoader._tsv_value(value) == expected
+
+
+def test_tsv_lines_round_trip():
+    loader = BulkLoader(FakeConnection())
+    rows = [
+        Row(1, '老火锅\t总店', True, 'POINT(29.56 106.55)'),
+        Row(2, '多行\n地址\\备注', False, None),
+        Row(3, '', False, ''),
+        Row(4, '\\N', True, None),
+    ]
+    fields = ['id', 'name', 'is_open', 'location']
+    lines = loader._tsv_lines(rows, fields)
+
+    assert len(lines) == 4
+    parsed = [parse_tsv_line(line) for line in lines]
+    assert parsed[0] == ['1', '老火锅\t总店', '1', wkt_to_wkb('POINT(29.56 106.55)').hex()]
+    assert parsed[1] == ['2', '多行\n地址\\备注', '0', None]
+    # 空字符串与 None 一样写为 NULL
+    assert parsed[2] == ['3', None, '0', None]
+    # 字面量 \N 不能被当作 NULL
+    assert parsed[3] == ['4', '\\N', '1', None]
+
+
+def test_tsv_columns_match_row_path():
+    location = np.zeros(3, dtype=POINT_WKB)
+    location['order'] = 1
+    location['type'] = 1
+    location['x'] = [29.5, 29.6, 29.7]
+    location['y'] = [106.5, 106.6, 106.7]
+    batch = {
+        'id': np.array([1, 2, 3]),
+        'name': CategoryColumn(np.array([0, -1, 1], dtype=np.int32), ['甲\t乙', '换\n行']),
+        'price': np.ma.masked_array([80, 0, 120], mask=[False, True, False]),
+        'is_open': np.array([True, False, True]),
+        'location': location,
+    }
+    loader = BulkLoader(FakeConnection())
+    parsed = [parse_tsv_line(line) for line in loader._tsv_lines(batch, list(batch))]
+
+    assert [row[1] for row in parsed] == ['甲\t乙', None, '换\n行']
+    assert [row[2] for row in parsed] == ['80', None, '120']
+    assert [row[3] for row in parsed] == ['1', '0', '1']
+    assert [row[4] for row in parsed] == [wkt_to_wkb(wkt).hex() for wkt in column_wkt(location)]
+
+
+def test_load_infile_sql_and_file():
+    connection = FakeConnection(local_infile='ON')
+    rows = [Row(1, 'a\tb', True, 'POINT(29.5 106.5)'), Row(2, None, False, None)]
+    assert BulkLoader(connection).load(rows, 'hotpot_restaurants') == 2
+
+    sql = next(sql for sql, _ in connection.statements if sql.startswith('LOAD DATA'))
+    assert "FIELDS TERMINATED BY '\\t' ESCAPED BY '\\\\' LINES TERMINATED BY '\\n'" in sql
+    assert '(id, name, is_open, @location)' in sql
+    assert sql.endswith('SET location = ST_GeomFromWKB(UNHEX(@location), 4326)')
+    assert [parse_tsv_line(line + '\n') for line in connection.tsv.splitlines()] == [
+        ['1', 'a\tb', '1', wkt_to_wkb('POINT(29.5 106.5)').hex()],
+        ['2', None, '0', None],
+    ]
+    assert connection.committed
+    # 约束检查在导入结束后恢复
+    assert connection.statements[-1][0] == 'SET FOREIGN_KEY_CHECKS = 1'
+
+
+# ==================== 多行 VALUES ====================
+
+def test_values_chunking():
+    connection = FakeConnection()
+    loader = BulkLoader(connection, mode='values', batch_size=3)
+    batches = [
+        [Row(i, f'n{i}', i % 2 == 0, f'POINT(29.{i} 106.{i})') for i in range(1, 8)],
+        [Row(8, None, False, None)],
+    ]
+    assert loader.load_batches(iter(batches), 'teahouses') == 8
+
+    inserts = connection.inserts()
+    # 每个批次内按 batch_size 切分，批次之间不合并
+    assert [len(params) // 4 for _, params in inserts] == [3, 3, 1, 1]
+    placeholder = '(%s, %s, %s, ST_GeomFromWKB(%s, 4326))'
+    for sql, params in inserts:
+        rows = len(params) // 4
+        assert sql == 'INSERT INTO teahouses (id, name, is_open, location) VALUES ' + ', '.join([placeholder] * rows)
+    ids = [params[i] for _, params in inserts for i in range(0, len(params), 4)]
+    assert ids == list(range(1, 9))
+    assert inserts[0][1][3] == wkt_to_wkb('POINT(29.1 106.1)')
+    assert inserts[-1][1] == [8, None, False, None]
+
+
+def test_values_chunking_columnar():
+    connection = FakeConnection()
+    loader = BulkLoader(connection, mode='values', batch_size=4)
+    batch = {'id': np.arange(1, 11), 'status': np.ma.masked_array(np.ones(10), mask=[i == 4 for i in range(10)])}
+    assert loader.load_batches([batch], 'alerts') == 10
+
+    inserts = connection.inserts()
+    assert [len(params) // 2 for _, params in inserts] == [4, 4, 2]
+    assert inserts[1][1][:2] == [5, None]
+
+
+def test_infile_falls_back_to_values():
+    connection = FakeConnection(local_infile='OFF')
+    loader = BulkLoader(connection, mode='infile', batch_size=2)
+    assert loader.load([Row(1, 'a', True, None), Row(2, 'b', False, None), Row(3, 'c', True, None)], 'brands') == 3
+    assert loader.mode == 'values'
+    assert connection.tsv is None
+    assert len(connection.inserts()) == 2
+
+
+# ==================== WKB ====================
+
+@pytest.mark.parametrize('wkt', [
+    'POINT(29.5630 106.5516)',
+    'POLYGON((106.5 29.5, 106.6 29.5, 106.6 29.6, 106.5 29.5))',
+    'POLYGON((0 0, 10 0, 10 10, 0 0), (1 1, 2 1, 2 2, 1 1))',
+    'MULTIPOLYGON(((0 0, 1 0, 1 1, 0 0)), ((5 5, 6 5, 6 6, 5 5), (5.2 5.2, 5.4 5.2, 5.4 5.4, 5.2 5.2)))',
+])
+def test_wkb_round_trip(wkt):
+    pytest.importorskip('shapely')
+    from shapely import wkb, wkt as shapely_wkt
+
+    data = wkt_to_wkb(wkt)
+    assert data[0] == 1  # 小端
+    geometry = wkb.loads(data)
+    assert geometry.equals_exact(shapely_wkt.loads(wkt), tolerance=0)
+    # TSV 中的十六进制形式经 UNHEX 还原后不变
+    assert wkb.loads(bytes.fromhex(data.hex())).equals_exact(geometry, tolerance=0)
+
+
+def test_wkb_point_keeps_axis_order():
+    pytest.importorskip('shapely')
+    from shapely import wkb
+
+    # 坐标保持 WKT 中的顺序（POINT(纬度 经度)），与 ST_GeomFromText 一致
+    point = wkb.loads(wkt_to_wkb('POINT(29.563 106.5516)'))
+    assert (point.x, point.y) == (29.563, 106.5516)
+
+
+def test_point_column_wkb_matches_wkt():
+    location = np.zeros(2, dtype=POINT_WKB)
+    location['order'] = 1
+    location['type'] = 1
+    location['x'] = [29.5630001, 30.1]
+    location['y'] = [106.5516002, 107.2]
+    assert column_values(location) == [wkt_to_wkb(wkt) for wkt in column_wkt(location)]
+
+
+def test_wkt_to_wkb_rejects_unknown_type():
+    with pytest.raises(ValueError):
+        wkt_to_wkb('LINESTRING(0 0, 1 1)')
@@ -0,0 +1,196 @@
+"""
+convert_csv_to_json 测试
+"""
+
+import csv
+import glob
+import json
+import os
+import re
+import pytest
+
+from convert_csv_to_json import (
+    TABLE_SCHEMAS, csv_to_json, encode_geometry, encode_polyline, flatten_geometry, lnglat_to_tile,
+    parse_bool, parse_geometry, parse_wkb, parse_wkt, transform_district
+)
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'output')
+
+_INT = re.compile(r'-?\d+')
+_FLOAT = re.compile(r'-?\d+(\.\d+)?([eE][-+]?\d+)?')
+
+
+def _column_kind(values) -> str:
+    if not values:
+        return 'empty'
+    if all(_INT.fullmatch(value) for value in values):
+        return 'int'
+    if all(_FLOAT.fullmatch(value) for value in values):
+        return 'float'
+    if set(values) <= {'True', 'False', 'true', 'false'}:
+        return 'bool'
+    return 'str'
+
+
+@pytest.mark.parametrize('csv_file', sorted(glob.glob(os.path.join(OUTPUT_DIR, '*.csv'))))
+def test_schema_covers_numeric_columns(csv_file):
+    """生成的 CSV 中每个数值/布尔列都要在 TABLE_SCHEMAS 中声明类型"""
+    table = os.path.splitext(os.path.basename(csv_file))[0]
+    schema = TABLE_SCHEMAS[table]
+    with open(csv_file, encoding='utf-8', newline='') as f:
+        rows = list(csv.DictReader(f))
+
+    expected = {'int': (int,), 'float': (float,), 'bool': (parse_bool,), 'str': (None,), 'empty': (None, int, float)}
+    for column in rows[0]:
+        kind = _column_kind([row[column] for row in rows if row[column] != ''])
+        # 整数列声明为 float 也可以（如 area_km2 偶尔为整数）
+        allowed = expected[kind] + ((float,) if kind == 'int' else ())
+        assert schema.get(column) in allowed, f"{table}.{column} 为 {kind} 列"
+
+
+def test_csv_to_json_types(tmp_path):
+    csv_file = tmp_path / 'districts.csv'
+    csv_file.write_text(
+        'id,name,area_km2,population,center_lng,center_lat,vitality_score\n'
+        '1,渝中区,23,630090,106.5681,29.5527,\n',
+        encoding='utf-8'
+    )
+    json_file = tmp_path / 'districts.json'
+    assert csv_to_json(str(csv_file), str(json_file)) == 1
+
+    row = json.loads(json_file.read_text(encoding='utf-8'))[0]
+    assert row == {
+        'id': 1, 'name': '渝中区', 'area_km2': 23.0, 'population': 630090,
+        'center_lng': 106.5681, 'center_lat': 29.5527, 'vitality_score': None,
+    }
+
+
+# 前端 TileService.lngLatToTile 对同样输入的结果（city-fireworks/src/services/TileService.ts）
+TILE_SERVICE_POINTS = [
+    ((104.0665, 30.5723, 12), (3232, 1682)),
+    ((104.0665, 30.5723, 16), (51712, 26917)),
+    ((103.9, 30.8, 14), (12920, 6717)),
+    ((-73.9857, 40.7484, 10), (301, 384)),
+    ((-0.0001, 0.0001, 8), (127, 127)),
+    ((0, 0, 0), (0, 0)),
+    ((0, 0, 1), (1, 1)),
+    ((-180, 90, 3), (0, 0)),
+    ((180, -90, 3), (7, 7)),
+]
+
+
+@pytest.mark.parametrize('point,tile', TILE_SERVICE_POINTS)
+def test_lnglat_to_tile_matches_frontend(point, tile):
+    assert lnglat_to_tile(*point) == tile
+
+
+def test_tile_manifest(tmp_path):
+    points = [(104.0665, 30.5723), (104.0666, 30.5724), (103.9, 30.8), (104.2, 30.4)]
+    csv_file = tmp_path / 'hotpot_restaurants.csv'
+    csv_file.write_text(
+        'id,name,coordinates_lng,coordinates_lat\n'
+        + ''.join(f'{i},店{i},{lng},{lat}\n' for i, (lng, lat) in enumerate(points, 1))
+        + '5,无坐标,,\n',
+        encoding='utf-8'
+    )
+    json_file = tmp_path / 'hotpot_restaurants.json'
+    assert csv_to_json(str(csv_file), str(json_file), compress=('gzip',), tile_zoom=14) == 5
+
+    tile_dir = tmp_path / 'tiles' / 'hotpot_restaurants'
+    manifest = json.loads((tile_dir / 'manifest.json').read_text(encoding='utf-8'))
+    assert manifest['zoom'] == 14
+    assert manifest['count'] == 4
+    assert manifest['bounds'] == [103.9, 30.4, 104.2, 30.8]
+    assert manifest['encodings'] == ['gzip']
+
+    expected = {}
+    for lng, lat in points:
+        key = '14/{}/{}'.format(*lnglat_to_tile(lng, lat, 14))
+        expected[key] = expected.get(key, 0) + 1
+    assert manifest['tiles'] == expected
+    for key, count in manifest['tiles'].items():
+        rows = json.loads((tile_dir / f'{key}.json').read_text(encoding='utf-8'))
+        assert len(rows) == count
+        assert (tile_dir / f'{key}.json.gz').exists()
+
+
+# ==================== 几何解析 ====================
+# 生成器按 POINT(纬度 经度) 写 WKT，解析后为 [经度, 纬度]
+POLYGON_WITH_HOLE = (
+    'POLYGON((29.0 106.0, 29.0 107.0, 30.0 107.0, 30.0 106.0, 29.0 106.0),'
+    '(29.2 106.2, 29.4 106.2, 29.4 106.4, 29.2 106.2))'
+)
+MULTIPOLYGON = (
+    'MULTIPOLYGON(((29.0 106.0, 29.0 106.5, 29.5 106.5, 29.0 106.0)),'
+    '((30.0 107.0, 30.0 107.5, 30.5 107.5, 30.0 107.0)))'
+)
+
+
+def test_parse_wkt_point_swaps_axes():
+    assert parse_wkt('POINT(29.563 106.551)') == {'type': 'Point', 'coordinates': [106.551, 29.563]}
+    assert parse_wkt('POINT(29.563 106.551)', swap=False)['coordinates'] == [29.563, 106.551]
+
+
+def test_parse_wkt_polygon_with_hole():
+    geometry = parse_wkt(POLYGON_WITH_HOLE)
+    assert geometry['type'] == 'Polygon'
+    outer, hole = geometry['coordinates']
+    assert outer == [[106.0, 29.0], [107.0, 29.0], [107.0, 30.0], [106.0, 30.0], [106.0, 29.0]]
+    assert hole == [[106.2, 29.2], [106.2, 29.4], [106.4, 29.4], [106.2, 29.2]]
+
+
+def test_parse_wkt_multipolygon():
+    geometry = parse_wkt(MULTIPOLYGON)
+    assert geometry['type'] == 'MultiPolygon'
+    assert geometry['coordinates'] == [
+        [[[106.0, 29.0], [106.5, 29.0], [106.5, 29.5], [106.0, 29.0]]],
+        [[[107.0, 30.0], [107.5, 30.0], [107.5, 30.5], [107.0, 30.0]]],
+    ]
+
+
+@pytest.mark.parametrize('wkt', ['POINT(29.563 106.551)', POLYGON_WITH_HOLE, MULTIPOLYGON])
+def test_parse_wkb_matches_wkt(wkt):
+    shapely_wkt = pytest.importorskip('shapely.wkt')
+    geometry = shapely_wkt.loads(wkt)
+
+    assert parse_wkb(geometry.wkb) == parse_wkt(wkt)
+    assert parse_geometry(geometry.wkb_hex) == parse_wkt(wkt)
+    assert parse_wkb(geometry.wkb, swap=False) == parse_wkt(wkt, swap=False)
+
+
+@pytest.mark.parametrize('value', [
+    'POINT(abc def)', 'POLYGON((29.0 106.0, 29.0 x))', 'POLYGON((29.0 106.0)', 'CIRCLE(1 2)',
+    '0101000000', 'ffff', 'not hex',
+])
+def test_malformed_geometry_returns_none(value):
+    assert parse_geometry(value) is None
+
+
+def test_transform_district_skips_malformed_geometry():
+    row = transform_district({'id': 1, 'center': 'POINT(abc def)', 'boundary': 'POLYGON((abc def))'})
+    assert row == {'id': 1, 'center_coords': {}, 'boundary_coords': None}
+
+
+def test_encode_polyline_reference_vector():
+    # Google 编码折线算法文档中的示例：(38.5, -120.2), (40.7, -120.95), (43.252, -126.453)
+    points = [(-120.2, 38.5), (-120.95, 40.7), (-126.453, 43.252)]
+    assert encode_polyline(points) == '_p~iF~ps|U_ulLnnqC_mqNvxq`@'
+
+
+def test_flatten_geometry_offsets():
+    flat = flatten_geometry(parse_wkt(MULTIPOLYGON))
+    assert flat['ring_starts'] == [0, 4]
+    assert flat['polygon_starts'] == [0, 1]
+    assert flat['coordinates'][:4] == [106.0, 29.0, 106.5, 29.0]
+
+    flat = flatten_geometry(parse_wkt(POLYGON_WITH_HOLE))
+    assert flat['ring_starts'] == [0, 5]
+    assert flat['polygon_starts'] == [0]
+    assert len(flat['coordinates']) == 2 * 9
+
+
+def test_encode_geometry_wraps_polygon():
+    geometry = parse_wkt(POLYGON_WITH_HOLE)
+    assert encode_geometry(geometry) == [geometry['coordinates']]
+    assert [len(rings) for rings in encode_geometry(geometry, 'polyline')] == [2]
+    assert encode_geometry(None) is None